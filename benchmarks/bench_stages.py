@@ -0,0 +1,99 @@
+"""
+asv benchmarks for each stage of the Riemannian PCA pipeline.
+
+Every stage gets a ``time_<stage>`` benchmark (wall time) and a ``track_peakmem_<stage>``
+benchmark (peak bytes allocated while the stage runs, measured with tracemalloc so that the
+setup cost is excluded). Run with ``asv run`` or compare revisions with ``benchmarks/compare.py``.
+"""
+
+import tracemalloc
+
+from .stages import STAGE_NAMES, STAGES, build_analysis, stage_method
+
+
+class _StageBenchmarks:
+    """Fits the analysis of every parameter combination; subclasses set ``params`` and ``param_names``."""
+    timeout = 900
+
+    def setup(self, *params):
+        self.analysis, self.context = build_analysis(*self._dataset(*params))
+
+    def _dataset(self, *params):
+        """Arguments of ``build_analysis`` for one parameter combination: the parameters themselves by default."""
+        return params
+
+    def _peak_bytes(self, stage):
+        tracemalloc.start()
+        try:
+            STAGES[stage](self.analysis, self.context)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def _require_stage(stage):
+    """Returns a per-benchmark asv setup that skips ``stage`` on revisions that lack it."""
+    def setup(*params):
+        stage_method(stage)
+
+    return setup
+
+
+def _add_stage_benchmarks(cls):
+    """
+    Attaches one timing and one peak-memory benchmark per pipeline stage.
+
+    Each benchmark's own setup raises ``NotImplementedError`` when the measured revision lacks the stage, so asv
+    skips it instead of failing.
+    """
+    for stage in STAGE_NAMES:
+        def time_stage(self, *params, _stage=stage):
+            STAGES[_stage](self.analysis, self.context)
+
+        def track_peakmem_stage(self, *params, _stage=stage):
+            return self._peak_bytes(_stage)
+
+        track_peakmem_stage.unit = "bytes"
+        time_stage.setup = track_peakmem_stage.setup = _require_stage(stage)
+        setattr(cls, f"time_{stage}", time_stage)
+        setattr(cls, f"track_peakmem_{stage}", track_peakmem_stage)
+    return cls
+
+
+@_add_stage_benchmarks
+class SampleScaling(_StageBenchmarks):
+    """Stages on the example dataset shapes with a growing number of rows."""
+    params = (["data10d", "iris"], [250, 1000, 2000])
+    param_names = ["shape", "n_samples"]
+
+
+@_add_stage_benchmarks
+class FeatureScaling(_StageBenchmarks):
+    """Stages on ``data10d``-like clusters with a fixed number of rows and a growing number of features."""
+    params = ([4, 10, 50, 200],)
+    param_names = ["n_features"]
+
+    def _dataset(self, n_features):
+        return "data10d", 500, n_features
+
+
+class SimilarityBackends(_StageBenchmarks):
+    """
+    Graph stage of every similarity backend on ``data10d``-like clusters.
+
+    Revisions without the ``similarity`` argument only run "umap"; ``build_analysis`` skips the other backends.
+    """
+    params = (["umap", "fuzzy_knn", "gaussian_knn"], [250, 1000, 2000])
+    param_names = ["similarity", "n_samples"]
+
+    def _dataset(self, similarity, n_samples):
+        return "data10d", n_samples, None, similarity
+
+    def time_graph(self, similarity, n_samples):
+        STAGES["graph"](self.analysis, self.context)
+
+    def track_peakmem_graph(self, similarity, n_samples):
+        return self._peak_bytes("graph")
+
+    track_peakmem_graph.unit = "bytes"
+    time_graph.setup = track_peakmem_graph.setup = _require_stage("graph")
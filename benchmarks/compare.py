@@ -0,0 +1,122 @@
+"""
+Compare per-stage time and peak memory of two git revisions without an asv installation.
+
+Usage:
+    python benchmarks/compare.py BASE [HEAD] [--shapes data10d iris] [--sizes 250 1000] [--repeat 3]
+
+Each revision is checked out into a temporary git worktree and measured in its own Python process
+with the stage definitions of the current checkout, so both sides run exactly the same benchmark
+code. The report lists, for every dataset and stage, the time and peak-memory ratios HEAD/BASE and
+flags changes beyond ``--factor``; stages missing from a revision are listed as skipped. HEAD
+defaults to the ``HEAD`` revision; pass ``--worktree`` instead of HEAD to measure the uncommitted
+working tree.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+WORKTREE = "<worktree>"
+
+
+def _measure(args: argparse.Namespace) -> None:
+    """Worker mode: measure every stage on every dataset and write the results as JSON."""
+    from stages import STAGE_NAMES, build_analysis, measure
+
+    results = {}
+    for shape in args.shapes:
+        for n_samples in args.sizes:
+            analysis, context = build_analysis(shape, n_samples)
+            key = f"{shape}[n={n_samples}]"
+            results[key] = {}
+            for stage in STAGE_NAMES:
+                try:
+                    results[key][stage] = measure(stage, analysis, context, repeat=args.repeat)
+                except NotImplementedError:
+                    results[key][stage] = None  # the revision lacks this stage
+    with open(args.output, "w") as handle:
+        json.dump(results, handle)
+
+
+def _run_revision(revision: str, args: argparse.Namespace, workdir: str) -> dict:
+    """Checks out ``revision`` into a worktree (unless it is the working tree) and measures it."""
+    if revision == WORKTREE:
+        source = REPO_DIR
+    else:
+        source = os.path.join(workdir, "checkout-" + revision.replace("/", "_"))
+        subprocess.run(["git", "-C", REPO_DIR, "worktree", "add", "--detach", source, revision],
+                       check=True, stdout=subprocess.DEVNULL)
+    output = os.path.join(workdir, f"{revision.replace('/', '_').strip('<>')}.json")
+    pythonpath = [source] + [entry for entry in os.environ.get("PYTHONPATH", "").split(os.pathsep) if entry]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(pythonpath),
+               MPLBACKEND="Agg")
+    command = [sys.executable, os.path.abspath(__file__), "--measure", "--output", output,
+               "--repeat", str(args.repeat), "--shapes", *args.shapes, "--sizes", *map(str, args.sizes)]
+    try:
+        subprocess.run(command, check=True, env=env, cwd=workdir)
+    finally:
+        if revision != WORKTREE:
+            subprocess.run(["git", "-C", REPO_DIR, "worktree", "remove", "--force", source], check=False)
+    with open(output) as handle:
+        return json.load(handle)
+
+
+def _report(base: dict, head: dict, args: argparse.Namespace) -> int:
+    """Prints the comparison table and returns the number of regressions."""
+    regressions = 0
+    print(f"{'dataset':<20}{'stage':<22}{'base s':>10}{'head s':>10}{'ratio':>8}"
+          f"{'base MiB':>11}{'head MiB':>11}{'ratio':>8}")
+    for key in base:
+        for stage, old in base[key].items():
+            if stage not in head.get(key, {}):
+                continue
+            new = head[key][stage]
+            if old is None or new is None:
+                missing = " and ".join(side for side, result in (("base", old), ("head", new)) if result is None)
+                print(f"{key:<20}{stage:<22}  skipped: not available in {missing}")
+                continue
+            time_ratio = new["time"] / old["time"] if old["time"] else float("nan")
+            mem_ratio = new["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else float("nan")
+            flag = ""
+            if time_ratio > args.factor or mem_ratio > args.factor:
+                flag, regressions = "  !", regressions + 1
+            elif time_ratio < 1 / args.factor or mem_ratio < 1 / args.factor:
+                flag = "  +"
+            print(f"{key:<20}{stage:<22}{old['time']:>10.4f}{new['time']:>10.4f}{time_ratio:>8.2f}"
+                  f"{old['peak_bytes'] / 2 ** 20:>11.1f}{new['peak_bytes'] / 2 ** 20:>11.1f}{mem_ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", nargs="?", help="Baseline git revision.")
+    parser.add_argument("head", nargs="?", default="HEAD", help="Revision to compare (default HEAD).")
+    parser.add_argument("--worktree", action="store_true", help="Compare BASE against the uncommitted working tree.")
+    parser.add_argument("--shapes", nargs="+", default=["data10d", "iris"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[250, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--factor", type=float, default=1.1,
+                        help="Ratio above which a change is reported as a regression (default 1.1).")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        _measure(args)
+        return 0
+    if args.base is None:
+        parser.error("the base revision is required")
+    with tempfile.TemporaryDirectory() as workdir:
+        base = _run_revision(args.base, args, workdir)
+        head = _run_revision(WORKTREE if args.worktree else args.head, args, workdir)
+    regressions = _report(base, head, args)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Synthetic datasets and stage accessors shared by the asv suite and the standalone runner.
+
+The datasets mimic the example files: ``data10d`` has 10 features and 5 clusters like
+``examples/data/Data10D_250.csv`` and ``iris`` has 4 features and 3 clusters like
+``examples/data/iris.csv``. Following the examples, ``n_neighbors`` is the number of rows
+divided by the number of clusters.
+"""
+
+import functools
+import inspect
+import time
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from riemannian_stats import RiemannianAnalysis
+
+SHAPES: Dict[str, Tuple[int, int]] = {
+    "data10d": (10, 5),
+    "iris": (4, 3),
+}
+
+STAGE_NAMES = ("graph", "rho", "diff", "distance", "covariance", "correlation", "components",
+               "variables_components")
+
+
+def make_dataset(shape: str, n_samples: int, n_features: int = None, seed: int = 0) -> Tuple[pd.DataFrame, int]:
+    """
+    Builds a clustered Gaussian dataset with the feature/cluster layout of one of the example files.
+
+    Returns the feature DataFrame and the number of clusters.
+    """
+    default_features, n_clusters = SHAPES[shape]
+    n_features = n_features or default_features
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=5.0, size=(n_clusters, n_features))
+    labels = rng.integers(n_clusters, size=n_samples)
+    values = centers[labels] + rng.normal(size=(n_samples, n_features))
+    return pd.DataFrame(values, columns=[f"var{j + 1}" for j in range(n_features)]), n_clusters
+
+
+def build_analysis(shape: str, n_samples: int, n_features: int = None,
+                   similarity: str = "umap") -> Tuple[RiemannianAnalysis, Dict]:
+    """
+    Fits a RiemannianAnalysis on a synthetic dataset and precomputes the inputs of the downstream stages.
+
+    ``similarity`` is only passed when it is not the default "umap", so revisions from before the similarity
+    backends still build; for those any other backend raises ``NotImplementedError``, which asv reports as skipped.
+    """
+    options = {}
+    if similarity != "umap":
+        if "similarity" not in inspect.signature(RiemannianAnalysis).parameters:
+            raise NotImplementedError(f"RiemannianAnalysis has no similarity backends; {similarity!r} is unavailable.")
+        options["similarity"] = similarity
+    data, n_clusters = make_dataset(shape, n_samples, n_features)
+    analysis = RiemannianAnalysis(data, n_neighbors=max(2, n_samples // n_clusters), **options)
+    corr = analysis.riemannian_correlation_matrix()
+    components = analysis.riemannian_components(corr)
+    return analysis, {"corr": corr, "components": components}
+
+
+# Methods behind each stage, newest name first. compare.py and asv run this file against older revisions, so each
+# stage calls whichever name the measured revision defines and is skipped when it defines none of them.
+STAGE_METHODS: Dict[str, Tuple[str, ...]] = {
+    # Before the sparse graph the graph stage returned the dense similarity matrix.
+    "graph": ("_RiemannianAnalysis__calculate_umap_graph", "_RiemannianAnalysis__calculate_umap_graph_similarities"),
+    "rho": ("_RiemannianAnalysis__calculate_rho_matrix",),
+    "diff": ("_RiemannianAnalysis__riemannian_vector_difference",),
+    "distance": ("_RiemannianAnalysis__calculate_umap_distance_matrix",),
+    "covariance": ("_riemannian_covariance_matrix",),
+    "correlation": ("riemannian_correlation_matrix",),
+    "components": ("riemannian_components",),
+    "variables_components": ("riemannian_correlation_variables_components",),
+}
+# Context entries passed to the stages that take the output of an earlier one.
+_STAGE_INPUTS: Dict[str, Tuple[str, ...]] = {
+    "components": ("corr",),
+    "variables_components": ("components",),
+}
+
+
+def stage_method(stage: str, target=RiemannianAnalysis) -> Callable:
+    """
+    Returns the method running ``stage`` on ``target``, a RiemannianAnalysis instance or the class itself.
+
+    Raises ``NotImplementedError``, which asv reports as a skipped benchmark, when the revision lacks the stage.
+    """
+    for name in STAGE_METHODS[stage]:
+        method = getattr(target, name, None)
+        if method is not None:
+            return method
+    raise NotImplementedError(f"Stage {stage!r} is not available in this revision "
+                              f"(none of {', '.join(STAGE_METHODS[stage])}).")
+
+
+def run_stage(stage: str, analysis: RiemannianAnalysis, context: Dict) -> object:
+    """Runs one stage on a fitted analysis with its inputs from ``context``."""
+    return stage_method(stage, analysis)(*(context[key] for key in _STAGE_INPUTS.get(stage, ())))
+
+
+STAGES: Dict[str, Callable[[RiemannianAnalysis, Dict], object]] = {
+    stage: functools.partial(run_stage, stage) for stage in STAGE_NAMES
+}
+
+
+def measure(stage: str, analysis: RiemannianAnalysis, context: Dict, repeat: int = 3) -> Dict[str, float]:
+    """
+    Runs one stage ``repeat`` times and returns its best wall time (seconds) and its peak traced allocation (bytes).
+
+    Raises ``NotImplementedError`` when the revision lacks the stage.
+    """
+    func = STAGES[stage]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(analysis, context)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func(analysis, context)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"time": best, "peak_bytes": float(peak)}
@@ -10,9 +10,17 @@ This package provides tools for Riemannian statistical analysis using UMAP, incl
 
 # Import with original class names (PascalCase)
 from .data_processing import DataProcessing
-from .riemannian_analysis import RiemannianAnalysis
+from .riemannian_analysis import GroupComponents, RiemannianAnalysis
 from .visualization import Visualization
 from .utilities import Utilities
+from .instrumentation import CancellationToken, FitCancelled, StageProfiler, StageStats, TqdmProgress
+from .planning import ComputationPlan, InsufficientMemoryError
+from .neighbors import RiemannianNeighbors
+from .condensed import CondensedMatrix
+from .results import RiemannianPCAResult
+from .similarity import FuzzyKNNSimilarity, GaussianKNNSimilarity, SimilarityBackend, UMAPSimilarity
+from .streaming import StreamingRiemannianCovariance, StreamingRiemannianPCA
+from .report import Report
 
 # Also provide lowercase aliases for user-friendly imports
 from .data_processing import DataProcessing as data_processing
@@ -24,8 +32,26 @@ __all__ = [
     # PascalCase
     "DataProcessing",
     "RiemannianAnalysis",
+    "GroupComponents",
     "Visualization",
     "Utilities",
+    "StageProfiler",
+    "StageStats",
+    "CancellationToken",
+    "FitCancelled",
+    "TqdmProgress",
+    "ComputationPlan",
+    "InsufficientMemoryError",
+    "StreamingRiemannianCovariance",
+    "StreamingRiemannianPCA",
+    "RiemannianNeighbors",
+    "CondensedMatrix",
+    "RiemannianPCAResult",
+    "SimilarityBackend",
+    "UMAPSimilarity",
+    "FuzzyKNNSimilarity",
+    "GaussianKNNSimilarity",
+    "Report",
 
     # lowercase aliases
     "data_processing",
@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .data_processing import DataProcessing
+from .instrumentation import CancellationToken
+
+
+class _Flight:
+    """One computation running in an executor, shared by every coroutine awaiting the same key."""
+
+    def __init__(self, future: "asyncio.Future", token: CancellationToken) -> None:
+        self.future = future
+        self.token = token
+        self.waiters = 0
+
+
+# Computations in flight per (event loop, request key); an entry is removed once its computation ends.
+_IN_FLIGHT: Dict[Hashable, _Flight] = {}
+
+
+async def run_shared(key: Hashable, func: Callable[[CancellationToken], Any],
+                     executor: Optional[Executor] = None) -> Any:
+    """
+    Runs `func(token)` in `executor` and returns its result, sharing one run among concurrent identical requests.
+
+    Coroutines awaiting the same key while a computation is in flight join it instead of starting another.
+    A cancelled coroutine only stops waiting. Once every waiter is cancelled, the token is cancelled so the
+    computation stops at its next block, and the next request with that key starts afresh.
+
+    Parameters:
+        key (Hashable): Identifies identical requests.
+        func (Callable): The blocking computation; it must check the token it is given.
+        executor (concurrent.futures.Executor, optional): Where `func` runs. Defaults to the loop's default
+            executor.
+
+    Returns:
+        Any: The result of `func`.
+    """
+    loop = asyncio.get_running_loop()
+    key = (loop, key)
+    flight = _IN_FLIGHT.get(key)
+    if flight is None:
+        token = CancellationToken()
+        flight = _Flight(loop.run_in_executor(executor, func, token), token)
+        _IN_FLIGHT[key] = flight
+        flight.future.add_done_callback(lambda future: _finish(key, flight))
+    flight.waiters += 1
+    try:
+        return await asyncio.shield(flight.future)
+    except asyncio.CancelledError:
+        if flight.waiters == 1 and not flight.future.done():
+            flight.token.cancel()
+            _finish(key, flight)
+        raise
+    finally:
+        flight.waiters -= 1
+
+
+def _finish(key: Hashable, flight: _Flight) -> None:
+    """Unregisters a flight; the exception of a run nobody awaits any more is marked as retrieved."""
+    if _IN_FLIGHT.get(key) is flight:
+        del _IN_FLIGHT[key]
+    if flight.future.done() and not flight.future.cancelled():
+        flight.future.exception()
+
+
+def request_key(data: Any, params: Mapping[str, Any]) -> str:
+    """
+    Returns a digest identifying a fit request: the data values, labels and dtype plus the parameters.
+
+    DataFrame columns are hashed one by one where they are stored, so the key costs no copy of the data;
+    other inputs are hashed after `DataProcessing.to_float_array`, which does not copy float arrays either.
+
+    Parameters:
+        data (np.ndarray, pd.DataFrame, pyarrow.Table or scipy.sparse matrix): The input data.
+        params (Mapping[str, Any]): Constructor arguments; compared through their repr.
+
+    Returns:
+        str: Hex digest of the request.
+    """
+    digest = hashlib.sha1()
+    if isinstance(data, pd.DataFrame):
+        digest.update(repr((data.shape, [str(dtype) for dtype in data.dtypes], list(data.columns),
+                            sorted(params.items()))).encode())
+        digest.update(pd.util.hash_pandas_object(data.index, index=False).to_numpy().tobytes())
+        for position in range(data.shape[1]):
+            column = data.iloc[:, position]
+            if isinstance(column.dtype, np.dtype) and column.dtype.kind in "biuf":
+                digest.update(memoryview(np.ascontiguousarray(column.to_numpy())).cast("B"))
+            else:
+                digest.update(pd.util.hash_pandas_object(column, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    values, columns, index = DataProcessing.to_float_array(data)
+    digest.update(repr((values.shape, values.dtype.str, list(columns), sorted(params.items()))).encode())
+    digest.update(pd.util.hash_pandas_object(index, index=False).to_numpy().tobytes())
+    if sparse.issparse(values):
+        for array in (values.indptr, values.indices, values.data):
+            digest.update(memoryview(np.ascontiguousarray(array)).cast("B"))
+    else:
+        digest.update(memoryview(values).cast("B"))
+    return digest.hexdigest()
@@ -0,0 +1,181 @@
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .data_processing import DataProcessing
+from .planning import STRATEGIES
+from .similarity import SIMILARITY_BACKENDS
+from .utilities import Utilities
+
+TABLE_FORMATS = ("csv", "parquet")
+
+_BYTE_UNITS = {"": 1, "b": 1, "k": 10 ** 3, "kb": 10 ** 3, "kib": 2 ** 10, "m": 10 ** 6, "mb": 10 ** 6,
+               "mib": 2 ** 20, "g": 10 ** 9, "gb": 10 ** 9, "gib": 2 ** 30, "t": 10 ** 12, "tb": 10 ** 12,
+               "tib": 2 ** 40}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Returns the argument parser of the `riemannian-stats` command."""
+    parser = argparse.ArgumentParser(
+        prog="riemannian-stats",
+        description="Runs the Riemannian PCA pipeline on a data file and writes the components, the variable "
+                    "correlations and the inertia table, plus optional plots, without opening any window.")
+    parser.add_argument("input", help="CSV, Parquet, Feather or .npy file with one row per observation.")
+    parser.add_argument("-o", "--output-dir", default="riemannian_stats_output",
+                        help="Directory for the output files (default: %(default)s).")
+    parser.add_argument("--name", help="Prefix of the output files (default: the input file name).")
+    parser.add_argument("--label-column", action="append", default=[],
+                        help="Non-feature column such as 'cluster'; repeat for several. The first one colours "
+                             "the cluster plots.")
+    parser.add_argument("--separator", default=";", help="CSV field delimiter (default: %(default)r).")
+    parser.add_argument("--decimal", default=".", help="CSV decimal mark (default: %(default)r).")
+    parser.add_argument("--n-neighbors", type=int, default=3, help="UMAP neighbourhood size (default: 3).")
+    parser.add_argument("--min-dist", type=float, default=0.1, help="UMAP min_dist (default: 0.1).")
+    parser.add_argument("--metric", default="euclidean", help="UMAP metric (default: %(default)s).")
+    parser.add_argument("--similarity", choices=tuple(SIMILARITY_BACKENDS), default="umap",
+                        help="Backend of the similarity graph; the kNN backends skip UMAP and numba "
+                             "(default: %(default)s).")
+    parser.add_argument("--dtype", choices=("float32", "float64"), default="float64",
+                        help="Float type of the features (default: %(default)s).")
+    parser.add_argument("--n-jobs", type=int, help="Threads for the distance and covariance stages (-1: all CPUs).")
+    parser.add_argument("--memory-budget", type=parse_bytes,
+                        help="Memory the analysis may use, e.g. 4GiB or 500MB (default: 80%% of available).")
+    parser.add_argument("--strategy", choices=("auto",) + STRATEGIES, default="auto",
+                        help="Storage of the pairwise matrices (default: %(default)s).")
+    parser.add_argument("--cache-dir",
+                        help="Directory for the parsed-CSV sidecar cache and the compiled UMAP kernels, reused "
+                             "by later runs. A NUMBA_CACHE_DIR already set takes precedence for the kernels.")
+    parser.add_argument("--format", choices=TABLE_FORMATS, default="csv", dest="table_format",
+                        help="Format of the output tables (default: %(default)s).")
+    parser.add_argument("--plots", type=lambda value: [fmt for fmt in value.split(",") if fmt],
+                        default=[], metavar="FORMATS",
+                        help="Comma-separated plot formats among png, svg and pdf (default: no plots).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print the wall time and CPU time of every stage to stderr.")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="Also trace the peak memory of every stage (slower; implies --profile).")
+    return parser
+
+
+def parse_bytes(value: str) -> int:
+    """
+    Parses a byte count such as "2147483648", "500MB" or "4GiB".
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a size.
+    """
+    match = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*([a-zA-Z]*)\s*", value)
+    if match is None or match.group(2).lower() not in _BYTE_UNITS:
+        raise argparse.ArgumentTypeError(f"invalid size {value!r}; use e.g. 500MB or 4GiB")
+    return int(float(match.group(1)) * _BYTE_UNITS[match.group(2).lower()])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Entry point of the `riemannian-stats` command.
+
+    Parameters:
+        argv (Sequence[str], optional): Command-line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: Exit status (0 on success, 1 on an error in the data or the environment).
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        written = run(args)
+    except (OSError, ValueError, ImportError, MemoryError) as error:
+        print(f"riemannian-stats: error: {error}", file=sys.stderr)
+        return 1
+    for path in written:
+        print(path)
+    return 0
+
+
+def run(args: argparse.Namespace) -> List[str]:
+    """
+    Runs the pipeline described by parsed arguments and returns the written file paths.
+
+    Raises:
+        ValueError: If the input or an option is invalid.
+        OSError: If a file cannot be read or written.
+        ImportError: If Parquet support (pyarrow) is needed but missing.
+    """
+    # Imported here so that `--help` and argument errors stay fast.
+    from .riemannian_analysis import RiemannianAnalysis
+
+    name = args.name or os.path.splitext(os.path.basename(args.input))[0]
+    timings: Dict[str, float] = {}
+
+    if args.cache_dir and args.similarity == "umap":
+        timings["warmup"] = RiemannianAnalysis.warmup(cache_dir=os.path.join(args.cache_dir, "numba"),
+                                                      metric=args.metric)
+    start = time.perf_counter()
+    features, labels = DataProcessing.load_features(
+        args.input, label_columns=args.label_column, separator=args.separator, decimal=args.decimal,
+        dtype=np.dtype(args.dtype), cache=args.cache_dir or False)
+    timings["load"] = time.perf_counter() - start
+
+    analysis = RiemannianAnalysis(features, n_neighbors=args.n_neighbors, min_dist=args.min_dist,
+                                  metric=args.metric, profile_memory=args.profile_memory, strategy=args.strategy,
+                                  memory_budget=args.memory_budget, n_jobs=args.n_jobs,
+                                  similarity=args.similarity)
+    corr_matrix = analysis.riemannian_correlation_matrix()
+    components = np.real(analysis.riemannian_components(corr_matrix))
+    correlations = analysis.riemannian_correlation_variables_components(components)
+    spectrum = Utilities.pca_spectrum(corr_matrix)
+    inertia, cumulative = Utilities.pca_inertia(spectrum)
+
+    component_names = [f"Component_{i + 1}" for i in range(components.shape[1])]
+    tables = {
+        "components": pd.DataFrame(components, index=features.index, columns=component_names),
+        "correlations": correlations,
+        "inertia": pd.DataFrame({"eigenvalue": spectrum, "inertia": inertia, "cumulative_inertia": cumulative},
+                                index=pd.Index(component_names, name="component")),
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+    written = []
+    start = time.perf_counter()
+    for table_name, table in tables.items():
+        path = os.path.join(args.output_dir, f"{name}_{table_name}.{args.table_format}")
+        if args.table_format == "parquet":
+            table.to_parquet(path)
+        else:
+            table.to_csv(path)
+        written.append(path)
+    timings["write"] = time.perf_counter() - start
+
+    if args.plots:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        from .report import Report
+
+        clusters = None if labels is None else (labels.iloc[:, 0] if labels.ndim == 2 else labels)
+        start = time.perf_counter()
+        plots = Report.render(analysis, args.output_dir, name=name, clusters=clusters, formats=args.plots,
+                              corr_matrix=corr_matrix, components=components)
+        timings["plots"] = time.perf_counter() - start
+        written.extend(path for paths in plots.values() for path in paths)
+
+    if args.profile or args.profile_memory:
+        print(_profile_table(timings, analysis.profile_), file=sys.stderr)
+    return written
+
+
+def _profile_table(timings: Dict[str, float], stages: Dict) -> str:
+    """Formats the pipeline timings and the per-stage statistics of the analysis as a text table."""
+    lines = [f"{'stage':<22}{'wall [s]':>10}{'cpu [s]':>10}{'peak [MiB]':>12}"]
+    rows = [(name, seconds, None, None) for name, seconds in timings.items() if name in ("warmup", "load")]
+    rows += [(name, stats.wall_time, stats.cpu_time, stats.peak_memory) for name, stats in stages.items()]
+    rows += [(name, seconds, None, None) for name, seconds in timings.items() if name in ("write", "plots")]
+    for name, wall, cpu, peak in rows:
+        cpu_text = "" if cpu is None else f"{cpu:.3f}"
+        peak_text = "" if peak is None else f"{peak / 2 ** 20:.1f}"
+        lines.append(f"{name:<22}{wall:>10.3f}{cpu_text:>10}{peak_text:>12}")
+    return "\n".join(lines)
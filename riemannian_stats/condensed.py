@@ -0,0 +1,174 @@
+from typing import Any, Optional, Union
+
+import numpy as np
+from scipy import sparse
+
+
+class CondensedMatrix:
+    """
+    A symmetric (n, n) matrix stored as its strict upper triangle, in the condensed layout of
+    `scipy.spatial.distance.pdist`.
+
+    Entry (i, j) with i < j is stored at position n*i - i*(i+1)/2 + (j - i - 1) of a 1-D array of length
+    n*(n-1)/2. The diagonal holds one constant value (0 for distances, 1 for Rho off the graph), so the
+    storage is half of the dense matrix. The upper part of every row is a contiguous slice of the array.
+
+    Parameters:
+        data (np.ndarray): The condensed upper triangle, length n*(n-1)/2.
+        n (int): Number of rows (and columns) of the full matrix.
+        diagonal (float, optional): Value of every diagonal entry. Default is 0.0.
+
+    Methods:
+        index(i, j) -> np.ndarray: Positions of entries (i, j), i != j, in `data`.
+        upper_row(i) -> np.ndarray: View of entries (i, i+1), ..., (i, n-1).
+        row(i) -> np.ndarray: Full row i as a new array.
+        rows(start, stop) -> np.ndarray: Full rows [start, stop) as a dense block.
+        row_sums() -> np.ndarray: Sum of every row, without materializing the matrix.
+        to_dense() -> np.ndarray: The full (n, n) matrix.
+    """
+
+    def __init__(self, data: np.ndarray, n: int, diagonal: float = 0.0) -> None:
+        data = np.asarray(data)
+        if data.ndim != 1 or data.shape[0] != n * (n - 1) // 2:
+            raise ValueError(f"A condensed matrix of size {n} needs {n * (n - 1) // 2} entries, got {data.shape}.")
+        self.data = data
+        self.n = n
+        self.diagonal = diagonal
+
+    @classmethod
+    def empty(cls, n: int, dtype=np.float64, diagonal: float = 0.0) -> "CondensedMatrix":
+        """Returns an uninitialized condensed matrix of size n."""
+        return cls(np.empty(n * (n - 1) // 2, dtype=dtype), n, diagonal)
+
+    @classmethod
+    def from_dense(cls, matrix: np.ndarray) -> "CondensedMatrix":
+        """
+        Condenses a symmetric matrix; only its upper triangle and first diagonal entry are read.
+
+        Parameters:
+            matrix (np.ndarray): Square symmetric matrix with a constant diagonal.
+
+        Returns:
+            CondensedMatrix: The condensed copy.
+        """
+        matrix = np.asarray(matrix)
+        if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+            raise ValueError("Only square matrices can be condensed.")
+        n = matrix.shape[0]
+        condensed = cls.empty(n, dtype=matrix.dtype, diagonal=matrix[0, 0].item() if n else 0.0)
+        for i in range(n - 1):
+            condensed.upper_row(i)[:] = matrix[i, i + 1:]
+        return condensed
+
+    @classmethod
+    def from_graph_complement(cls, graph: sparse.spmatrix, dtype=np.float64) -> "CondensedMatrix":
+        """
+        Builds the condensed matrix 1 - graph, e.g. the Rho matrix from the UMAP similarity graph.
+
+        Parameters:
+            graph (scipy.sparse.spmatrix): Symmetric sparse similarity graph.
+            dtype: Dtype of the result. Default is float64.
+
+        Returns:
+            CondensedMatrix: Condensed 1 - graph, with 1 on the diagonal.
+        """
+        upper = sparse.triu(graph, k=1, format="coo")
+        condensed = cls(np.ones(graph.shape[0] * (graph.shape[0] - 1) // 2, dtype=dtype), graph.shape[0], 1.0)
+        condensed.data[condensed.index(upper.row, upper.col)] = 1 - upper.data
+        return condensed
+
+    @property
+    def shape(self):
+        return self.n, self.n
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.data.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def index(self, i: Any, j: Any) -> Union[int, np.ndarray]:
+        """
+        Returns the position of entries (i, j) in `data`, in O(1) per entry.
+
+        Parameters:
+            i (int or array-like): Row positions.
+            j (int or array-like): Column positions, with j != i.
+
+        Returns:
+            int or np.ndarray: Positions in the condensed array.
+
+        Raises:
+            ValueError: If an entry lies on the diagonal, which is not stored.
+        """
+        i, j = np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64)
+        if np.any(i == j):
+            raise ValueError("Diagonal entries are not stored in a condensed matrix.")
+        low, high = np.minimum(i, j), np.maximum(i, j)
+        position = self.n * low - low * (low + 1) // 2 + (high - low - 1)
+        return int(position) if position.ndim == 0 else position
+
+    def __getitem__(self, key: tuple) -> Any:
+        """Returns entries (i, j), including diagonal ones; `key` is a pair of integers or index arrays."""
+        i, j = np.broadcast_arrays(np.asarray(key[0]), np.asarray(key[1]))
+        off_diagonal = i != j
+        values = np.full(i.shape, self.diagonal, dtype=self.dtype)
+        values[off_diagonal] = self.data[self.index(i[off_diagonal], j[off_diagonal])]
+        return values.item() if values.ndim == 0 else values
+
+    def upper_row(self, i: int) -> np.ndarray:
+        """Returns a view of entries (i, i+1), ..., (i, n-1)."""
+        start = self.n * i - i * (i + 1) // 2
+        return self.data[start:start + self.n - i - 1]
+
+    def row(self, i: int) -> np.ndarray:
+        """Returns row i of the full matrix as a new array of length n."""
+        row = np.empty(self.n, dtype=self.dtype)
+        if i:
+            row[:i] = self.data[self.index(np.arange(i), i)]
+        row[i] = self.diagonal
+        row[i + 1:] = self.upper_row(i)
+        return row
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        """Returns rows [start, stop) of the full matrix as a dense (stop - start, n) block."""
+        block = np.empty((stop - start, self.n), dtype=self.dtype)
+        for offset, i in enumerate(range(start, stop)):
+            block[offset] = self.row(i)
+        return block
+
+    def row_sums(self) -> np.ndarray:
+        """Returns the sum of every row (equal to the column sums), reading every stored entry once."""
+        sums = np.full(self.n, self.diagonal, dtype=np.float64)
+        for i in range(self.n - 1):
+            upper = self.upper_row(i)
+            sums[i] += upper.sum(dtype=np.float64)
+            sums[i + 1:] += upper
+        return sums
+
+    def to_dense(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Materializes the full (n, n) matrix.
+
+        Parameters:
+            out (np.ndarray, optional): Array of shape (n, n) to write into, e.g. a memory-mapped file.
+
+        Returns:
+            np.ndarray: The full symmetric matrix.
+        """
+        matrix = np.empty((self.n, self.n), dtype=self.dtype) if out is None else out
+        for i in range(self.n):
+            upper = self.upper_row(i)
+            matrix[i, i] = self.diagonal
+            matrix[i, i + 1:] = upper
+            matrix[i + 1:, i] = upper
+        return matrix
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        matrix = self.to_dense()
+        return matrix if dtype is None else matrix.astype(dtype, copy=False)
+
+    def __repr__(self) -> str:
+        return f"CondensedMatrix(n={self.n}, dtype={self.dtype}, diagonal={self.diagonal})"
@@ -1,27 +1,498 @@
+import hashlib
+import json
+import os
+import warnings
+from typing import Any, Iterator, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
 import pandas as pd
+from scipy import sparse
+
+_PARQUET_SUFFIXES = (".parquet", ".pq")
+_FEATHER_SUFFIXES = (".feather", ".arrow", ".ipc")
+# Rows parsed to find the numeric columns before a CSV is read with a downcast dtype.
+_CSV_SNIFF_ROWS = 1000
+# Bumped whenever the layout of the binary CSV cache changes, invalidating older sidecars.
+_CACHE_VERSION = 2
 
 
 class DataProcessing:
     """
     Utility class for loading and preparing tabular data.
 
-    Provides static methods for reading CSV files into pandas DataFrames, with
-    support for custom delimiters and decimal formats. Useful for standardized
-    data loading in preprocessing pipelines.
+    Provides static methods for reading CSV, Parquet, Feather and .npy files into pandas
+    DataFrames, with support for custom delimiters and decimal formats, column selection,
+    float32 downcasting and splitting off label columns, and for converting any
+    supported tabular input into the contiguous float array used internally by
+    the analysis classes. Useful for standardized data loading in preprocessing pipelines.
     """
 
     @staticmethod
-    def load_data(filepath: str, separator: str = ";", decimal: str = ".") -> pd.DataFrame:
+    def load_data(filepath: str, separator: str = ";", decimal: str = ".", usecols: Optional[Sequence] = None,
+                  dtype: Any = None, engine: Optional[str] = None, mmap: bool = True,
+                  cache: Union[bool, str, os.PathLike] = False) -> pd.DataFrame:
         """
-        Load a CSV file into a pandas DataFrame.
+        Load a CSV, Parquet, Feather or .npy file into a pandas DataFrame.
+
+        The format is chosen from the file extension (".parquet"/".pq", ".feather"/".arrow"/".ipc", ".npy");
+        any other extension is read as CSV.
 
         Parameters:
-            filepath (str): Path to the CSV file to be loaded.
+            filepath (str): Path to the file to be loaded.
             separator (str, optional): Field delimiter used in the CSV file. Default is ";".
             decimal (str, optional): Character to recognize as decimal point. Default is ".".
+            usecols (Sequence, optional): Columns to read (names, or integer positions for .npy files).
+                Unlisted columns are skipped by the parser. Default is None (all columns).
+            dtype (optional): Float dtype for the numeric columns (e.g. np.float32 to halve memory), or a
+                {column: dtype} mapping passed to the parser. CSV columns are parsed directly into this dtype.
+                Default is None (float64).
+            engine (str, optional): CSV parser engine: "c" (default), "python" or "pyarrow" (multi-threaded).
+            mmap (bool, optional): Memory-map .npy files instead of reading them into RAM. Default is True.
+            cache (bool or str, optional): Cache parsed CSV files in a binary sidecar. True writes it next to
+                the CSV; a path writes it to that directory. The sidecar holds the float columns as a .npy file,
+                the remaining columns and the labels as a Parquet file (which needs pyarrow), and a JSON
+                fingerprint; nothing is unpickled. The fingerprint records the CSV's path, size and
+                modification time and the parse options. Later loads with the
+                same options memory-map the values (copy-on-write) instead of parsing the text. The cache is
+                rebuilt automatically when the CSV changes. Ignored for binary formats. Default is False.
 
         Returns:
             pd.DataFrame: DataFrame containing the parsed data from the file.
+
+        Raises:
+            ValueError: If a .npy file does not hold a two-dimensional array.
+        """
+        return DataProcessing._read(filepath, separator, decimal, usecols, dtype, engine, mmap, (), cache)
+
+    @staticmethod
+    def load_features(filepath: str, label_columns: Union[str, Sequence, None] = None, separator: str = ";",
+                      decimal: str = ".", usecols: Optional[Sequence] = None, dtype: Any = None,
+                      engine: Optional[str] = None, mmap: bool = True,
+                      cache: Union[bool, str, os.PathLike] = False
+                      ) -> Tuple[pd.DataFrame, Union[pd.Series, pd.DataFrame, None]]:
+        """
+        Load a file and split it into the numeric features used by `RiemannianAnalysis` and its label columns.
+
+        The file is parsed once: label columns (e.g. "cluster") keep their own type while every other column is
+        parsed as `dtype`. Accepts the same formats and options as `load_data`.
+
+        Parameters:
+            filepath (str): Path to the file to be loaded.
+            label_columns (str or Sequence, optional): Column(s) to split off, such as "cluster". Default is None.
+            separator (str, optional): Field delimiter used in the CSV file. Default is ";".
+            decimal (str, optional): Character to recognize as decimal point. Default is ".".
+            usecols (Sequence, optional): Columns to read; the label columns are added automatically.
+            dtype (optional): Float dtype for the feature columns, e.g. np.float32. Default is None (float64).
+            engine (str, optional): CSV parser engine: "c" (default), "python" or "pyarrow".
+            mmap (bool, optional): Memory-map .npy files instead of reading them into RAM. Default is True.
+            cache (bool or str, optional): Binary sidecar cache for CSV files, see `load_data`. Default is False.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.Series or pd.DataFrame or None]: The numeric feature columns and the labels
+            (a Series for a single label column, a DataFrame for several, None when no label column is given).
+
+        Raises:
+            ValueError: If a label column is missing or a remaining feature column is not numeric.
         """
+        labels = [label_columns] if isinstance(label_columns, (str, int)) else list(label_columns or [])
+        if usecols is not None:
+            usecols = list(usecols) + [label for label in labels if label not in usecols]
+        data = DataProcessing._read(filepath, separator, decimal, usecols, dtype, engine, mmap, labels, cache)
+        missing = [str(label) for label in labels if label not in data.columns]
+        if missing:
+            raise ValueError(f"Label column(s) not found in {filepath}: {', '.join(missing)}.")
+        features = data.copy(deep=False)
+        for label in labels:
+            # Deleting a column only rewrites its own block, so memory-mapped feature columns stay mapped.
+            del features[label]
+        non_numeric = [str(column) for column, column_dtype in features.dtypes.items()
+                       if not (pd.api.types.is_numeric_dtype(column_dtype)
+                               or pd.api.types.is_bool_dtype(column_dtype))]
+        if non_numeric:
+            raise ValueError(f"Non-numeric feature column(s): {', '.join(non_numeric)}; "
+                             f"pass them as label_columns or exclude them with usecols.")
+        if not labels:
+            return features, None
+        return features, data[labels[0]] if isinstance(label_columns, (str, int)) else data[labels]
+
+    @staticmethod
+    def iter_chunks(filepath: str, chunksize: int = 65536, separator: str = ";", decimal: str = ".",
+                    usecols: Optional[Sequence] = None, dtype: Any = None) -> Iterator[pd.DataFrame]:
+        """
+        Read a CSV, Parquet, Feather or .npy file as consecutive DataFrames of at most `chunksize` rows.
+
+        Only one chunk is held in memory at a time, so files larger than RAM can be streamed, e.g. into
+        `StreamingRiemannianPCA`. CSV files are parsed with `pd.read_csv(chunksize=...)`, Parquet files row
+        group by row group, Feather files batch by batch from a memory map, and .npy files as memory-mapped
+        row slices. Chunks keep the global row positions as their index.
+
+        Parameters:
+            filepath (str): Path to the file to be read.
+            chunksize (int, optional): Maximum number of rows per chunk. Default is 65536.
+            separator (str, optional): Field delimiter used in the CSV file. Default is ";".
+            decimal (str, optional): Character to recognize as decimal point. Default is ".".
+            usecols (Sequence, optional): Columns to read (names, or integer positions for .npy files).
+            dtype (optional): Float dtype for the numeric columns, or a {column: dtype} mapping. Default is None.
+
+        Yields:
+            pd.DataFrame: The next chunk of rows.
+
+        Raises:
+            ValueError: If `chunksize` is not positive, a .npy file does not hold a two-dimensional array, or a
+                CSV column that is numeric in the rows sniffed for `dtype` holds text further down (the error
+                names the column).
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be a positive integer.")
+        suffix = os.path.splitext(str(filepath))[1].lower()
+        columns = None if usecols is None else list(usecols)
+        if suffix == ".npy":
+            values = np.load(filepath, mmap_mode="r")
+            if values.ndim != 2:
+                raise ValueError(f"{filepath} must hold a two-dimensional array, got {values.ndim} dimension(s).")
+            for start in range(0, values.shape[0], chunksize):
+                stop = min(start + chunksize, values.shape[0])
+                block = values[start:stop] if columns is None else values[start:stop, columns]
+                chunk = pd.DataFrame(np.array(block), index=pd.RangeIndex(start, stop),
+                                     columns=pd.RangeIndex(values.shape[1]) if columns is None else columns)
+                yield DataProcessing._cast(chunk, dtype)
+        elif suffix in _PARQUET_SUFFIXES or suffix in _FEATHER_SUFFIXES:
+            start = 0
+            for batch in DataProcessing._arrow_batches(filepath, suffix, chunksize, columns):
+                chunk = batch.to_pandas()
+                chunk.index = pd.RangeIndex(start, start + len(chunk))
+                start += len(chunk)
+                yield DataProcessing._cast(chunk, dtype)
+        else:
+            sniffed = dtype is not None and not isinstance(dtype, Mapping)
+            if sniffed:
+                dtype = DataProcessing._csv_dtypes(filepath, separator, decimal, usecols, dtype, ())
+            try:
+                with pd.read_csv(filepath, sep=separator, decimal=decimal, usecols=usecols, dtype=dtype,
+                                 chunksize=chunksize) as reader:
+                    yield from reader
+            except ValueError as error:
+                if not sniffed:
+                    raise
+                # Chunks already yielded cannot be re-typed, so name the offending columns instead.
+                mistyped = DataProcessing._non_numeric_csv_columns(filepath, separator, decimal, usecols,
+                                                                   list(dtype), chunksize)
+                raise ValueError(f"Column(s) {', '.join(map(str, mistyped)) or '?'} of {filepath} are numeric in "
+                                 f"the first {_CSV_SNIFF_ROWS} rows but hold non-numeric values further down; "
+                                 f"pass a {{column: dtype}} mapping or exclude them with usecols.") from error
+
+    @staticmethod
+    def _arrow_batches(filepath: str, suffix: str, chunksize: int, columns: Optional[list]) -> Iterator[Any]:
+        """Yields Arrow record batches of at most `chunksize` rows from a Parquet or Feather file."""
+        import pyarrow as pa
+
+        if suffix in _PARQUET_SUFFIXES:
+            import pyarrow.parquet as pq
+
+            yield from pq.ParquetFile(filepath).iter_batches(batch_size=chunksize, columns=columns)
+            return
+        reader = pa.ipc.open_file(pa.memory_map(str(filepath)))
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, chunksize):
+                yield batch.slice(start, chunksize)
+
+    @staticmethod
+    def _read(filepath: str, separator: str, decimal: str, usecols: Optional[Sequence], dtype: Any,
+              engine: Optional[str], mmap: bool, labels: Sequence,
+              cache: Union[bool, str, os.PathLike] = False) -> pd.DataFrame:
+        """Dispatch on the file extension; numeric columns other than `labels` are read as `dtype`."""
+        suffix = os.path.splitext(str(filepath))[1].lower()
+        if suffix == ".npy":
+            values = np.load(filepath, mmap_mode="r" if mmap else None)
+            if values.ndim != 2:
+                raise ValueError(f"{filepath} must hold a two-dimensional array, got {values.ndim} dimension(s).")
+            columns = pd.RangeIndex(values.shape[1]) if usecols is None else pd.Index(usecols)
+            if usecols is not None:
+                values = values[:, list(usecols)]
+            data = pd.DataFrame(values, columns=columns, copy=False)
+        elif suffix in _PARQUET_SUFFIXES:
+            data = pd.read_parquet(filepath, columns=None if usecols is None else list(usecols))
+        elif suffix in _FEATHER_SUFFIXES:
+            data = pd.read_feather(filepath, columns=None if usecols is None else list(usecols))
+        else:
+            def parse() -> pd.DataFrame:
+                if dtype is None or isinstance(dtype, Mapping):
+                    return pd.read_csv(filepath, sep=separator, decimal=decimal, usecols=usecols, dtype=dtype,
+                                       engine=engine)
+                csv_dtype = DataProcessing._csv_dtypes(filepath, separator, decimal, usecols, dtype, labels)
+                try:
+                    return pd.read_csv(filepath, sep=separator, decimal=decimal, usecols=usecols, dtype=csv_dtype,
+                                       engine=engine)
+                except ValueError:
+                    # A column that is numeric in the sniffed rows holds text further down: parse it untyped,
+                    # as without `dtype`, and downcast the columns that really are numeric.
+                    data = pd.read_csv(filepath, sep=separator, decimal=decimal, usecols=usecols, engine=engine)
+                    return DataProcessing._cast(data, dtype, labels)
+
+            if not cache:
+                return parse()
+            options = {"separator": separator, "decimal": decimal, "usecols": usecols, "dtype": _dtype_key(dtype),
+                       "engine": engine, "labels": list(labels)}
+            return _cached_csv(filepath, cache, options, parse)
+        return DataProcessing._cast(data, dtype, labels)
+
+    @staticmethod
+    def _cast(data: pd.DataFrame, dtype: Any, labels: Sequence = ()) -> pd.DataFrame:
+        """Casts the numeric columns other than `labels` to `dtype` (or applies a {column: dtype} mapping)."""
+        if dtype is None:
+            return data
+        if not isinstance(dtype, Mapping):
+            dtype = {column: dtype for column, column_dtype in data.dtypes.items()
+                     if column not in labels and pd.api.types.is_numeric_dtype(column_dtype)}
+        return data.astype(dtype, copy=False)
+
+    @staticmethod
+    def _csv_dtypes(filepath: str, separator: str, decimal: str, usecols: Optional[Sequence], dtype: Any,
+                    labels: Sequence) -> dict:
+        """Map every numeric CSV column except `labels` to `dtype`, sniffing the types from the first rows."""
+        sample = pd.read_csv(filepath, sep=separator, decimal=decimal, usecols=usecols, nrows=_CSV_SNIFF_ROWS)
+        return {column: dtype for column, column_dtype in sample.dtypes.items()
+                if column not in labels and pd.api.types.is_numeric_dtype(column_dtype)}
+
+    @staticmethod
+    def _non_numeric_csv_columns(filepath: str, separator: str, decimal: str, usecols: Optional[Sequence],
+                                 columns: Sequence, chunksize: int) -> list:
+        """Return the `columns` of a CSV that hold a non-numeric value in some chunk, scanning it untyped."""
+        found = []
+        with pd.read_csv(filepath, sep=separator, decimal=decimal, usecols=usecols, chunksize=chunksize) as reader:
+            for chunk in reader:
+                found.extend(column for column in columns if column not in found
+                             and not pd.api.types.is_numeric_dtype(chunk[column]))
+        return found
 
-        return pd.read_csv(filepath, sep=separator, decimal=decimal)
+    @staticmethod
+    def to_float_array(data: Any) -> Tuple[Union[np.ndarray, sparse.csr_matrix], pd.Index, pd.Index]:
+        """
+        Convert tabular input into a C-contiguous float array plus its column and index labels.
+
+        Supported inputs are 2D NumPy arrays, pandas DataFrames and pyarrow Tables (or RecordBatches).
+        The conversion copies at most once: a C-contiguous float32/float64 array, or a DataFrame wrapping
+        one, is returned as is, and other DataFrame or Arrow columns are written directly into a single
+        preallocated buffer.
+
+        SciPy sparse matrices and arrays are never densified: they become a float CSR matrix with sorted
+        indices and no duplicate entries (shared with the input when it already is one).
+
+        Parameters:
+            data (np.ndarray, pd.DataFrame, pyarrow.Table or scipy.sparse matrix): Input dataset with
+                observations as rows.
+
+        Returns:
+            Tuple[Union[np.ndarray, scipy.sparse.csr_matrix], pd.Index, pd.Index]: The (n_samples, n_features)
+            float array (CSR for sparse input), the column labels and the row labels. Arrays, sparse matrices
+            and Arrow tables get a default RangeIndex for the missing labels.
+
+        Raises:
+            ValueError: If the input is not two-dimensional or contains non-numeric columns.
+            TypeError: If the input type is not supported.
+        """
+        if isinstance(data, pd.DataFrame):
+            return DataProcessing._dataframe_to_array(data)
+        if _is_arrow_table(data):
+            return DataProcessing._arrow_to_array(data)
+        if sparse.issparse(data):
+            return DataProcessing._sparse_to_csr(data)
+        if isinstance(data, np.ndarray):
+            if data.ndim != 2:
+                raise ValueError(f"Input data must be two-dimensional, got an array with {data.ndim} dimension(s).")
+            if data.dtype not in (np.float32, np.float64):
+                if not (np.issubdtype(data.dtype, np.number) or data.dtype == np.bool_):
+                    raise ValueError(f"Input data must be numeric, got an array of dtype {data.dtype}.")
+                data = data.astype(np.float64, order="C")
+            values = np.ascontiguousarray(data)
+            return values, pd.RangeIndex(values.shape[1]), pd.RangeIndex(values.shape[0])
+        raise TypeError(
+            f"Unsupported data type {type(data).__name__}; expected a numpy.ndarray, pandas.DataFrame, pyarrow.Table "
+            "or scipy sparse matrix.")
+
+    @staticmethod
+    def _sparse_to_csr(data: Any) -> Tuple[sparse.csr_matrix, pd.Index, pd.Index]:
+        """Convert a SciPy sparse matrix or array into a canonical float CSR matrix."""
+        if data.ndim != 2:
+            raise ValueError(f"Input data must be two-dimensional, got a sparse array with {data.ndim} dimension(s).")
+        if not (np.issubdtype(data.dtype, np.number) or data.dtype == np.bool_):
+            raise ValueError(f"Input data must be numeric, got a sparse matrix of dtype {data.dtype}.")
+        if np.issubdtype(data.dtype, np.complexfloating):
+            raise ValueError("Input data must be real, got a complex sparse matrix.")
+        dtype = data.dtype if data.dtype in (np.float32, np.float64) else np.dtype(np.float64)
+        values = sparse.csr_matrix(data, dtype=dtype)
+        if not values.has_canonical_format:
+            # A CSR input shares indptr, indices and data with `values`, and sum_duplicates works in place.
+            values = values.copy()
+            values.sum_duplicates()
+        return values, pd.RangeIndex(values.shape[1]), pd.RangeIndex(values.shape[0])
+
+    @staticmethod
+    def _dataframe_to_array(data: pd.DataFrame) -> Tuple[np.ndarray, pd.Index, pd.Index]:
+        """
+        Return the values of a DataFrame as one C-contiguous float buffer, copying the columns into it unless
+        the frame already wraps a C-ordered float32/float64 array.
+        """
+        non_numeric = [str(column) for column, dtype in data.dtypes.items()
+                       if not (pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype))]
+        if non_numeric:
+            raise ValueError(f"Input data must be numeric; non-numeric column(s): {', '.join(non_numeric)}.")
+        dtype = _common_float_dtype(data.dtypes)
+        if data.shape[1] and all(column_dtype == dtype for column_dtype in data.dtypes):
+            # The columns of a frame wrapping a C-ordered array are one row apart; to_numpy() is then a view.
+            first = data.iloc[:, 0].to_numpy()
+            if data.shape[1] == 1 or first.strides[0] == data.shape[1] * dtype.itemsize:
+                values = data.to_numpy()
+                if values.flags.c_contiguous:
+                    return values, data.columns, data.index
+        values = np.empty(data.shape, dtype=dtype)
+        for j in range(data.shape[1]):
+            values[:, j] = data.iloc[:, j].to_numpy(dtype=dtype, na_value=np.nan)
+        return values, data.columns, data.index
+
+    @staticmethod
+    def _arrow_to_array(table: Any) -> Tuple[np.ndarray, pd.Index, pd.Index]:
+        """Copy the chunks of an Arrow table into one C-contiguous float buffer without going through pandas."""
+        import pyarrow as pa
+
+        non_numeric = [field.name for field in table.schema
+                       if not (pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+                               or pa.types.is_boolean(field.type))]
+        if non_numeric:
+            raise ValueError(f"Input data must be numeric; non-numeric column(s): {', '.join(non_numeric)}.")
+        dtype = _common_float_dtype([field.type.to_pandas_dtype() for field in table.schema])
+        values = np.empty((table.num_rows, table.num_columns), dtype=dtype)
+        for j in range(table.num_columns):
+            column = table.column(j)
+            chunks = column.chunks if hasattr(column, "chunks") else [column]
+            offset = 0
+            for chunk in chunks:
+                length = len(chunk)
+                values[offset:offset + length, j] = chunk.to_numpy(zero_copy_only=False)
+                offset += length
+        return values, pd.Index(table.schema.names), pd.RangeIndex(table.num_rows)
+
+
+def _is_arrow_table(data: Any) -> bool:
+    """Detects pyarrow Tables and RecordBatches without importing pyarrow."""
+    return type(data).__module__.startswith("pyarrow") and hasattr(data, "schema") and hasattr(data, "num_rows")
+
+
+def _common_float_dtype(dtypes) -> np.dtype:
+    """Keeps float32 when every column is float32, otherwise promotes to float64."""
+    dtypes = [getattr(dtype, "numpy_dtype", dtype) for dtype in dtypes]
+    if dtypes and all(dtype == np.float32 for dtype in dtypes):
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
+
+
+def _dtype_key(dtype: Any) -> Any:
+    """JSON-serializable description of a `dtype` option, used in the cache fingerprint."""
+    if dtype is None:
+        return None
+    if isinstance(dtype, Mapping):
+        return {str(column): str(np.dtype(value)) for column, value in dtype.items()}
+    return str(np.dtype(dtype))
+
+
+def _cached_csv(filepath: str, cache: Union[bool, str, os.PathLike], options: dict, parse) -> pd.DataFrame:
+    """
+    Loads a CSV through its binary sidecar, parsing it with `parse()` and (re)writing the sidecar when missing or stale.
+
+    The sidecar name is derived from the CSV path and the parse options, so each option set gets its own cache;
+    the JSON fingerprint stores the size and modification time of the CSV it was built from.
+    """
+    source_path = os.path.abspath(filepath)
+    stat = os.stat(source_path)
+    directory = os.path.dirname(source_path) if cache is True else os.fspath(cache)
+    key = hashlib.sha1(json.dumps([source_path, options], sort_keys=True, default=str).encode()).hexdigest()[:16]
+    base = os.path.join(directory, f"{os.path.basename(source_path)}.{key}.rscache")
+    fingerprint = {"version": _CACHE_VERSION, "path": source_path, "size": stat.st_size,
+                   "mtime_ns": stat.st_mtime_ns, "options": options}
+    data = _read_cache(base, json.loads(json.dumps(fingerprint, default=str)))
+    if data is not None:
+        return data
+    data = parse()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        _write_cache(base, fingerprint, data)
+    except (OSError, ValueError, ImportError) as error:
+        warnings.warn(f"Could not write the CSV cache for {filepath}: {error}", RuntimeWarning, stacklevel=4)
+    return data
+
+
+def _read_cache(base: str, fingerprint: dict) -> Optional[pd.DataFrame]:
+    """Returns the cached DataFrame when the sidecar exists and matches `fingerprint`, otherwise None."""
+    try:
+        with open(base + ".json") as handle:
+            meta = json.load(handle)
+        if meta.get("fingerprint") != fingerprint:
+            return None
+        prefix = f"{base}.{meta['token']}"
+        # allow_pickle stays False: the sidecar directory is user-supplied, so nothing in it is unpickled.
+        values = np.load(prefix + ".npy", mmap_mode="c")
+        other = pd.read_parquet(prefix + ".parquet") if meta["other_columns"] else None
+    except (OSError, ValueError, KeyError, TypeError, ImportError):
+        return None
+    index = pd.RangeIndex(meta["index"]["start"], meta["index"]["stop"], meta["index"]["step"])
+    if len(values) != len(index) or (other is not None and len(other) != len(index)):
+        return None
+    data = pd.DataFrame(values, index=index, columns=meta["float_columns"], copy=False)
+    # Inserting the remaining columns at their positions adds blocks without copying the memory-mapped one.
+    for position, column in enumerate(meta["columns"]):
+        if column in meta["other_columns"]:
+            data.insert(position, column, other[column].set_axis(index))
+    return data
+
+
+def _write_cache(base: str, fingerprint: dict, data: pd.DataFrame) -> None:
+    """
+    Writes the float columns sharing the most common float dtype to a .npy file, the other columns to a Parquet
+    file (which needs pyarrow) and the fingerprint, column order and index to `base`.json.
+
+    The data files carry a token that is new for every write, and `base`.json, which names that token, is
+    replaced last: it is the commit marker, so a reader only ever pairs a fingerprint with the files written
+    with it. The files of the previous sidecar are removed afterwards.
+
+    Raises:
+        ValueError: If the column names are not strings or the index is not a RangeIndex, as read_csv returns.
+    """
+    if not all(isinstance(column, str) for column in data.columns) or not isinstance(data.index, pd.RangeIndex):
+        raise ValueError("only string column names and a RangeIndex can be cached.")
+    float_dtypes = [dtype for dtype in data.dtypes if pd.api.types.is_float_dtype(dtype)
+                    and isinstance(dtype, np.dtype)]
+    float_dtype = max(set(float_dtypes), key=float_dtypes.count) if float_dtypes else np.dtype(np.float64)
+    is_float = [dtype == float_dtype for dtype in data.dtypes]
+    float_columns = list(data.columns[is_float])
+    other_columns = [column for column, keep in zip(data.columns, is_float) if not keep]
+    token = os.urandom(8).hex()
+    prefix, pending = f"{base}.{token}", f"{base}.json.{token}.tmp"
+    meta = {"fingerprint": fingerprint, "token": token, "columns": list(data.columns),
+            "float_columns": float_columns, "other_columns": other_columns,
+            "index": {"start": data.index.start, "stop": data.index.stop, "step": data.index.step}}
+    try:
+        with open(prefix + ".npy", "wb") as handle:
+            np.save(handle, np.ascontiguousarray(data[float_columns].to_numpy(dtype=float_dtype)))
+        if other_columns:
+            data[other_columns].reset_index(drop=True).to_parquet(prefix + ".parquet", index=False)
+        with open(pending, "w") as handle:
+            json.dump(meta, handle, default=str)
+    except BaseException:
+        for path in (prefix + ".npy", prefix + ".parquet", pending):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    try:
+        with open(base + ".json") as handle:
+            previous = json.load(handle).get("token")
+    except (OSError, ValueError, AttributeError):
+        previous = None
+    os.replace(pending, base + ".json")
+    if previous and previous != token:
+        for extension in (".npy", ".parquet"):
+            try:
+                os.remove(f"{base}.{previous}{extension}")
+            except OSError:
+                pass
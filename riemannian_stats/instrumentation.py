@@ -0,0 +1,203 @@
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+
+class StageStats(NamedTuple):
+    """
+    Resource usage of one pipeline stage.
+
+    Attributes:
+        wall_time (float): Elapsed wall-clock time in seconds.
+        cpu_time (float): CPU time consumed by the process in seconds (all threads).
+        peak_memory (int or None): Peak bytes allocated above the level at stage start, as traced by
+            tracemalloc (Python and NumPy allocations). None when memory tracking is disabled.
+    """
+    wall_time: float
+    cpu_time: float
+    peak_memory: Optional[int]
+
+
+Callback = Union[Callable[[str, StageStats], Any], Any]
+
+
+class FitCancelled(RuntimeError):
+    """Raised inside a computation when its CancellationToken has been cancelled."""
+
+
+class CancellationToken:
+    """
+    Thread-safe flag used to abort a long computation cooperatively.
+
+    The computation checks the token between blocks and raises `FitCancelled` once `cancel()` has been
+    called, typically from another thread (e.g. a job scheduler). Partially computed results are discarded.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """Requests cancellation of every computation using this token."""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Returns True once cancellation has been requested."""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raises:
+            FitCancelled: If cancellation has been requested.
+        """
+        if self._event.is_set():
+            raise FitCancelled("The computation was cancelled.")
+
+
+class TqdmProgress:
+    """
+    Stage callback that renders one tqdm progress bar per stage from `on_progress` events.
+
+    Parameters:
+        **tqdm_kwargs: Extra keyword arguments for `tqdm.tqdm` (e.g. `file`, `leave`, `disable`).
+
+    Raises:
+        ImportError: When instantiated without tqdm installed.
+    """
+
+    def __init__(self, **tqdm_kwargs: Any) -> None:
+        from tqdm.auto import tqdm
+
+        self._tqdm = tqdm
+        self._kwargs = tqdm_kwargs
+        self._bars: Dict[str, Any] = {}
+
+    def on_progress(self, name: str, done: int, total: int) -> None:
+        bar = self._bars.get(name)
+        if bar is None:
+            bar = self._bars[name] = self._tqdm(total=total, desc=name, **self._kwargs)
+        bar.update(done - bar.n)
+
+    def on_stage_end(self, name: str, stats: StageStats) -> None:
+        bar = self._bars.pop(name, None)
+        if bar is not None:
+            bar.close()
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time and (optionally) peak allocation for named pipeline stages and
+    forwards every measurement to user callbacks.
+
+    A callback is either a callable taking ``(name, stats)`` or an object providing any of the hooks
+    ``on_stage_start(name)``, ``on_progress(name, done, total)`` and ``on_stage_end(name, stats)``.
+    Stages may be nested; the peak memory of an outer stage includes the peaks of the stages it contains.
+
+    Parameters:
+        track_memory (bool): Whether to trace allocations with tracemalloc. Tracing slows down
+            allocation-heavy code, so it is off by default. Default is False.
+        callbacks (Sequence, optional): Callbacks notified at stage boundaries.
+        cancel_token (CancellationToken, optional): Token checked at every stage start and progress report.
+
+    Attributes:
+        records (Dict[str, StageStats]): Latest measurement of each stage, in completion order.
+        callbacks (List): The registered callbacks.
+    """
+
+    def __init__(self, track_memory: bool = False, callbacks: Optional[Sequence[Callback]] = None,
+                 cancel_token: Optional[CancellationToken] = None) -> None:
+        self.track_memory = track_memory
+        self.callbacks: List[Callback] = list(callbacks or [])
+        self.cancel_token = cancel_token
+        self.records: Dict[str, StageStats] = {}
+        self._frames: List[Dict[str, int]] = []
+        self._owns_tracing = False
+
+    def add_callback(self, callback: Callback) -> None:
+        """Registers a callback notified at the start and end of every stage."""
+        self.callbacks.append(callback)
+
+    def clear(self) -> None:
+        """Discards all recorded measurements."""
+        self.records.clear()
+
+    def check_cancelled(self, cancel_token: Optional[CancellationToken] = None) -> None:
+        """
+        Checks the profiler's token and ``cancel_token``, a token of the current call only.
+
+        Raises:
+            FitCancelled: If either cancellation token has been cancelled.
+        """
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+
+    def progress(self, name: str, done: int, total: int, cancel_token: Optional[CancellationToken] = None) -> None:
+        """
+        Reports that ``done`` of ``total`` units of stage ``name`` are complete, then checks for cancellation.
+
+        Raises:
+            FitCancelled: If the profiler's token or ``cancel_token`` has been cancelled.
+        """
+        self.notify("on_progress", name, done, total)
+        self.check_cancelled(cancel_token)
+
+    def notify(self, hook: str, *args: Any) -> None:
+        """Calls ``hook`` on every callback object that defines it."""
+        for callback in self.callbacks:
+            method = getattr(callback, hook, None)
+            if method is not None:
+                method(*args)
+
+    @contextmanager
+    def stage(self, name: str, cancel_token: Optional[CancellationToken] = None) -> Iterator[None]:
+        """
+        Context manager measuring the enclosed block as stage ``name``.
+
+        The measurement is stored in ``records`` and passed to the callbacks only when the block
+        completes without raising. ``cancel_token`` is checked at the start besides the profiler's token.
+        """
+        self.check_cancelled(cancel_token)
+        self.notify("on_stage_start", name)
+        frame = self._start_memory() if self.track_memory else None
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            peak_memory = self._stop_memory(frame) if frame is not None else None
+        stats = StageStats(wall_time, cpu_time, peak_memory)
+        self.records.pop(name, None)
+        self.records[name] = stats
+        for callback in self.callbacks:
+            if hasattr(callback, "on_stage_end"):
+                callback.on_stage_end(name, stats)
+            elif callable(callback):
+                callback(name, stats)
+
+    def _start_memory(self) -> Dict[str, int]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        current, peak = tracemalloc.get_traced_memory()
+        if self._frames:
+            self._frames[-1]["peak"] = max(self._frames[-1]["peak"], peak)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        frame = {"start": current, "peak": current}
+        self._frames.append(frame)
+        return frame
+
+    def _stop_memory(self, frame: Dict[str, int]) -> int:
+        peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+        self._frames.pop()
+        if self._frames:
+            self._frames[-1]["peak"] = max(self._frames[-1]["peak"], peak)
+        elif self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        return max(peak - frame["start"], 0)
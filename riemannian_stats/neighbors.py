@@ -0,0 +1,148 @@
+from typing import Any, Tuple
+
+import numpy as np
+from scipy import sparse
+
+
+class RiemannianNeighbors:
+    """
+    Nearest-neighbour queries under the Riemannian (UMAP) distance without the (n, n) distance matrix.
+
+    The distance between rows i and j is rho_ij * ||x_i - x_j||, with rho_ij = 1 - s_ij and s_ij the UMAP
+    similarity. Off the graph rho is exactly 1, so the distance is the Euclidean distance. Queries therefore
+    combine a KD-tree over the data with corrections for the graph neighbours of each query row. Memory
+    stays O(n * p + graph edges).
+
+    Queries are either row positions of the fitted data (an integer array) or new points (a float array of
+    shape (m, n_features)). New points have no edges in the graph, so their distances are Euclidean. A row
+    is never returned as its own neighbour.
+
+    Parameters:
+        values (np.ndarray): The fitted data, shape (n_samples, n_features).
+        graph (scipy.sparse.spmatrix): The UMAP similarity graph of `values`, shape (n_samples, n_samples).
+        leaf_size (int, optional): Leaf size of the KD-tree. Default is 40.
+
+    Methods:
+        kneighbors(query, k=5) -> Tuple[np.ndarray, np.ndarray]:
+            Distances and positions of the k nearest rows of every query.
+
+        radius_neighbors(query, radius) -> Tuple[np.ndarray, np.ndarray]:
+            Distances and positions of all rows within `radius` of every query.
+    """
+
+    def __init__(self, values: np.ndarray, graph: sparse.spmatrix, leaf_size: int = 40) -> None:
+        # scikit-learn takes a while to import, so it is only loaded when an index is built.
+        from sklearn.neighbors import KDTree
+
+        self._values = np.ascontiguousarray(values, dtype=np.float64)
+        n_rows = self._values.shape[0]
+        if graph.shape != (n_rows, n_rows):
+            raise ValueError(f"The graph must have shape ({n_rows}, {n_rows}), got {graph.shape}.")
+        self._graph = sparse.csr_matrix(graph, dtype=np.float64, copy=True)
+        self._graph.setdiag(0)
+        self._graph.eliminate_zeros()
+        self._graph.sort_indices()
+        self._tree = KDTree(self._values, leaf_size=leaf_size)
+
+    @property
+    def n_samples(self) -> int:
+        """Returns the number of indexed rows."""
+        return self._values.shape[0]
+
+    def kneighbors(self, query: Any, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the k nearest rows of every query under the Riemannian distance.
+
+        Parameters:
+            query (array-like): Row positions (integers) or new points, shape (m, n_features).
+            k (int, optional): Number of neighbours per query. Default is 5.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Distances and row positions, both of shape (m, k), sorted by
+                increasing distance.
+
+        Raises:
+            ValueError: If k is not positive or exceeds the number of candidate rows.
+        """
+        rows, points = self._parse_query(query)
+        available = self.n_samples - (rows is not None)
+        if k < 1 or k > available:
+            raise ValueError(f"k must be between 1 and {available}, got {k}.")
+        if rows is None:
+            return self._tree.query(points, k=k)
+
+        neighbor_cols, neighbor_dist = self._graph_distances(rows)
+        # The k nearest off-graph rows are among the Euclidean k + degree + 1 nearest (the +1 is the row itself).
+        n_candidates = min(k + neighbor_cols.shape[1] + 1, self.n_samples)
+        tree_dist, tree_cols = self._tree.query(points, k=n_candidates)
+        on_graph = (tree_cols[:, :, np.newaxis] == neighbor_cols[:, np.newaxis, :]).any(axis=2)
+        tree_dist[on_graph | (tree_cols == rows[:, np.newaxis])] = np.inf
+
+        distances = np.hstack((neighbor_dist, tree_dist))
+        columns = np.hstack((neighbor_cols, tree_cols))
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(columns, order, axis=1)
+
+    def radius_neighbors(self, query: Any, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds all rows within `radius` of every query under the Riemannian distance.
+
+        Graph neighbours are found even when their Euclidean distance exceeds the radius, since rho < 1
+        shrinks their distance.
+
+        Parameters:
+            query (array-like): Row positions (integers) or new points, shape (m, n_features).
+            radius (float): Largest distance returned (inclusive).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Object arrays of length m holding, per query, the distances and row
+                positions of its neighbours sorted by increasing distance.
+        """
+        rows, points = self._parse_query(query)
+        tree_cols, tree_dist = self._tree.query_radius(points, r=radius, return_distance=True)
+        if rows is not None:
+            neighbor_cols, neighbor_dist = self._graph_distances(rows)
+        distances = np.empty(len(points), dtype=object)
+        columns = np.empty(len(points), dtype=object)
+        for i in range(len(points)):
+            dist, cols = tree_dist[i], tree_cols[i]
+            if rows is not None:
+                keep = ~np.isin(cols, neighbor_cols[i]) & (cols != rows[i])
+                within = neighbor_dist[i] <= radius
+                dist = np.concatenate((neighbor_dist[i][within], dist[keep]))
+                cols = np.concatenate((neighbor_cols[i][within], cols[keep]))
+            order = np.argsort(dist, kind="stable")
+            distances[i], columns[i] = dist[order], cols[order]
+        return distances, columns
+
+    def _parse_query(self, query: Any) -> Tuple[Any, np.ndarray]:
+        """Splits a query into (row positions or None, query points of shape (m, n_features))."""
+        query = np.asarray(query)
+        if np.issubdtype(query.dtype, np.integer):
+            rows = np.atleast_1d(query).ravel()
+            if rows.size and (rows.min() < -self.n_samples or rows.max() >= self.n_samples):
+                raise ValueError(f"Row positions must lie in [0, {self.n_samples}).")
+            rows = rows % self.n_samples
+            return rows, self._values[rows]
+        points = np.atleast_2d(np.asarray(query, dtype=np.float64))
+        if points.ndim != 2 or points.shape[1] != self._values.shape[1]:
+            raise ValueError(f"Query points must have {self._values.shape[1]} columns, got shape {query.shape}.")
+        return None, points
+
+    def _graph_distances(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the graph neighbours of `rows` and their Riemannian distances, padded to the largest degree.
+
+        Padding entries have position -1 and distance inf.
+        """
+        block = self._graph[rows]
+        degrees = np.diff(block.indptr)
+        width = int(degrees.max()) if degrees.size else 0
+        slots = np.arange(block.nnz) - np.repeat(block.indptr[:-1], degrees)
+        owners = np.repeat(np.arange(len(rows)), degrees)
+        columns = np.full((len(rows), width), -1, dtype=np.intp)
+        distances = np.full((len(rows), width), np.inf)
+        columns[owners, slots] = block.indices
+        euclidean = np.linalg.norm(self._values[rows[owners]] - self._values[block.indices], axis=1)
+        distances[owners, slots] = (1 - block.data) * euclidean
+        return columns, distances
@@ -0,0 +1,329 @@
+import os
+import shutil
+import tempfile
+from typing import Dict, NamedTuple, Optional, Union
+
+import numpy as np
+
+from .similarity import PLANNING_KINDS, SIMILARITY_BACKENDS, SimilarityBackend
+
+STRATEGIES = ("dense", "tiled", "sparse", "condensed", "memmap")
+DISTANCE_METHODS = ("gram", "exact")
+
+# Rough sustained throughputs used for runtime estimates: element-wise NumPy work and UMAP neighbour search.
+_ELEMENTWISE_PER_SECOND = 3e8
+_BLAS_FLOPS_PER_SECOND = 5e9
+_UMAP_EDGES_PER_SECOND = 2e6
+# UMAP switches from an exact pairwise distance matrix to approximate neighbours above this size.
+_UMAP_SMALL_DATA = 4096
+# Fraction of the available memory the plan allows itself to use.
+_MEMORY_HEADROOM = 0.8
+_DEFAULT_BLOCK_SIZE = 512
+# Basis vectors kept by the truncated (Lanczos) eigensolver used for sparse data.
+_LANCZOS_VECTORS = 20
+
+
+class InsufficientMemoryError(MemoryError):
+    """Raised by the planner when no computation strategy fits in the memory budget."""
+
+
+class StageEstimate(NamedTuple):
+    """
+    Estimated cost of one pipeline stage.
+
+    Attributes:
+        memory (int): Bytes resident in RAM while the stage runs (inputs it keeps alive included).
+        disk (int): Bytes written to memory-mapped files by the stage.
+        seconds (float): Rough runtime in seconds.
+    """
+    memory: int
+    disk: int
+    seconds: float
+
+
+class ComputationPlan:
+    """
+    Memory and runtime estimate for a Riemannian analysis, together with the chosen computation strategy.
+
+    Strategies:
+        - "dense": every matrix, including the (n, n, p) difference tensor, is materialized in RAM.
+        - "tiled": the difference tensor is never stored; distances are computed block by block.
+        - "sparse": like "tiled", and the similarity/Rho matrices stay as the sparse UMAP graph.
+        - "condensed": like "sparse", with only the upper triangle of the symmetric distance matrix stored.
+        - "memmap": like "tiled", with the (n, n) similarity, Rho and distance matrices in memory-mapped files.
+
+    Attributes:
+        n_samples (int): Number of observations.
+        n_features (int): Number of variables.
+        strategy (str): Selected strategy.
+        block_size (int): Rows per block for the tiled stages.
+        n_jobs (int): Row blocks allowed in flight at once, at most the requested n_jobs.
+        stages (Dict[str, StageEstimate]): Per-stage estimates for the selected strategy.
+        peak_memory (int): Estimated peak resident bytes.
+        disk (int): Estimated bytes of memory-mapped files.
+        seconds (float): Estimated total runtime in seconds.
+        memory_budget (int): Bytes the plan was allowed to use.
+        alternatives (Dict[str, int]): Estimated peak memory of every strategy.
+    """
+
+    def __init__(self, n_samples: int, n_features: int, strategy: str, block_size: int,
+                 stages: Dict[str, StageEstimate], memory_budget: int, alternatives: Dict[str, int],
+                 n_jobs: int = 1) -> None:
+        self.n_samples = n_samples
+        self.n_features = n_features
+        self.strategy = strategy
+        self.block_size = block_size
+        self.n_jobs = n_jobs
+        self.stages = stages
+        self.memory_budget = memory_budget
+        self.alternatives = alternatives
+        self.peak_memory = max(stage.memory for stage in stages.values())
+        self.disk = sum(stage.disk for stage in stages.values())
+        self.seconds = sum(stage.seconds for stage in stages.values())
+
+    def summary(self) -> str:
+        """Returns a human-readable table of the plan."""
+        lines = [f"Riemannian analysis plan for n={self.n_samples}, p={self.n_features}: "
+                 f"strategy={self.strategy!r}, block_size={self.block_size}, n_jobs={self.n_jobs}",
+                 f"{'stage':<22}{'memory':>12}{'disk':>12}{'seconds':>10}"]
+        for name, stage in self.stages.items():
+            lines.append(f"{name:<22}{_format_bytes(stage.memory):>12}{_format_bytes(stage.disk):>12}"
+                         f"{stage.seconds:>10.2f}")
+        lines.append(f"{'peak / total':<22}{_format_bytes(self.peak_memory):>12}{_format_bytes(self.disk):>12}"
+                     f"{self.seconds:>10.2f}")
+        lines.append(f"memory budget: {_format_bytes(self.memory_budget)}")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return (f"ComputationPlan(n_samples={self.n_samples}, n_features={self.n_features}, "
+                f"strategy={self.strategy!r}, peak_memory={_format_bytes(self.peak_memory)}, "
+                f"seconds={self.seconds:.2f})")
+
+
+def available_memory() -> int:
+    """
+    Returns the memory available to new allocations, in bytes.
+
+    Uses psutil when installed, then /proc/meminfo, then the total physical memory.
+    """
+    try:
+        import psutil
+
+        return int(psutil.virtual_memory().available)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo") as handle:
+            for line in handle:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES"))
+    except (AttributeError, ValueError, OSError):
+        return 8 * 2 ** 30
+
+
+def plan_computation(n_samples: int, n_features: int, n_neighbors: int = 3, dtype=np.float64,
+                     strategy: str = "auto", memory_budget: Optional[int] = None, block_size: Optional[int] = None,
+                     memmap_dir: Optional[str] = None, distance_method: str = "gram",
+                     similarity: Union[str, SimilarityBackend] = "umap", nnz: Optional[int] = None,
+                     n_jobs: int = 1) -> ComputationPlan:
+    """
+    Estimates the peak memory and runtime of each stage and selects a computation strategy.
+
+    With strategy="auto" the first of "dense", "tiled", "sparse", "condensed" and "memmap" whose peak memory fits in
+    the budget is selected, so small problems keep the fully materialized behaviour. Sparse data (`nnz` given)
+    never uses "dense", whose (n, n, p) difference tensor would densify the data, and its covariance and components
+    are estimated for the sparse Gram product and the truncated eigensolver.
+
+    Parameters:
+        n_samples (int): Number of observations.
+        n_features (int): Number of variables.
+        n_neighbors (int): UMAP neighbourhood size. Default is 3.
+        dtype: Float dtype of the data (float32 halves most estimates). Default is float64.
+        strategy (str): "auto" or one of "dense", "tiled", "sparse", "condensed", "memmap". Default is "auto".
+        memory_budget (int, optional): Bytes the computation may use. Defaults to 80% of the available memory.
+        block_size (int, optional): Rows per block. Defaults to 512, reduced when a block would not fit.
+        memmap_dir (str, optional): Directory for memory-mapped files, used to check free disk space.
+        distance_method (str): "gram" or "exact" computation of the distance stage. Default is "gram".
+        similarity (str or SimilarityBackend): Similarity backend of the graph stage: a name from
+            `SIMILARITY_BACKENDS`, a planning kind ("umap" or "knn") or a backend instance, planned by its
+            `planning_kind`. The kNN backends need neither UMAP's pairwise matrix on small data nor its embedding.
+            Default is "umap".
+        nnz (int, optional): Number of stored entries when the data is a sparse CSR matrix. Default is None (dense).
+        n_jobs (int): Row blocks computed at once by the distance and covariance stages. Every block in flight
+            holds its own buffers, so the plan keeps only as many blocks in flight as fit in the budget
+            (`ComputationPlan.n_jobs`). The block size never depends on n_jobs, which keeps the block-order
+            reductions, and so the results, identical for every n_jobs. Default is 1.
+
+    Returns:
+        ComputationPlan: The selected strategy with its per-stage estimates.
+
+    Raises:
+        ValueError: If the strategy, distance method or similarity is unknown or the sizes are not positive, or
+            if sparse data is combined with the "dense" strategy or the "exact" distance method.
+        InsufficientMemoryError: If the requested strategy, or every strategy in "auto" mode, exceeds the budget.
+    """
+    if strategy != "auto" and strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}; expected 'auto' or one of {', '.join(STRATEGIES)}.")
+    if distance_method not in DISTANCE_METHODS:
+        raise ValueError(f"Unknown distance method {distance_method!r}; expected one of {', '.join(DISTANCE_METHODS)}.")
+    similarity = _planning_kind(similarity)
+    if n_samples < 1 or n_features < 1:
+        raise ValueError("n_samples and n_features must be positive.")
+    n_jobs = max(1, int(n_jobs))
+    if nnz is not None and (strategy == "dense" or distance_method == "exact"):
+        raise ValueError("Sparse data needs the 'gram' distance method and a strategy other than 'dense', "
+                         "which would densify the (n, n, p) difference tensor.")
+    if memory_budget is None:
+        memory_budget = int(available_memory() * _MEMORY_HEADROOM)
+    itemsize = np.dtype(dtype).itemsize
+    if block_size is None:
+        row_bytes = max(n_samples * n_features * itemsize if nnz is None else nnz * (itemsize + 4), 1)
+        block_size = int(min(_DEFAULT_BLOCK_SIZE, max(1, memory_budget // 4 // row_bytes)))
+    block_size = max(1, min(block_size, n_samples))
+
+    def estimate(name: str, jobs: int) -> Dict[str, StageEstimate]:
+        return _estimate_stages(name, n_samples, n_features, n_neighbors, itemsize, block_size, distance_method,
+                                similarity, nnz, jobs)
+
+    estimates = {name: estimate(name, 1) for name in STRATEGIES}
+    alternatives = {name: max(stage.memory for stage in stages.values()) for name, stages in estimates.items()}
+    free_disk = shutil.disk_usage(memmap_dir or tempfile.gettempdir()).free
+
+    def fits(name: str) -> bool:
+        disk = sum(stage.disk for stage in estimates[name].values())
+        return alternatives[name] <= memory_budget and disk <= free_disk
+
+    candidates = (tuple(name for name in STRATEGIES if nnz is None or name != "dense") if strategy == "auto"
+                  else (strategy,))
+    for name in candidates:
+        if fits(name):
+            # Serial blocks fit; keep as many blocks in flight as the budget allows without touching the block size.
+            for jobs in range(n_jobs, 1, -1):
+                stages = estimate(name, jobs)
+                if max(stage.memory for stage in stages.values()) <= memory_budget:
+                    return ComputationPlan(n_samples, n_features, name, block_size, stages, memory_budget,
+                                           alternatives, jobs)
+            return ComputationPlan(n_samples, n_features, name, block_size, estimates[name], memory_budget,
+                                   alternatives)
+    raise InsufficientMemoryError(_refusal_message(n_samples, n_features, candidates, alternatives, estimates,
+                                                   memory_budget, free_disk))
+
+
+def _planning_kind(similarity: Union[str, SimilarityBackend]) -> str:
+    """Returns the cost class of the graph stage for a backend name, planning kind or backend instance."""
+    if isinstance(similarity, SimilarityBackend):
+        kind = similarity.planning_kind
+    elif similarity in SIMILARITY_BACKENDS:
+        kind = SIMILARITY_BACKENDS[similarity].planning_kind
+    else:
+        kind = similarity
+    if kind not in PLANNING_KINDS:
+        raise ValueError(f"Unknown similarity {similarity!r}; expected one of {', '.join(SIMILARITY_BACKENDS)}, "
+                         f"a planning kind ({', '.join(PLANNING_KINDS)}) or a SimilarityBackend.")
+    return kind
+
+
+def _estimate_stages(strategy: str, n: int, p: int, k: int, itemsize: int, block: int,
+                     distance_method: str = "gram", similarity: str = "umap",
+                     nnz: Optional[int] = None, n_jobs: int = 1) -> Dict[str, StageEstimate]:
+    """
+    Per-stage resident memory, disk usage and runtime of one strategy, with n_jobs blocks in flight; `similarity`
+    is a planning kind.
+    """
+    square = n * n
+    data = n * p * itemsize if nnz is None else nnz * (itemsize + 4) + (n + 1) * 8
+    graph_sparse = 2 * n * k * 12 + (n + 1) * 4
+    umap_work = (square * 8 if n < _UMAP_SMALL_DATA else n * k * 64) + n * k * 48
+    block_diff = block * n * p * itemsize
+    dense_square = square * 4 if strategy in ("dense", "tiled") else 0
+    disk_square = square * 4 if strategy == "memmap" else 0
+    # The condensed layout stores (and the Gram method computes) only the n * (n - 1) / 2 upper entries.
+    pairs = n * (n - 1) // 2 if strategy == "condensed" else square
+    distance_bytes = pairs * itemsize
+
+    similarities = dense_square
+    rho = dense_square
+    diff = square * p * itemsize if strategy == "dense" else 0
+    distance_ram = 0 if strategy == "memmap" else distance_bytes
+
+    knn_seconds = (square * p / _ELEMENTWISE_PER_SECOND if n < _UMAP_SMALL_DATA
+                   else n * k * np.log2(max(n, 2)) / _UMAP_EDGES_PER_SECOND)
+    embed_seconds = n * k / _UMAP_EDGES_PER_SECOND
+    if similarity == "knn":
+        # One exact tree search (distances, positions and the symmetrized graph), no embedding.
+        umap_work = n * k * 48 + data
+        knn_seconds = n * k * p * np.log2(max(n, 2)) / _ELEMENTWISE_PER_SECOND
+        embed_seconds = 0.0
+    pairwise_seconds = 3 * square * p / _ELEMENTWISE_PER_SECOND
+    resident = data + graph_sparse
+    stages = {
+        "graph": StageEstimate(resident + umap_work + similarities, disk_square,
+                               knn_seconds + embed_seconds),
+        "rho": StageEstimate(resident + similarities + rho, disk_square, square / _ELEMENTWISE_PER_SECOND),
+        "diff": StageEstimate(resident + similarities + rho + diff, 0,
+                              pairwise_seconds if strategy == "dense" else 0.0),
+    }
+    if distance_method == "gram":
+        # Euclidean block from one matrix product, then O(n * k * p) corrections of the graph entries.
+        stages["distance"] = StageEstimate(resident + similarities + rho + diff + distance_ram
+                                           + n_jobs * block * n * 8 * 2,
+                                           distance_bytes if strategy == "memmap" else 0,
+                                           2.0 * pairs * p / _BLAS_FLOPS_PER_SECOND
+                                           + (4 * pairs + 2 * n * k * p) / _ELEMENTWISE_PER_SECOND)
+    else:
+        stages["distance"] = StageEstimate(resident + similarities + rho + diff + distance_ram
+                                           + (0 if strategy == "dense" else n_jobs * 2 * block_diff),
+                                           distance_bytes if strategy == "memmap" else 0,
+                                           pairwise_seconds if strategy != "dense"
+                                           else square * p / _ELEMENTWISE_PER_SECOND)
+    persistent = resident + similarities + rho + diff + distance_ram
+    cov_flops = 2.0 * n * p * p
+    stages["covariance"] = StageEstimate(persistent + n_jobs * (min(block, n) * p * 8 * 2 + p * p * 8)
+                                         + p * p * 8, 0,
+                                         cov_flops / _BLAS_FLOPS_PER_SECOND + n * p / _ELEMENTWISE_PER_SECOND)
+    stages["correlation"] = StageEstimate(stages["covariance"].memory + p * p * 8, 0,
+                                          stages["covariance"].seconds + p * p / _ELEMENTWISE_PER_SECOND)
+    stages["components"] = StageEstimate(persistent + 3 * data + p * p * 24, 0,
+                                         (10.0 * p ** 3 + cov_flops) / _BLAS_FLOPS_PER_SECOND)
+    stages["variables_components"] = StageEstimate(persistent + n * (p + 2) * 8 * 2, 0,
+                                                   2.0 * n * (p + 2) ** 2 / _BLAS_FLOPS_PER_SECOND)
+    if nnz is not None:
+        # Sparse Gram product X^T W^2 X (each row contributes its squared number of entries, at most p * p)
+        # and a Lanczos solver that only multiplies by it, so nothing of size n * p or p^3 is formed.
+        gram = min(p * p, nnz * (nnz / n)) * (itemsize + 4) * 2
+        lanczos = p * _LANCZOS_VECTORS * 8
+        stages["covariance"] = StageEstimate(persistent + (1 + n_jobs) * gram, 0,
+                                             2.0 * gram / _ELEMENTWISE_PER_SECOND)
+        stages["correlation"] = StageEstimate(persistent + 3 * gram, 0, 3.0 * gram / _ELEMENTWISE_PER_SECOND)
+        stages["components"] = StageEstimate(persistent + gram + lanczos + n * _LANCZOS_VECTORS * 8, 0,
+                                             100 * (gram + lanczos) / _ELEMENTWISE_PER_SECOND)
+        stages["variables_components"] = StageEstimate(persistent + (n + p) * 2 * 8 * 2, 0,
+                                                       4.0 * nnz / _ELEMENTWISE_PER_SECOND)
+    return stages
+
+
+def _refusal_message(n: int, p: int, candidates, alternatives: Dict[str, int],
+                     estimates: Dict[str, Dict[str, StageEstimate]], budget: int, free_disk: int) -> str:
+    """Builds an actionable explanation of why no strategy fits."""
+    needed = ", ".join(f"{name}: {_format_bytes(alternatives[name])}" for name in candidates)
+    memmap_disk = sum(stage.disk for stage in estimates["memmap"].values())
+    lines = [f"No computation strategy fits for n={n}, p={p}. Estimated peak memory ({needed}) "
+             f"exceeds the budget of {_format_bytes(budget)}."]
+    if "memmap" in candidates and memmap_disk > free_disk:
+        lines.append(f"The memmap strategy also needs {_format_bytes(memmap_disk)} of disk but only "
+                     f"{_format_bytes(free_disk)} is free; point memmap_dir to a larger volume.")
+    lines.append("Options: raise memory_budget, pass a smaller block_size, convert the data to float32, "
+                 "choose strategy='memmap' with a memmap_dir on a large disk, or subsample the rows.")
+    return " ".join(lines)
+
+
+def _format_bytes(value: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if abs(value) < 1024 or unit == "TiB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TiB"
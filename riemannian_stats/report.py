@@ -0,0 +1,182 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .riemannian_analysis import RiemannianAnalysis
+from .utilities import Utilities
+from .visualization import Visualization, _pyplot
+
+FORMATS = ("png", "svg", "pdf")
+
+
+class Report:
+    """
+    Renders the full set of Riemannian STATS plots to files, for batch jobs without a display.
+
+    The report of one dataset contains the principal plane, the principal plane with clusters, the correlation
+    circle and the 2D/3D cluster scatter plots of the first features. The cluster plots are only drawn when
+    cluster labels are given. Every figure is saved in each requested format and closed right away, so memory
+    stays flat however many plots are rendered.
+
+    Methods:
+        render(analysis, output_dir, ...) -> Dict[str, List[str]]:
+            Renders the report of one fitted analysis in the current process.
+
+        render_many(datasets, output_dir, ...) -> Dict[str, Dict[str, List[str]]]:
+            Fits and renders several datasets in parallel worker processes on the Agg backend.
+    """
+
+    @staticmethod
+    def render(analysis: RiemannianAnalysis, output_dir: str, name: str = "report",
+               clusters: Optional[Union[np.ndarray, pd.Series]] = None,
+               formats: Sequence[str] = ("png",), corr_matrix: Optional[np.ndarray] = None,
+               components: Optional[np.ndarray] = None) -> Dict[str, List[str]]:
+        """
+        Renders every plot of a fitted analysis into `output_dir`.
+
+        Figures are created with `show=False` on the Agg backend, so nothing is displayed and no display is
+        needed. When pyplot uses another backend and has no open figures, it is switched to Agg for the
+        report and switched back afterwards; with figures open (an interactive session) it is left as is.
+
+        Parameters:
+            analysis (RiemannianAnalysis): The fitted analysis.
+            output_dir (str): Directory the files are written to (created if missing).
+            name (str, optional): Prefix of the file names, e.g. "iris" gives "iris_principal_plane.png".
+                Default is "report".
+            clusters (array-like, optional): Cluster label of every row; enables the cluster plots.
+            formats (Sequence[str], optional): Any of "png", "svg" and "pdf". Defaults to ("png",).
+            corr_matrix (np.ndarray, optional): The Riemannian correlation matrix, if already computed.
+            components (np.ndarray, optional): The Riemannian components of `corr_matrix`, if already computed.
+
+        Returns:
+            Dict[str, List[str]]: The written file paths of each plot.
+
+        Raises:
+            ValueError: If a format is not supported, or if the analysis holds sparse data, whose features the
+                cluster plots would have to densify.
+        """
+        formats = Report._check_formats(formats)
+        if sparse.issparse(analysis.values):
+            raise ValueError("Report.render needs dense data; the analysis holds a sparse matrix. Plot its "
+                             "components with Visualization instead.")
+        os.makedirs(output_dir, exist_ok=True)
+        if corr_matrix is None:
+            corr_matrix = analysis.riemannian_correlation_matrix()
+        if components is None:
+            components = analysis.riemannian_components(corr_matrix)
+        correlations = analysis.riemannian_correlation_variables_components(components)
+        inertia = Utilities.pca_inertia_by_components(corr_matrix, 0, 1) * 100
+
+        features = pd.DataFrame(analysis.values, index=analysis.index, columns=analysis.columns)
+        cluster_values = None if clusters is None else np.asarray(clusters)
+        data = features if cluster_values is None else features.assign(cluster=cluster_values)
+        viz = Visualization(data, components=components, explained_inertia=inertia, clusters=cluster_values)
+
+        plots = [("principal_plane", viz.plot_principal_plane, {}),
+                 ("correlation_circle", viz.plot_correlation_circle, {"correlations": correlations})]
+        if cluster_values is not None:
+            x_col, y_col = features.columns[0], features.columns[min(1, features.shape[1] - 1)]
+            plots += [("principal_plane_with_clusters", viz.plot_principal_plane_with_clusters, {}),
+                      ("scatter_2d", viz.plot_2d_scatter_with_clusters,
+                       {"x_col": x_col, "y_col": y_col, "cluster_col": "cluster"})]
+            if features.shape[1] >= 3:
+                plots.append(("scatter_3d", viz.plot_3d_scatter_with_clusters,
+                              {"x_col": x_col, "y_col": y_col, "z_col": features.columns[2],
+                               "cluster_col": "cluster"}))
+
+        plt = _pyplot()
+        written = {}
+        with _agg_backend(plt):
+            for plot_name, plot, kwargs in plots:
+                figure = plot(title=name, show=False, **kwargs)
+                try:
+                    paths = [os.path.join(output_dir, f"{name}_{plot_name}.{fmt}") for fmt in formats]
+                    for path in paths:
+                        figure.savefig(path, bbox_inches="tight")
+                    written[plot_name] = paths
+                finally:
+                    plt.close(figure)
+        return written
+
+    @staticmethod
+    def render_many(datasets: Mapping[str, Union[pd.DataFrame, Tuple[pd.DataFrame, Any]]], output_dir: str,
+                    formats: Sequence[str] = ("png",), n_jobs: Optional[int] = None,
+                    **analysis_kwargs: Any) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Fits a `RiemannianAnalysis` per dataset and renders its report, one dataset per worker process.
+
+        Workers are started with the "spawn" method, force the Agg backend and, for the default "umap"
+        similarity, compile the UMAP kernels once with `RiemannianAnalysis.warmup`. With n_jobs=1 everything runs in the current process.
+
+        Parameters:
+            datasets (Mapping): Dataset name to a feature DataFrame, or to a (features, clusters) tuple.
+            output_dir (str): Directory the files are written to (created if missing).
+            formats (Sequence[str], optional): Any of "png", "svg" and "pdf". Defaults to ("png",).
+            n_jobs (int, optional): Number of worker processes. Defaults to one per CPU, capped at the
+                number of datasets.
+            **analysis_kwargs: Arguments for `RiemannianAnalysis` (e.g. n_neighbors, strategy).
+
+        Returns:
+            Dict[str, Dict[str, List[str]]]: The written file paths of each plot, per dataset name.
+
+        Raises:
+            ValueError: If a format is not supported.
+        """
+        formats = Report._check_formats(formats)
+        jobs = []
+        for name, dataset in datasets.items():
+            features, clusters = dataset if isinstance(dataset, tuple) else (dataset, None)
+            jobs.append((name, features, clusters, output_dir, formats, analysis_kwargs))
+        if not jobs:
+            return {}
+        n_jobs = min(n_jobs or os.cpu_count() or 1, len(jobs))
+        if n_jobs == 1:
+            return dict(_render_job(job) for job in jobs)
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(analysis_kwargs,)) as executor:
+            return dict(executor.map(_render_job, jobs))
+
+    @staticmethod
+    def _check_formats(formats: Sequence[str]) -> Tuple[str, ...]:
+        formats = tuple(fmt.lower().lstrip(".") for fmt in ([formats] if isinstance(formats, str) else formats))
+        unknown = [fmt for fmt in formats if fmt not in FORMATS]
+        if unknown or not formats:
+            raise ValueError(f"Unsupported format(s) {unknown or list(formats)}; expected any of {', '.join(FORMATS)}.")
+        return formats
+
+
+@contextmanager
+def _agg_backend(plt: Any) -> Iterator[None]:
+    """Renders on Agg while the block runs, unless figures of another backend are open, then restores pyplot."""
+    previous = plt.get_backend()
+    # switch_backend closes every open figure, so a session with figures keeps its backend.
+    switch = previous.lower() != "agg" and not plt.get_fignums()
+    if switch:
+        plt.switch_backend("Agg")
+    try:
+        yield
+    finally:
+        if switch:
+            plt.switch_backend(previous)
+
+
+def _init_worker(analysis_kwargs: Dict[str, Any]) -> None:
+    """Process-pool initializer: headless backend, and precompiled UMAP kernels when the analyses fit UMAP."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    if analysis_kwargs.get("similarity", "umap") == "umap":
+        RiemannianAnalysis.warmup()
+
+
+def _render_job(job: tuple) -> Tuple[str, Dict[str, List[str]]]:
+    """Fits and renders one dataset; runs inside a worker process."""
+    name, features, clusters, output_dir, formats, analysis_kwargs = job
+    analysis = RiemannianAnalysis(features, **analysis_kwargs)
+    return name, Report.render(analysis, output_dir, name=name, clusters=clusters, formats=formats)
@@ -0,0 +1,179 @@
+import functools
+import threading
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+
+def _memoized(method: Callable[[Any], Any]) -> property:
+    """
+    Turns a method into a read-only property computed on first access and cached on the instance.
+
+    The first computation of each property holds the instance lock (re-entrant, since properties build on
+    each other), so concurrent readers compute it once; later reads are a dictionary lookup. Cached arrays
+    are marked read-only because every reader shares them.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def getter(self):
+        cache = self._cache
+        if name not in cache:
+            with self._lock:
+                if name not in cache:
+                    value = method(self)
+                    if isinstance(value, np.ndarray):
+                        value.flags.writeable = False
+                    cache[name] = value
+        return cache[name]
+
+    return property(getter)
+
+
+class RiemannianPCAResult:
+    """
+    Immutable Riemannian PCA of a fitted `RiemannianAnalysis`, returned by `RiemannianAnalysis.fit()`.
+
+    The result holds its own read-only copy of the data, the Riemannian mean and the Rho weights of the fit, so
+    later writes to the analysis' arrays do not reach it. Every output is computed on first access from shared
+    intermediates and then cached. The weighted centered data feeds the covariance, the components and the
+    loadings, and one eigendecomposition feeds the eigenvalues, components and inertia. Outputs are always
+    consistent with each other. Reading from several threads at once is safe.
+
+    Parameters:
+        values (np.ndarray): The analysed data, shape (n_samples, n_features).
+        mean_index (int): Position of the Riemannian mean row.
+        weights (np.ndarray): Rho weight of every row with respect to the Riemannian mean.
+        columns (pd.Index): Column labels of the data.
+        index (pd.Index): Row labels of the data.
+        block_size (int, optional): Rows per block when accumulating the covariance, as in the analysis. With
+            the analysis' float64 weights the covariance is then bitwise equal to
+            `RiemannianAnalysis._riemannian_covariance_matrix()`, for float32 data too.
+
+    Properties:
+        centered (np.ndarray): Rows centered on the Riemannian mean and weighted by Rho, in float64.
+        covariance (np.ndarray): Riemannian covariance matrix.
+        correlation (np.ndarray): Riemannian correlation matrix.
+        eigenvalues (np.ndarray): Eigenvalues of the correlation matrix in decreasing order.
+        eigenvectors (np.ndarray): Matching eigenvectors as columns.
+        components (np.ndarray): Principal components, shape (n_samples, n_features).
+        inertia (np.ndarray): Share of the total inertia explained by each component.
+        cumulative_inertia (np.ndarray): Cumulative sum of `inertia`.
+        loadings (pd.DataFrame): Riemannian correlation of every variable with every component.
+    """
+
+    def __init__(self, values: np.ndarray, mean_index: int, weights: np.ndarray, columns: pd.Index,
+                 index: pd.Index, block_size: int = 512) -> None:
+        values = np.array(values)
+        values.flags.writeable = False
+        weights = np.array(weights)
+        weights.flags.writeable = False
+        for name, value in (("values", values), ("mean_index", int(mean_index)), ("weights", weights),
+                            ("columns", columns), ("index", index), ("block_size", max(1, int(block_size))),
+                            ("_cache", {}), ("_lock", threading.RLock())):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __repr__(self) -> str:
+        n_samples, n_features = self.values.shape
+        return (f"{type(self).__name__}(n_samples={n_samples}, n_features={n_features}, "
+                f"mean_index={self.mean_index})")
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Returns the Riemannian mean row."""
+        return self.values[self.mean_index]
+
+    @_memoized
+    def centered(self) -> np.ndarray:
+        """Returns the rows centered on the Riemannian mean and weighted by their Rho value, in float64."""
+        centered = np.subtract(self.values, self.values[self.mean_index], dtype=np.float64)
+        centered *= self.weights[:, np.newaxis]
+        return centered
+
+    @_memoized
+    def covariance(self) -> np.ndarray:
+        """Returns the Riemannian covariance matrix, accumulated in float64 block by block like the analysis."""
+        centered = self.centered
+        n_rows, n_features = centered.shape
+        covariance = np.zeros((n_features, n_features))
+        for start in range(0, n_rows, self.block_size):
+            block = centered[start:start + self.block_size]
+            covariance += np.dot(block.T, block)
+        return covariance / n_rows
+
+    @_memoized
+    def correlation(self) -> np.ndarray:
+        """Returns the Riemannian correlation matrix."""
+        std = np.sqrt(np.diag(self.covariance))
+        return self.covariance / np.outer(std, std)
+
+    @_memoized
+    def _eigen(self) -> tuple:
+        """Eigenpairs of the symmetric correlation matrix sorted by decreasing eigenvalue."""
+        eigenvalues, eigenvectors = np.linalg.eigh(self.correlation)
+        return eigenvalues[::-1], eigenvectors[:, ::-1]
+
+    @_memoized
+    def eigenvalues(self) -> np.ndarray:
+        """Returns the eigenvalues of the correlation matrix in decreasing order."""
+        return np.real(self._eigen[0])
+
+    @_memoized
+    def eigenvectors(self) -> np.ndarray:
+        """Returns the eigenvectors of the correlation matrix as columns, matching `eigenvalues`."""
+        return self._eigen[1].copy()
+
+    @_memoized
+    def components(self) -> np.ndarray:
+        """Returns the principal components of every row."""
+        centered = self.centered
+        std_population = np.sqrt(np.sum(centered ** 2, axis=0) / centered.shape[0])
+        return np.dot(centered / std_population, self._eigen[1])
+
+    @_memoized
+    def inertia(self) -> np.ndarray:
+        """Returns the share of the total inertia explained by each component."""
+        return self.eigenvalues / np.sum(self.eigenvalues)
+
+    @_memoized
+    def cumulative_inertia(self) -> np.ndarray:
+        """Returns the cumulative share of the total inertia."""
+        return np.cumsum(self.inertia)
+
+    @_memoized
+    def _loadings(self) -> np.ndarray:
+        """Correlation of every variable with every component."""
+        # The mean row has zero components, so the weighted centered components are weights * components.
+        centered_components = np.real(self.components) * self.weights[:, np.newaxis]
+        centered = self.centered.astype(np.float64, copy=False)
+        cross = np.dot(centered.T, centered_components)
+        variances = np.einsum("ij,ij->j", centered, centered)
+        component_variances = np.einsum("ij,ij->j", centered_components, centered_components)
+        return cross / np.sqrt(np.outer(variances, component_variances))
+
+    @property
+    def loadings(self) -> pd.DataFrame:
+        """Returns the Riemannian correlation of every variable (rows) with every component (columns)."""
+        n_features = self.values.shape[1]
+        return pd.DataFrame(self._loadings.copy(), index=[f"feature_{i + 1}" for i in range(n_features)],
+                            columns=[f"Component_{i + 1}" for i in range(n_features)])
+
+    def inertia_by_components(self, component1: int, component2: int) -> float:
+        """
+        Returns the share of the total inertia explained by two components together.
+
+        Parameters:
+            component1 (int): Index of the first component.
+            component2 (int): Index of the second component.
+
+        Returns:
+            float: Sum of both components' inertia.
+        """
+        return float(self.inertia[component1] + self.inertia[component2])
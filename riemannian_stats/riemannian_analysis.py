@@ -1,10 +1,63 @@
-from typing import Union, Optional
-import matplotlib
-
-matplotlib.use("TkAgg")  # Alternatively, you can try 'Agg', 'Qt5Agg', 'GTK3Agg', etc.
-import umap
+import asyncio
+import collections
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional, Sequence, Tuple, Union
 import pandas as pd
 import numpy as np
+from scipy import sparse
+
+from .aio import request_key, run_shared
+from .condensed import CondensedMatrix
+from .data_processing import DataProcessing
+from .instrumentation import Callback, CancellationToken, FitCancelled, StageProfiler, StageStats
+from .neighbors import RiemannianNeighbors
+from .planning import ComputationPlan, plan_computation
+from .results import RiemannianPCAResult
+from .similarity import SimilarityBackend, make_similarity
+from .utilities import _top_eigenpairs
+from .streaming import StreamingRiemannianPCA
+
+# Metrics for which `RiemannianAnalysis.warmup` already compiled the UMAP kernels in this process.
+_WARMED_UP_METRICS = set()
+
+
+class GroupComponents(NamedTuple):
+    """
+    Riemannian PCA of one group of rows, see `RiemannianAnalysis.riemannian_components_by_group`.
+
+    Attributes:
+        indices (np.ndarray): Positions of the group's rows in the data, in increasing order.
+        mean_index (int): Position of the group's Riemannian mean (medoid) in the data.
+        covariance (np.ndarray): Riemannian covariance matrix of the group, shape (n_features, n_features).
+        correlation (np.ndarray): Riemannian correlation matrix of the group.
+        eigenvalues (np.ndarray): Eigenvalues of the correlation matrix in decreasing order.
+        components (np.ndarray): Principal components of the group's rows, shape (len(indices), n_features).
+        inertia (np.ndarray): Share of the total inertia explained by each component.
+    """
+    indices: np.ndarray
+    mean_index: int
+    covariance: np.ndarray
+    correlation: np.ndarray
+    eigenvalues: np.ndarray
+    components: np.ndarray
+    inertia: np.ndarray
+
+
+def _row_squared_norms(values: Union[np.ndarray, sparse.spmatrix]) -> np.ndarray:
+    """Returns the squared Euclidean norm of every row of a dense or sparse matrix, as float64."""
+    if sparse.issparse(values):
+        return np.asarray(values.multiply(values).sum(axis=1), dtype=np.float64).ravel()
+    return np.einsum("ij,ij->i", values, values, dtype=np.float64)
+
+
+def _inverse_std(variances: np.ndarray) -> np.ndarray:
+    """Returns 1 / sqrt(variances), with 0 for zero variances (columns that are constant or absent)."""
+    std = np.sqrt(np.maximum(variances, 0))
+    return np.divide(1.0, std, out=np.zeros_like(std, dtype=np.float64), where=std > 0)
 
 
 class RiemannianAnalysis:
@@ -15,23 +68,58 @@ class RiemannianAnalysis:
     computations using a Riemannian-weighted framework, enhancing traditional UMAP with structure-aware geometry.
 
     Parameters:
-        data (np.ndarray or pd.DataFrame): Input dataset.
+        data (np.ndarray, pd.DataFrame, pyarrow.Table or scipy.sparse matrix): Input dataset. It is converted once
+            into a C-contiguous float array (a CSR matrix for sparse input) that all computations work on.
         n_neighbors (int): Number of neighbors for UMAP KNN graph construction. Default is 3.
         min_dist (float): Minimum distance parameter for UMAP, controlling cluster tightness. Default is 0.1.
         metric (str): Distance metric for UMAP (e.g., "euclidean", "manhattan"). Default is "euclidean".
+        callbacks (Sequence, optional): Stage callbacks, see `StageProfiler`.
+        profile_memory (bool): Whether to trace peak allocations per stage. Default is False.
+        block_size (int, optional): Number of rows processed per block in the pairwise and covariance stages.
+        cancel_token (CancellationToken, optional): Token checked between blocks to abort a long computation.
+        strategy (str): "auto", "dense", "tiled", "sparse", "condensed" or "memmap" storage of the pairwise
+            matrices. Default is "auto".
+        memory_budget (int, optional): Bytes the computation may use; defaults to 80% of the available memory.
+        memmap_dir (str, optional): Directory for memory-mapped matrices under the "memmap" strategy.
+        distance_method (str): "gram" (Euclidean matrix product plus graph corrections) or "exact" computation
+            of the UMAP distance matrix. Default is "gram".
+        n_jobs (int, optional): Threads computing the row blocks of the distance and covariance stages.
+        similarity (str or SimilarityBackend): "umap" (default), "fuzzy_knn", "gaussian_knn" or a custom backend
+            building the similarity graph.
 
     Properties:
-        data (np.ndarray or pd.DataFrame): The input data. Setting this triggers automatic recomputation of all derived matrices.
+        data (np.ndarray, pd.DataFrame or pyarrow.Table): The input data as supplied. Setting this triggers automatic recomputation of all derived matrices.
+        values (np.ndarray): The input data as a C-contiguous float32/float64 array of shape (n_samples, n_features),
+            or a CSR matrix for sparse input. float32 data halves the storage of the data and the pairwise
+            matrices, but distances and covariances are still accumulated in float64.
+        columns (pd.Index): Column labels of the input (a RangeIndex for arrays).
+        index (pd.Index): Row labels of the input (a RangeIndex for arrays and Arrow tables).
         n_neighbors (int): Number of neighbors for UMAP. Setting this re-triggers internal recomputations.
         min_dist (float): Minimum distance used in UMAP embedding. Automatically recomputes internal matrices on change.
         metric (str): UMAP distance metric. Triggers recomputation if modified.
+        similarity (SimilarityBackend): The backend that built the graph. Setting a name or backend recomputes.
 
+        umap_graph (scipy.sparse.csr_matrix): Sparse similarity graph (the UMAP fuzzy graph by default).
         umap_similarities (np.ndarray): Matrix of similarity values from the UMAP fuzzy graph.
         rho (np.ndarray): Matrix computed as (1 - UMAP similarity), used to weight vector differences.
         riemannian_diff (np.ndarray): 3D array of weighted pairwise vector differences between observations.
         umap_distance_matrix (np.ndarray): Pairwise distance matrix computed from Riemannian differences.
+        condensed_distances (CondensedMatrix): Upper triangle of the distance matrix.
+        condensed_rho (CondensedMatrix): Upper triangle of the Rho matrix, built from the sparse graph.
+        profile_ (Dict[str, StageStats]): Wall time, CPU time and peak allocation of the latest run of each stage
+            ("graph", "rho", "diff", "distance", "covariance", "correlation", "components", "variables_components",
+            "grouped_components").
+        riemannian_mean_index (int): Row with the smallest total UMAP distance (the Riemannian mean).
+        riemannian_mean (np.ndarray): That row of `values`.
+        riemannian_weights (np.ndarray): Rho weight of every row with respect to the Riemannian mean.
+        plan_ (ComputationPlan): Memory/runtime estimates and the strategy selected for the latest fit.
+        strategy (str): The selected strategy.
 
     Methods:
+        fit() -> RiemannianPCAResult:
+            Returns an immutable result whose correlation, components, eigenvalues, inertia and loadings are
+            computed once on first access.
+
         riemannian_correlation_matrix() -> np.ndarray:
             Computes the correlation matrix based on the Riemannian covariance structure.
 
@@ -44,8 +132,32 @@ class RiemannianAnalysis:
         riemannian_correlation_variables_components(components: np.ndarray) -> pd.DataFrame:
             Calculates Riemannian correlations between original features and the first two components.
 
+        riemannian_components_by_group(groups) -> Dict[Any, GroupComponents]:
+            Riemannian mean, covariance, correlation and components of every group (e.g. cluster) of rows.
+
+        add_callback(callback) -> None:
+            Registers a stage callback, e.g. an object with an `on_stage_end(name, stats)` method.
+
+        plan(n_samples, n_features, ...) -> ComputationPlan:
+            Static method estimating memory and runtime per stage and choosing a strategy before any data is loaded.
+
+        streaming_pca() -> StreamingRiemannianPCA:
+            Returns a chunk-wise accumulator for the covariance, correlation and components stages.
+
+        neighbors_index(leaf_size=40) -> RiemannianNeighbors:
+            Returns a k-nearest/radius neighbour index under the Riemannian distance without (n, n) storage.
+
+        afit(data, executor=None, **kwargs) -> RiemannianAnalysis:
+            Coroutine fitting an analysis in an executor; concurrent identical requests share one fit.
+
+        atransform(executor=None) -> np.ndarray:
+            Coroutine computing the Riemannian correlation matrix and components in an executor.
+
+        warmup(cache_dir=None, ...) -> float:
+            Static method compiling UMAP's numba kernels (with an on-disk cache); usable as a process-pool initializer.
+
     Notes:
-        - Setting `data`, `n_neighbors`, `min_dist`, or `metric` automatically recalculates:
+        - Setting `data`, `n_neighbors`, `min_dist`, `metric` or `similarity` automatically recalculates:
             - UMAP similarities
             - Rho matrix
             - Riemannian differences
@@ -53,17 +165,60 @@ class RiemannianAnalysis:
         - Internal methods (prefixed with double underscores) are used for computing intermediate matrices and are not intended for external use.
     """
 
-    def __init__(self, data: Union[np.ndarray, pd.DataFrame], n_neighbors: int = 3,
-                 min_dist: float = 0.1, metric: str = "euclidean") -> None:
+    def __init__(self, data: Union[np.ndarray, pd.DataFrame, "pyarrow.Table"], n_neighbors: int = 3,
+                 min_dist: float = 0.1, metric: str = "euclidean", callbacks: Optional[Sequence[Callback]] = None,
+                 profile_memory: bool = False, block_size: Optional[int] = None,
+                 cancel_token: Optional[CancellationToken] = None, strategy: str = "auto",
+                 memory_budget: Optional[int] = None, memmap_dir: Optional[str] = None,
+                 distance_method: str = "gram", n_jobs: Optional[int] = None,
+                 similarity: Union[str, SimilarityBackend] = "umap") -> None:
         """
         Initialize the RiemannianAnalysis object with data and UMAP parameters.
 
         Parameters:
-            data (Union[np.ndarray, pd.DataFrame]): Input dataset where rows represent observations and
-                columns represent features. It is internally stored and accessible via a read/write property.
+            data (Union[np.ndarray, pd.DataFrame, pyarrow.Table]): Input dataset where rows represent observations and
+                columns represent features. It is internally stored and accessible via a read/write property,
+                and converted once (zero-copy when already a C-contiguous float array) by `DataProcessing.to_float_array`.
+                SciPy sparse input (e.g. text or count features with many columns) stays sparse end to end: the
+                similarity backend receives the CSR matrix, the Gram distances use sparse products, the covariance
+                and correlation are sparse matrices and `riemannian_components` takes the leading components
+                from a truncated eigensolver. The "dense" strategy and the "exact" distance method, which need
+                the (n, n, p) difference tensor, are not available for it.
             n_neighbors (int): Number of neighbors to use for local connectivity in UMAP. Default is 3.
             min_dist (float): Minimum distance between embedded points in UMAP space. Default is 0.1.
             metric (str): Distance metric for UMAP. Common options include "euclidean", "manhattan", etc. Default is "euclidean".
+            callbacks (Sequence, optional): Callables `callback(name, stats)` or objects with `on_stage_start(name)`
+                and/or `on_stage_end(name, stats)` methods, notified around every internal stage.
+            profile_memory (bool): If True, the peak allocation of every stage is traced with tracemalloc and
+                reported in `profile_`. Tracing adds overhead, so it is disabled by default.
+            block_size (int, optional): Number of rows per block in the pairwise difference, distance and
+                covariance stages. Callback objects with an `on_progress(name, done, total)` method are notified
+                after every block (see `TqdmProgress`). By default the planner picks up to 512 rows per block.
+            cancel_token (CancellationToken, optional): Token checked between stages and blocks. Once cancelled,
+                the running computation raises `FitCancelled` and all partially computed matrices are released.
+            strategy (str): How the pairwise matrices are stored: "dense", "tiled", "sparse", "condensed",
+                "memmap", or "auto" to let `RiemannianAnalysis.plan` pick the first one that fits in memory.
+                "condensed" keeps only the upper triangle of the symmetric distance matrix (see
+                `condensed_distances`); `umap_distance_matrix` is then expanded on each access. Default is "auto".
+            memory_budget (int, optional): Bytes the computation may use. Defaults to 80% of the available memory.
+            memmap_dir (str, optional): Directory for the memory-mapped files of the "memmap" strategy.
+                Defaults to the system temporary directory.
+            distance_method (str): How the UMAP distance matrix is computed. Off the UMAP graph rho is exactly 1,
+                so "gram" takes the Euclidean distances from one matrix product per block (||a||^2 + ||b||^2 -
+                2 a.b on column-centered data) and recomputes only the graph entries exactly, scaled by rho.
+                "exact" reduces the weighted difference vectors of every pair. Default is "gram".
+            n_jobs (int, optional): Number of threads that compute the row blocks of the distance and covariance
+                stages in parallel; -1 uses one per CPU. NumPy and BLAS release the GIL, so the threads work on
+                the shared data, Rho and output arrays without copying them. Each block writes its own rows and
+                the per-block covariances are summed in block order, so the results are bitwise identical for
+                every n_jobs. Fewer threads run when their block buffers would exceed `memory_budget`; the block
+                size never depends on n_jobs. Default is None (serial).
+            similarity (str or SimilarityBackend): Backend building the similarity graph behind Rho. "umap" fits
+                UMAP; "fuzzy_knn" computes UMAP's fuzzy simplicial set directly from an exact scikit-learn kNN
+                search, and "gaussian_knn" a self-tuning Gaussian kernel on it, both without numba or an
+                embedding. Named backends use n_neighbors and metric (and min_dist for "umap"); a
+                `SimilarityBackend` instance is used as is, with its own parameters, so n_neighbors, min_dist
+                and metric are then ignored and setting them raises ValueError. Default is "umap".
 
         Behavior:
             Upon instantiation, the class computes:
@@ -77,39 +232,79 @@ class RiemannianAnalysis:
                - n_neighbors
                - min_dist
                - metric
+               - similarity
 
         Raises:
                 ValueError: Raised later in methods if necessary preconditions (e.g., valid matrix shapes) are not met.
+                FitCancelled: If `cancel_token` is cancelled while the matrices are being computed.
+                InsufficientMemoryError: If the planner finds that no allowed strategy fits in `memory_budget`.
+                    It is raised before any expensive work starts.
 
         Notes:
-            - Internally stores data and parameters as protected attributes (_data, _n_neighbors, etc.).
+            - Internally stores data and parameters as protected attributes (_data, _values, _n_neighbors, etc.).
             - Uses double-underscore methods for internal computation (_Riemannian differences, UMAP graph, etc.).
             - Properties provide read-only access to computed matrices: `umap_similarities`, `rho`, `riemannian_diff`, and `umap_distance_matrix`.
         """
         self._data = data
+        self._values, self._columns, self._index = DataProcessing.to_float_array(data)
         self._n_neighbors = n_neighbors
         self._min_dist = min_dist
         self._metric = metric
-        self.__umap_similarities: Union[np.ndarray, None] = self.__calculate_umap_graph_similarities()
-        self.__rho: Union[np.ndarray, None] = self.__calculate_rho_matrix()
-        self.__riemannian_diff: Union[np.ndarray, None] = self.__riemannian_vector_difference()
-        self.__umap_distance_matrix: Union[np.ndarray, None] = self.__calculate_umap_distance_matrix()
+        if block_size is not None and block_size < 1:
+            raise ValueError("block_size must be a positive integer.")
+        if n_jobs is not None and n_jobs < 1 and n_jobs != -1:
+            raise ValueError("n_jobs must be a positive integer, -1 or None.")
+        self._block_size = block_size
+        self._strategy = strategy
+        self._memory_budget = memory_budget
+        self._memmap_dir = memmap_dir
+        self._distance_method = distance_method
+        self._similarity = similarity
+        self.__similarity: Optional[SimilarityBackend] = None
+        self._n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else (n_jobs or 1)
+        self.__plan: Optional[ComputationPlan] = None
+        self.__memmap_dir: Optional[tempfile.TemporaryDirectory] = None
+        self.__graph: Optional[sparse.csr_matrix] = None
+        self._profiler = StageProfiler(track_memory=profile_memory, callbacks=callbacks, cancel_token=cancel_token)
+        self.__umap_similarities: Union[np.ndarray, None] = None
+        self.__rho: Union[np.ndarray, None] = None
+        self.__riemannian_diff: Union[np.ndarray, None] = None
+        self.__umap_distance_matrix: Union[np.ndarray, None] = None
+        self.__mean_index: Optional[int] = None
+        self.__recompute()
 
     @property
     def data(self):
         return self._data
 
     @data.setter
-    def data(self, value: Union[np.ndarray, pd.DataFrame]):
+    def data(self, value: Union[np.ndarray, pd.DataFrame, "pyarrow.Table"]):
+        self._values, self._columns, self._index = DataProcessing.to_float_array(value)
         self._data = value
         self.__recompute()
 
+    @property
+    def values(self) -> np.ndarray:
+        """Returns the input data as a C-contiguous float array (a CSR matrix for sparse input)."""
+        return self._values
+
+    @property
+    def columns(self) -> pd.Index:
+        """Returns the column labels of the input data."""
+        return self._columns
+
+    @property
+    def index(self) -> pd.Index:
+        """Returns the row labels of the input data."""
+        return self._index
+
     @property
     def n_neighbors(self):
         return self._n_neighbors
 
     @n_neighbors.setter
     def n_neighbors(self, value: int):
+        self.__require_named_similarity("n_neighbors")
         self._n_neighbors = value
         self.__recompute()
 
@@ -119,6 +314,7 @@ class RiemannianAnalysis:
 
     @min_dist.setter
     def min_dist(self, value: float):
+        self.__require_named_similarity("min_dist")
         self._min_dist = value
         self.__recompute()
 
@@ -128,35 +324,506 @@ class RiemannianAnalysis:
 
     @metric.setter
     def metric(self, value: str):
+        self.__require_named_similarity("metric")
         self._metric = value
         self.__recompute()
 
+    def __require_named_similarity(self, name: str) -> None:
+        """
+        Raises:
+            ValueError: If the graph comes from a `SimilarityBackend` instance, which keeps its own parameters.
+        """
+        if isinstance(self._similarity, SimilarityBackend):
+            raise ValueError(f"{name} only configures named similarity backends; the analysis uses "
+                             f"{self._similarity!r}. Set `similarity` to a backend with the new {name} instead.")
+
+    @property
+    def similarity(self) -> Optional[SimilarityBackend]:
+        """Returns the backend that built the current similarity graph."""
+        return self.__similarity
+
+    @similarity.setter
+    def similarity(self, value: Union[str, SimilarityBackend]):
+        self._similarity = value
+        self.__recompute()
+
+    @property
+    def umap_graph(self) -> Optional[sparse.csr_matrix]:
+        """Returns the sparse UMAP fuzzy graph (similarities) as a CSR matrix."""
+        return self.__graph
+
     @property
     def umap_similarities(self) -> Optional[np.ndarray]:
-        """Returns the UMAP similarity matrix."""
+        """Returns the UMAP similarity matrix (densified on access under the "sparse" strategy)."""
+        if self.__umap_similarities is None and self.__graph is not None:
+            return self.__graph.toarray()
         return self.__umap_similarities
 
     @property
     def rho(self) -> Optional[np.ndarray]:
-        """Returns the Rho matrix (1 - UMAP similarities)."""
+        """Returns the Rho matrix (1 - UMAP similarities), densified on access under the "sparse" strategy."""
+        if self.__rho is None and self.__graph is not None:
+            return self.__rho_rows(0, self.__graph.shape[0])
         return self.__rho
 
     @property
     def riemannian_diff(self) -> Optional[np.ndarray]:
-        """Returns the 3D array of weighted Riemannian differences."""
+        """
+        Returns the 3D array of weighted Riemannian differences.
+
+        Only the "dense" strategy keeps this (n, n, p) tensor; the other strategies rebuild it on every access.
+        It is not available for sparse input.
+        """
+        if self.__riemannian_diff is None and self.__graph is not None:
+            self.__require_dense("The Riemannian difference tensor")
+            return self.__riemannian_vector_difference()
         return self.__riemannian_diff
 
     @property
     def umap_distance_matrix(self) -> Optional[np.ndarray]:
-        """Returns the UMAP distance matrix."""
+        """
+        Returns the UMAP distance matrix (a memory-mapped array under the "memmap" strategy, and a new dense
+        array expanded from the upper triangle on every access under the "condensed" strategy).
+        """
+        if isinstance(self.__umap_distance_matrix, CondensedMatrix):
+            return self.__umap_distance_matrix.to_dense()
         return self.__umap_distance_matrix
 
+    @property
+    def condensed_distances(self) -> Optional[CondensedMatrix]:
+        """Returns the upper triangle of the UMAP distance matrix (stored as such under "condensed")."""
+        if self.__umap_distance_matrix is None or isinstance(self.__umap_distance_matrix, CondensedMatrix):
+            return self.__umap_distance_matrix
+        return CondensedMatrix.from_dense(self.__umap_distance_matrix)
+
+    @property
+    def condensed_rho(self) -> Optional[CondensedMatrix]:
+        """Returns the upper triangle of the Rho matrix, built from the sparse UMAP graph."""
+        if self.__graph is None:
+            return None
+        return CondensedMatrix.from_graph_complement(self.__graph, dtype=self.__graph.dtype)
+
+    @property
+    def riemannian_mean_index(self) -> Optional[int]:
+        """Returns the position of the Riemannian mean: the row with the smallest total UMAP distance."""
+        if self.__mean_index is None and self.__umap_distance_matrix is not None:
+            if isinstance(self.__umap_distance_matrix, CondensedMatrix):
+                row_sums = self.__umap_distance_matrix.row_sums()
+            else:
+                row_sums = np.sum(self.__umap_distance_matrix, axis=1)
+            self.__mean_index = int(np.argmin(row_sums))
+        return self.__mean_index
+
+    @property
+    def riemannian_mean(self) -> Optional[np.ndarray]:
+        """
+        Returns the Riemannian mean, the row of `values` every observation is centered on (a 1-row CSR matrix
+        for sparse input).
+        """
+        index = self.riemannian_mean_index
+        return None if index is None else self._values[index].copy()
+
+    @property
+    def riemannian_weights(self) -> Optional[np.ndarray]:
+        """Returns the Rho weight of every row with respect to the Riemannian mean, shape (n_samples,)."""
+        if self.riemannian_mean_index is None:
+            return None
+        return self.__riemannian_mean_weights(np.result_type(self._values, np.float32))[1].copy()
+
+    @property
+    def plan_(self) -> Optional[ComputationPlan]:
+        """Returns the computation plan (estimates and strategy) used for the latest fit."""
+        return self.__plan
+
+    @property
+    def strategy(self) -> Optional[str]:
+        """Returns the computation strategy selected for the latest fit."""
+        return None if self.__plan is None else self.__plan.strategy
+
+    @property
+    def cancel_token(self) -> Optional[CancellationToken]:
+        """Returns the cancellation token checked between blocks (None if cancellation is disabled)."""
+        return self._profiler.cancel_token
+
+    @cancel_token.setter
+    def cancel_token(self, value: Optional[CancellationToken]):
+        self._profiler.cancel_token = value
+
+    @property
+    def profile_(self) -> Dict[str, StageStats]:
+        """Returns the resource usage of the latest run of each internal stage."""
+        return dict(self._profiler.records)
+
+    def add_callback(self, callback: Callback) -> None:
+        """
+        Registers a callback notified around every internal stage.
+
+        Parameters:
+            callback: A callable `callback(name, stats)` or an object with any of the `on_stage_start(name)`,
+                `on_progress(name, done, total)` and `on_stage_end(name, stats)` methods.
+        """
+        self._profiler.add_callback(callback)
+
+    def fit(self) -> RiemannianPCAResult:
+        """
+        Returns the Riemannian PCA of the fitted geometry as an immutable, thread-safe result object.
+
+        The result keeps the data, the Riemannian mean and the Rho weights as they are now. Its outputs are
+        computed lazily from shared intermediates, so a consumer no longer chains `riemannian_correlation_matrix`,
+        `riemannian_components` and `riemannian_correlation_variables_components` by hand.
+
+        Returns:
+            RiemannianPCAResult: The result; e.g. `result.components`, `result.inertia`, `result.loadings`.
+
+        Raises:
+            ValueError: If the UMAP distance matrix has not been calculated or the data is sparse.
+        """
+        if self.riemannian_mean_index is None:
+            raise ValueError("UMAP distance matrix must be calculated before fitting the Riemannian PCA.")
+        self.__require_dense("fit()")
+        mean_index, weights = self.__riemannian_mean_weights(np.float64)
+        return RiemannianPCAResult(self._values, mean_index, weights, self._columns, self._index,
+                                   block_size=self.__plan.block_size)
+
+    def streaming_pca(self) -> StreamingRiemannianPCA:
+        """
+        Returns a `StreamingRiemannianPCA` centered on this analysis' Riemannian mean and weighted by its Rho weights.
+
+        The covariance, correlation and component stages can then be computed from row chunks of the same data
+        (in the same order), e.g. from `DataProcessing.iter_chunks`, in O(p^2 + chunk) memory.
+
+        Returns:
+            StreamingRiemannianPCA: An empty accumulator ready for `partial_fit`.
+
+        Raises:
+            ValueError: If the UMAP distance matrix has not been calculated or the data is sparse.
+        """
+        if self.riemannian_mean_index is None:
+            raise ValueError("UMAP distance matrix must be calculated before streaming the Riemannian PCA.")
+        self.__require_dense("streaming_pca()")
+        return StreamingRiemannianPCA(self.riemannian_mean, self.riemannian_weights)
+
+    def neighbors_index(self, leaf_size: int = 40) -> RiemannianNeighbors:
+        """
+        Returns a `RiemannianNeighbors` index over the data and its UMAP graph.
+
+        Neighbour queries then need neither `umap_distance_matrix` nor an argsort of its rows, so they also
+        work under the "sparse" strategy at any size.
+
+        Parameters:
+            leaf_size (int, optional): Leaf size of the underlying KD-tree. Default is 40.
+
+        Returns:
+            RiemannianNeighbors: Index answering `kneighbors` and `radius_neighbors` queries.
+
+        Raises:
+            ValueError: If the UMAP graph has not been calculated or the data is sparse.
+        """
+        if self.umap_graph is None:
+            raise ValueError("UMAP graph must be calculated before building a neighbours index.")
+        self.__require_dense("neighbors_index()")
+        return RiemannianNeighbors(self._values, self.umap_graph, leaf_size=leaf_size)
+
+    @staticmethod
+    def plan(n_samples: int, n_features: int, n_neighbors: int = 3, dtype=np.float64, strategy: str = "auto",
+             memory_budget: Optional[int] = None, block_size: Optional[int] = None,
+             memmap_dir: Optional[str] = None, distance_method: str = "gram",
+             similarity: Union[str, SimilarityBackend] = "umap", nnz: Optional[int] = None,
+             n_jobs: int = 1) -> ComputationPlan:
+        """
+        Estimates peak memory and runtime per stage for a dataset of the given size, without any data.
+
+        Parameters:
+            n_samples (int): Number of observations.
+            n_features (int): Number of variables.
+            n_neighbors (int): UMAP neighbourhood size. Default is 3.
+            dtype: Float dtype of the data. Default is float64.
+            strategy (str): "auto" or one of "dense", "tiled", "sparse", "condensed", "memmap". Default is "auto".
+            memory_budget (int, optional): Bytes available. Defaults to 80% of the currently available memory.
+            block_size (int, optional): Rows per block. Chosen automatically when omitted.
+            memmap_dir (str, optional): Directory for memory-mapped files (checked for free space).
+            distance_method (str): "gram" or "exact" computation of the distance stage. Default is "gram".
+            similarity (str or SimilarityBackend): "umap", "fuzzy_knn", "gaussian_knn" or a backend instance,
+                planned by its `planning_kind`. Default is "umap".
+            nnz (int, optional): Stored entries of sparse CSR data; the plan then never densifies the data.
+            n_jobs (int): Threads computing row blocks at once; each one holds its own block buffers, so the plan
+                keeps only as many in flight as fit in the budget. Default is 1.
+
+        Returns:
+            ComputationPlan: Selected strategy with per-stage estimates; see `ComputationPlan.summary()`.
+
+        Raises:
+            InsufficientMemoryError: If no allowed strategy fits, with suggestions on how to proceed.
+        """
+        return plan_computation(n_samples, n_features, n_neighbors=n_neighbors, dtype=dtype, strategy=strategy,
+                                memory_budget=memory_budget, block_size=block_size, memmap_dir=memmap_dir,
+                                distance_method=distance_method, similarity=similarity, nnz=nnz, n_jobs=n_jobs)
+
+    @staticmethod
+    async def afit(data: Union[np.ndarray, pd.DataFrame, "pyarrow.Table"], executor: Optional[Executor] = None,
+                   **kwargs: Any) -> "RiemannianAnalysis":
+        """
+        Coroutine that constructs a `RiemannianAnalysis` in an executor without blocking the event loop.
+
+        Concurrent calls with the same data and arguments share one in-flight fit and receive the same
+        object. Cancelling the awaiting task stops waiting; once every caller of that fit is cancelled, the
+        fit itself is cancelled between blocks (`FitCancelled` in the worker) and its matrices are released.
+
+        Parameters:
+            data (Union[np.ndarray, pd.DataFrame, pyarrow.Table, scipy.sparse matrix]): Input dataset.
+            executor (concurrent.futures.Executor, optional): Where the data fingerprint and the fit run.
+                Defaults to the event loop's default executor.
+            **kwargs: Constructor arguments (n_neighbors, strategy, n_jobs, ...), except `cancel_token`.
+
+        Returns:
+            RiemannianAnalysis: The fitted analysis.
+
+        Raises:
+            TypeError: If a `cancel_token` is passed; cancel the awaiting task instead.
+        """
+        if "cancel_token" in kwargs:
+            raise TypeError("afit manages the cancellation token; cancel the awaiting task instead.")
+        loop = asyncio.get_running_loop()
+        key = await loop.run_in_executor(executor, request_key, data, kwargs)
+
+        def fit(token: CancellationToken) -> "RiemannianAnalysis":
+            analysis = RiemannianAnalysis(data, cancel_token=token, **kwargs)
+            analysis.cancel_token = None
+            return analysis
+
+        return await run_shared(("fit", key), fit, executor)
+
+    async def atransform(self, executor: Optional[Executor] = None) -> np.ndarray:
+        """
+        Coroutine computing the Riemannian correlation matrix and the principal components in an executor.
+
+        Concurrent calls on the same analysis share one computation. Once every caller is cancelled, the
+        covariance stage is cancelled between blocks. The token of the shared computation is passed down the
+        call rather than set on the analysis, so synchronous calls running meanwhile are not cancelled with it.
+
+        Parameters:
+            executor (concurrent.futures.Executor, optional): Where the computation runs. Defaults to the event
+                loop's default executor.
+
+        Returns:
+            numpy.ndarray: Matrix of principal components, as returned by `riemannian_components`.
+        """
+        def transform(token: CancellationToken) -> np.ndarray:
+            return self.__riemannian_pca(self.__riemannian_correlation(token), cancel_token=token)
+
+        # Keyed on the analysis itself rather than its id(), which a new object may reuse once this one is freed.
+        return await run_shared(("transform", self), transform, executor)
+
+    @staticmethod
+    def warmup(cache_dir: Optional[str] = None, metric: str = "euclidean", large_data: bool = False) -> float:
+        """
+        Compiles the numba kernels used by UMAP ahead of the first real analysis in this process.
+
+        The first UMAP fit of a process pays numba's JIT compilation, which often costs more than the
+        analysis of a small dataset. `warmup` enables numba's on-disk cache and fits a tiny synthetic
+        dataset, so later analyses (and later processes sharing the cache) only pay the actual compute.
+        It takes no required arguments and can therefore be passed directly as a process-pool initializer:
+
+            ProcessPoolExecutor(initializer=RiemannianAnalysis.warmup)
+
+        Only the kernels that UMAP and pynndescent mark as cacheable are stored on disk; the others are
+        recompiled once per process, which is exactly the cost the initializer moves out of the first job.
+
+        numba only reads its cache directory from the `NUMBA_CACHE_DIR` environment variable, so this is a
+        process-level side effect: when the variable is unset, `warmup` sets it to `cache_dir` (reloading
+        numba's configuration if numba is already imported), and child processes inherit it. A variable that
+        is already set is left alone and takes precedence over `cache_dir`.
+
+        Parameters:
+            cache_dir (str, optional): Directory for numba's compiled-function cache when `NUMBA_CACHE_DIR` is
+                not set. Defaults to `<XDG cache>/riemannian_stats/numba`.
+            metric (str): UMAP metric to compile kernels for. Default is "euclidean".
+            large_data (bool): Also compile the approximate nearest-neighbour search (NN-descent) that UMAP
+                uses for 4096 or more rows. This roughly doubles the warm-up time. Default is False.
+
+        Returns:
+            float: Seconds spent warming up (0.0 if this process was already warmed up for `metric`).
+        """
+        if metric in _WARMED_UP_METRICS:
+            return 0.0
+        start = time.perf_counter()
+        RiemannianAnalysis._configure_numba_cache(cache_dir)
+
+        import umap
+
+        values = np.random.default_rng(0).normal(size=(64, 4))
+        RiemannianAnalysis(values, n_neighbors=3, metric=metric)
+        if large_data:
+            umap.UMAP(n_neighbors=3, metric=metric, force_approximation_algorithm=True, n_epochs=11).fit(values)
+        _WARMED_UP_METRICS.add(metric)
+        return time.perf_counter() - start
+
+    @staticmethod
+    def _configure_numba_cache(cache_dir: Optional[str] = None) -> str:
+        """
+        Points numba's on-disk cache at `cache_dir` unless `NUMBA_CACHE_DIR` is already set, see `warmup`.
+
+        Returns:
+            str: The cache directory in effect.
+        """
+        configured = os.environ.get("NUMBA_CACHE_DIR")
+        if configured:
+            return configured
+        if cache_dir is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+            cache_dir = os.path.join(cache_home, "riemannian_stats", "numba")
+        os.makedirs(cache_dir, exist_ok=True)
+        os.environ["NUMBA_CACHE_DIR"] = cache_dir
+        if "numba" in sys.modules:
+            # numba reads its configuration at import time; refresh it so the cache directory applies.
+            from numba.core import config
+
+            config.reload_config()
+        return cache_dir
+
     def __recompute(self):
         """Recompute all derived matrices when input parameters change."""
-        self.__umap_similarities = self.__calculate_umap_graph_similarities()
-        self.__rho = self.__calculate_rho_matrix()
-        self.__riemannian_diff = self.__riemannian_vector_difference()
-        self.__umap_distance_matrix = self.__calculate_umap_distance_matrix()
+        self._profiler.clear()
+        self.__release()
+        n_rows, n_features = self._values.shape
+        self.__similarity = make_similarity(self._similarity, n_neighbors=self._n_neighbors, min_dist=self._min_dist,
+                                            metric=self._metric)
+        self.__plan = plan_computation(n_rows, n_features, n_neighbors=self.__similarity.n_neighbors,
+                                       dtype=self._values.dtype, strategy=self._strategy,
+                                       memory_budget=self._memory_budget, block_size=self._block_size,
+                                       memmap_dir=self._memmap_dir, distance_method=self._distance_method,
+                                       similarity=self.__similarity,
+                                       nnz=self._values.nnz if sparse.issparse(self._values) else None,
+                                       n_jobs=self._n_jobs)
+        strategy = self.__plan.strategy
+        try:
+            with self._profiler.stage("graph"):
+                self._profiler.progress("graph", 0, 1)
+                self.__graph = self.__calculate_umap_graph()
+                if strategy in ("dense", "tiled"):
+                    self.__umap_similarities = self.__calculate_umap_graph_similarities()
+                elif strategy == "memmap":
+                    self.__umap_similarities = self.__to_memmap("similarities", self.__graph_rows)
+                self._profiler.progress("graph", 1, 1)
+            with self._profiler.stage("rho"):
+                if strategy in ("dense", "tiled"):
+                    self.__rho = self.__calculate_rho_matrix()
+                elif strategy == "memmap":
+                    self.__rho = self.__to_memmap("rho", self.__rho_rows)
+            with self._profiler.stage("diff"):
+                if strategy == "dense":
+                    self.__riemannian_diff = self.__riemannian_vector_difference()
+            with self._profiler.stage("distance"):
+                self.__umap_distance_matrix = self.__calculate_umap_distance_matrix()
+        except FitCancelled:
+            self.__release()
+            raise
+
+    def __require_dense(self, feature: str) -> None:
+        """Raises a ValueError naming `feature` when the data is sparse, since it would have to be densified."""
+        if sparse.issparse(self._values):
+            raise ValueError(f"{feature} needs dense data and is not available for sparse input; use "
+                             "riemannian_correlation_matrix() and riemannian_components(corr, n_components).")
+
+    def __release(self):
+        """Drops every derived matrix and removes memory-mapped files of a previous fit."""
+        self.__graph = self.__umap_similarities = self.__rho = None
+        self.__riemannian_diff = self.__umap_distance_matrix = self.__mean_index = None
+        if self.__memmap_dir is not None:
+            self.__memmap_dir.cleanup()
+            self.__memmap_dir = None
+
+    def __row_blocks(self, n_rows: int) -> Iterator[Tuple[int, int]]:
+        """Yields the (start, stop) row ranges of consecutive blocks of at most the planned block size."""
+        block_size = self.__plan.block_size
+        for start in range(0, n_rows, block_size):
+            yield start, min(start + block_size, n_rows)
+
+    @staticmethod
+    def __pop_block(in_flight: collections.deque) -> Tuple[int, Any]:
+        """Waits for the oldest block in flight and returns (stop, result), keeping no reference to its future."""
+        stop, future = in_flight.popleft()
+        return stop, future.result()
+
+    def __map_row_blocks(self, n_rows: int, work: Callable[[int, int], Any],
+                         cancel_token: Optional[CancellationToken] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        Runs `work(start, stop)` on every row block and yields (stop, result) in block order.
+
+        With n_jobs > 1 the blocks run in a thread pool; the caller still consumes the results in order, so
+        progress reports and any reduction over the blocks are the same as in a serial run. At most the plan's
+        n_jobs blocks (the requested n_jobs capped by the memory budget) are in flight, and each result is
+        released once yielded, so memory stays bounded as the planner assumes. Once a block raises (e.g.
+        `FitCancelled`), the blocks that have not started are cancelled. `cancel_token` is checked before every
+        block besides the analysis' own token.
+        """
+        blocks = list(self.__row_blocks(n_rows))
+        if self.__plan.n_jobs == 1 or len(blocks) < 2:
+            for start, stop in blocks:
+                yield stop, work(start, stop)
+            return
+
+        def checked_work(start: int, stop: int) -> Any:
+            self._profiler.check_cancelled(cancel_token)
+            return work(start, stop)
+
+        n_workers = min(self.__plan.n_jobs, len(blocks))
+        executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="riemannian_stats")
+        in_flight = collections.deque()
+        try:
+            for start, stop in blocks:
+                if len(in_flight) == n_workers:
+                    yield self.__pop_block(in_flight)
+                in_flight.append((stop, executor.submit(checked_work, start, stop)))
+            while in_flight:
+                yield self.__pop_block(in_flight)
+        finally:
+            # Executor.shutdown(cancel_futures=True) needs Python 3.9, so pending blocks are cancelled here.
+            for _, future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def __distance_rows(self, start: int, stop: int) -> np.ndarray:
+        """Returns rows [start, stop) of the UMAP distance matrix as a dense array."""
+        if isinstance(self.__umap_distance_matrix, CondensedMatrix):
+            return self.__umap_distance_matrix.rows(start, stop)
+        return self.__umap_distance_matrix[start:stop]
+
+    def __graph_rows(self, start: int, stop: int) -> np.ndarray:
+        """Returns rows [start, stop) of the similarity matrix as a dense array."""
+        if self.__umap_similarities is not None:
+            return self.__umap_similarities[start:stop]
+        return self.__graph[start:stop].toarray()
+
+    def __rho_rows(self, start: int, stop: int) -> np.ndarray:
+        """Returns rows [start, stop) of the Rho matrix as a dense array."""
+        if self.__rho is not None:
+            return self.__rho[start:stop]
+        block = self.__graph_rows(start, stop)
+        return np.subtract(1, block, dtype=block.dtype)
+
+    def __to_memmap(self, name: str, rows) -> np.memmap:
+        """Writes an (n, n) matrix produced block by block by `rows(start, stop)` into a memory-mapped file."""
+        if self.__memmap_dir is None:
+            self.__memmap_dir = tempfile.TemporaryDirectory(prefix="riemannian_stats_", dir=self._memmap_dir)
+        n_rows = self._values.shape[0]
+        first = rows(0, min(1, n_rows))
+        matrix = np.memmap(os.path.join(self.__memmap_dir.name, f"{name}.dat"), dtype=first.dtype, mode="w+",
+                           shape=(n_rows, n_rows))
+        for start, stop in self.__row_blocks(n_rows):
+            matrix[start:stop] = rows(start, stop)
+            self._profiler.check_cancelled()
+        matrix.flush()
+        return matrix
+
+    def __calculate_umap_graph(self) -> sparse.csr_matrix:
+        """
+        Builds the similarity graph with the configured backend (by default UMAP's fuzzy KNN connectivity graph).
+
+        Returns:
+            scipy.sparse.csr_matrix: Symmetric sparse similarity graph.
+        """
+        return sparse.csr_matrix(self.__similarity.graph(self._values))
 
     def __calculate_umap_graph_similarities(self) -> np.ndarray:
         """
@@ -165,11 +832,9 @@ class RiemannianAnalysis:
         Returns:
             numpy.ndarray: UMAP similarity matrix derived from the KNN graph.
         """
-        reducer = umap.UMAP(n_neighbors=self._n_neighbors, min_dist=self._min_dist, metric=self._metric)
-        reducer.fit(self._data)
-        umap_graph = reducer.graph_
-        umap_similarities = np.array(umap_graph.todense())
-        return umap_similarities
+        if self.__graph is None:
+            self.__graph = self.__calculate_umap_graph()
+        return self.__graph.toarray()
 
     def __calculate_rho_matrix(self) -> np.ndarray:
         """
@@ -196,97 +861,294 @@ class RiemannianAnalysis:
         Raises:
             ValueError: If the Rho matrix has not been calculated.
         """
-        if self.rho is None:
+        if self.__graph is None:
             raise ValueError("Rho matrix must be calculated before computing Riemannian differences.")
-        n_rows = self._data.shape[0]
-        riemannian_diff = np.zeros((n_rows, n_rows, self._data.shape[1]))
-        for i in range(n_rows):
-            for j in range(n_rows):
-                riemannian_diff[i, j] = self.rho[i, j] * (self._data.iloc[i] - self._data.iloc[j])
+        n_rows, n_features = self._values.shape
+        riemannian_diff = np.empty((n_rows, n_rows, n_features), dtype=np.result_type(self._values, np.float32))
+        for start, stop in self.__row_blocks(n_rows):
+            block = riemannian_diff[start:stop]
+            self.__weighted_difference_block(start, stop, out=block)
+            self._profiler.progress("diff", stop, n_rows)
         return riemannian_diff
 
-    def __calculate_umap_distance_matrix(self) -> np.ndarray:
+    def __weighted_difference_block(self, start: int, stop: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Computes rho[i, j] * (x_i - x_j) for the rows i in [start, stop) and every j."""
+        block = np.subtract(self._values[start:stop, np.newaxis, :], self._values[np.newaxis, :, :], out=out)
+        block *= self.__rho_rows(start, stop)[:, :, np.newaxis]
+        return block
+
+    def __calculate_umap_distance_matrix(self) -> Union[np.ndarray, CondensedMatrix]:
         """
         Calculates the UMAP distance matrix using weighted Riemannian differences.
 
+        With the "gram" method the Euclidean distances of a block come from one matrix product and only the
+        graph entries are recomputed from exact differences and scaled by rho. With the "exact" method the
+        stored difference tensor ("dense" strategy) or the differences of one block of rows are reduced.
+        Under the "condensed" strategy only the entries right of the diagonal are kept, and the "gram" method
+        only computes those.
+
         Returns:
-            numpy.ndarray: UMAP distance matrix.
+            numpy.ndarray or CondensedMatrix: UMAP distance matrix.
 
         Raises:
             ValueError: If the Riemannian differences have not been calculated.
         """
-        if self.riemannian_diff is None:
+        if self.__graph is None:
             raise ValueError("Riemannian differences must be calculated before obtaining the UMAP distance matrix.")
-        n_rows = self.riemannian_diff.shape[0]
-        umap_distance_matrix = np.zeros((n_rows, n_rows))
-        for i in range(n_rows):
-            for j in range(n_rows):
-                umap_distance_matrix[i, j] = np.linalg.norm(self.riemannian_diff[i, j])
+        n_rows = self._values.shape[0]
+        dtype = np.result_type(self._values, np.float32)
+        condensed = self.__plan.strategy == "condensed"
+        if condensed:
+            umap_distance_matrix = CondensedMatrix.empty(n_rows, dtype=dtype)
+        elif self.__plan.strategy == "memmap":
+            umap_distance_matrix = np.memmap(os.path.join(self.__memmap_dir.name, "distance.dat"), dtype=dtype,
+                                             mode="w+", shape=(n_rows, n_rows))
+        else:
+            umap_distance_matrix = np.empty((n_rows, n_rows), dtype=dtype)
+        if self._distance_method == "gram" and sparse.issparse(self._values):
+            # Centering would densify sparse data. The graph entries, the nearest pairs where the cancellation
+            # in ||a||^2 + ||b||^2 - 2 a.b matters most, are recomputed exactly anyway. The dot products are
+            # accumulated in float64 whatever the storage dtype.
+            centered = self._values.astype(np.float64, copy=False)
+            squared_norms = _row_squared_norms(centered)
+        elif self._distance_method == "gram":
+            # Centering leaves the distances unchanged and limits cancellation in ||a||^2 + ||b||^2 - 2 a.b.
+            centered = self._values - np.mean(self._values, axis=0, dtype=np.float64)
+            squared_norms = np.einsum("ij,ij->i", centered, centered)
+
+        def distance_block(start: int, stop: int) -> None:
+            first_column = start if condensed else 0
+            if self._distance_method == "gram":
+                block = self.__gram_distance_block(centered, squared_norms, start, stop, first_column)
+            else:
+                if self.__riemannian_diff is not None:
+                    block = self.__riemannian_diff[start:stop]
+                else:
+                    block = self.__weighted_difference_block(start, stop)
+                block = np.sqrt(np.einsum("ijk,ijk->ij", block[:, first_column:], block[:, first_column:],
+                                          dtype=np.float64))
+            if condensed:
+                for offset, row in enumerate(range(start, stop)):
+                    umap_distance_matrix.upper_row(row)[:] = block[offset, row - start + 1:]
+            else:
+                umap_distance_matrix[start:stop] = block
+
+        for stop, _ in self.__map_row_blocks(n_rows, distance_block):
+            self._profiler.progress("distance", stop, n_rows)
+        if isinstance(umap_distance_matrix, np.memmap):
+            umap_distance_matrix.flush()
         return umap_distance_matrix
 
-    def _riemannian_covariance_matrix(self) -> np.ndarray:
+    def __gram_distance_block(self, centered: np.ndarray, squared_norms: np.ndarray, start: int,
+                              stop: int, first_column: int = 0) -> np.ndarray:
+        """
+        Returns rows [start, stop) of the UMAP distance matrix as Euclidean distances with graph corrections.
+
+        Parameters:
+            centered (numpy.ndarray or scipy.sparse.csr_matrix): The data with column means subtracted, as
+                float64, or the sparse data itself.
+            squared_norms (numpy.ndarray): Squared norm of every row of `centered`.
+            start (int): First row of the block.
+            stop (int): End (exclusive) of the block.
+            first_column (int, optional): First column computed (at most `start`). Default is 0.
+
+        Returns:
+            numpy.ndarray: Distances of shape (stop - start, n_samples - first_column).
+        """
+        if sparse.issparse(centered):
+            block = (centered[start:stop] @ centered[first_column:].T).toarray().astype(np.float64, copy=False)
+        else:
+            block = np.dot(centered[start:stop], centered[first_column:].T)
+        block *= -2
+        block += squared_norms[start:stop, np.newaxis]
+        block += squared_norms[first_column:]
+        np.maximum(block, 0, out=block)
+        np.sqrt(block, out=block)
+        rows = np.arange(stop - start)
+        block[rows, rows + start - first_column] = 0
+
+        graph = self.__graph[start:stop]
+        rows = np.repeat(rows, np.diff(graph.indptr))
+        columns = graph.indices
+        rho = np.subtract(1, graph.data, dtype=graph.data.dtype)
+        if first_column:
+            kept = columns >= first_column
+            rows, columns, rho = rows[kept], columns[kept], rho[kept]
+        differences = self._values[rows + start] - self._values[columns]
+        block[rows, columns - first_column] = rho * np.sqrt(_row_squared_norms(differences))
+        return block
+
+    def __riemannian_mean_centered(self, values: np.ndarray) -> np.ndarray:
+        """
+        Centers each row on the Riemannian mean (the row with the smallest total UMAP distance) and weights
+        it by its Rho value with respect to that row.
+
+        Parameters:
+            values (numpy.ndarray): Array with one row per observation of the analysed data.
+
+        Returns:
+            numpy.ndarray: Array of the same shape with rows rho[i, mean] * (values[i] - values[mean]).
+        """
+        riemannian_mean_index, weights = self.__riemannian_mean_weights(values.dtype)
+        centered = values - values[riemannian_mean_index]
+        centered *= weights[:, np.newaxis]
+        return centered
+
+    def __riemannian_mean_weights(self, dtype: np.dtype) -> Tuple[int, np.ndarray]:
+        """Returns the Riemannian mean row index and the Rho weights of every row with respect to it."""
+        riemannian_mean_index = self.riemannian_mean_index
+        if self.__rho is not None:
+            weights = self.__rho[:, riemannian_mean_index]
+        else:
+            weights = self.__rho_rows(riemannian_mean_index, riemannian_mean_index + 1)[0]
+        return riemannian_mean_index, np.asarray(weights).astype(dtype, copy=False)
+
+    def __riemannian_scatter(self, values: np.ndarray, stage: str,
+                             cancel_token: Optional[CancellationToken] = None) -> np.ndarray:
+        """
+        Accumulates the Riemannian covariance of `values` block by block, reporting progress under `stage`.
+
+        The blocks are centered and multiplied in float64, so float32 data only halves the storage.
+
+        Parameters:
+            values (numpy.ndarray): Array with one row per observation of the analysed data.
+            stage (str): Name of the running stage, e.g. "covariance" or "variables_components".
+            cancel_token (CancellationToken, optional): Extra token checked between blocks. Default is None.
+
+        Returns:
+            numpy.ndarray: Riemannian covariance matrix of the columns of `values`.
+        """
+        riemannian_mean_index, weights = self.__riemannian_mean_weights(np.float64)
+        mean_row = values[riemannian_mean_index]
+        n_rows, n_features = values.shape
+        cov_matrix = np.zeros((n_features, n_features))
+
+        def scatter_block(start: int, stop: int) -> np.ndarray:
+            centered = np.subtract(values[start:stop], mean_row, dtype=np.float64)
+            centered *= weights[start:stop, np.newaxis]
+            return np.dot(centered.T, centered)
+
+        for stop, scatter in self.__map_row_blocks(n_rows, scatter_block, cancel_token):
+            cov_matrix += scatter
+            self._profiler.progress(stage, stop, n_rows, cancel_token)
+        return cov_matrix / n_rows
+
+    def __sparse_riemannian_scatter(self, values: sparse.csr_matrix, stage: str,
+                                    cancel_token: Optional[CancellationToken] = None) -> sparse.csr_matrix:
+        """
+        Sparse counterpart of `__riemannian_scatter` that never densifies the data.
+
+        With W the Rho weights, x_m the mean row and a = X^T W^2 1, the covariance is
+        (X^T W^2 X - a x_m^T - x_m a^T + sum(W^2) x_m x_m^T) / n. The weighted Gram product is accumulated
+        block by block, reporting progress under `stage`. The corrections only fill the columns where x_m
+        is non-zero, so the result stays sparse.
+
+        Parameters:
+            values (scipy.sparse.csr_matrix): The analysed sparse data.
+            stage (str): Name of the running stage.
+            cancel_token (CancellationToken, optional): Extra token checked between blocks. Default is None.
+
+        Returns:
+            scipy.sparse.csr_matrix: Riemannian covariance matrix of the columns of `values`.
+        """
+        riemannian_mean_index, weights = self.__riemannian_mean_weights(np.float64)
+        squared_weights = weights * weights
+        n_rows, n_features = values.shape
+
+        def gram_block(start: int, stop: int) -> sparse.csr_matrix:
+            block = values[start:stop].astype(np.float64, copy=False)
+            return (block.T @ (sparse.diags(squared_weights[start:stop]) @ block)).tocsr()
+
+        gram = sparse.csr_matrix((n_features, n_features), dtype=np.float64)
+        for stop, partial in self.__map_row_blocks(n_rows, gram_block, cancel_token):
+            gram = gram + partial
+            self._profiler.progress(stage, stop, n_rows, cancel_token)
+        mean_row = values[riemannian_mean_index].astype(np.float64)
+        cross = sparse.csr_matrix((values.T @ squared_weights)[:, np.newaxis]) @ mean_row
+        cov_matrix = gram - cross - cross.T + squared_weights.sum() * (mean_row.T @ mean_row)
+        return (cov_matrix / n_rows).tocsr()
+
+    def __sparse_riemannian_variances(self) -> np.ndarray:
+        """Returns the diagonal of the sparse Riemannian covariance matrix without forming the matrix."""
+        riemannian_mean_index, weights = self.__riemannian_mean_weights(np.float64)
+        squared_weights = weights * weights
+        mean_row = self._values[riemannian_mean_index].toarray().ravel()
+        variances = (self._values.multiply(self._values).T @ squared_weights
+                     - 2 * mean_row * (self._values.T @ squared_weights)
+                     + squared_weights.sum() * mean_row ** 2)
+        return np.maximum(variances, 0) / self._values.shape[0]
+
+    def _riemannian_covariance_matrix(self, cancel_token: Optional[CancellationToken] = None
+                                      ) -> Union[np.ndarray, sparse.csr_matrix]:
         """
         Calculates the covariance matrix using Riemannian differences.
 
+        For sparse input the covariance is a sparse matrix formed from the weighted Gram product.
+
+        Parameters:
+            cancel_token (CancellationToken, optional): Token checked between blocks besides the analysis' own
+                `cancel_token`, so one call can be cancelled without touching the shared instance. Default is None.
+
         Returns:
-            numpy.ndarray: Riemannian covariance matrix.
+            numpy.ndarray or scipy.sparse.csr_matrix: Riemannian covariance matrix.
 
         Raises:
             ValueError: If the UMAP distance matrix has not been calculated.
         """
-        if self.umap_distance_matrix is None:
+        if self.__umap_distance_matrix is None:
             raise ValueError(
                 "UMAP distance matrix must be calculated before obtaining the Riemannian covariance matrix.")
-        riemannian_mean_index = np.argmin(np.sum(self.umap_distance_matrix, axis=1))
-        n_samples, n_features = self._data.shape
-        cov_matrix = np.zeros((n_features, n_features))
-        for i in range(n_samples):
-            diff_vector = self.rho[i, riemannian_mean_index] * (
-                    self._data.iloc[i] - self._data.iloc[riemannian_mean_index])
-            cov_matrix += np.outer(diff_vector, diff_vector)
-        return cov_matrix / n_samples
+        with self._profiler.stage("covariance", cancel_token):
+            if sparse.issparse(self._values):
+                return self.__sparse_riemannian_scatter(self._values, "covariance", cancel_token)
+            return self.__riemannian_scatter(self._values, "covariance", cancel_token)
 
-    def _riemannian_covariance_matrix_general(self, combined_data: pd.DataFrame) -> np.ndarray:
+    def _riemannian_covariance_matrix_general(self, combined_data: Union[np.ndarray, pd.DataFrame],
+                                              stage: str = "covariance") -> np.ndarray:
         """
         Helper method to calculate the Riemannian covariance matrix for a generic dataset.
 
         Parameters:
-            combined_data (pandas.DataFrame): Combined data (e.g., original data and components).
+            combined_data (numpy.ndarray or pandas.DataFrame): Combined data (e.g., original data and components).
+            stage (str): Stage name under which the block progress is reported. Default is "covariance".
 
         Returns:
             numpy.ndarray: Riemannian covariance matrix.
         """
-        riemannian_mean_index = np.argmin(np.sum(self.umap_distance_matrix, axis=1))
-        n_samples, n_features = combined_data.shape
-        cov_matrix = np.zeros((n_features, n_features))
-        for i in range(n_samples):
-            diff_vector = self.rho[i, riemannian_mean_index] * (
-                    combined_data.iloc[i] - combined_data.iloc[riemannian_mean_index])
-            cov_matrix += np.outer(diff_vector, diff_vector)
-        return cov_matrix / n_samples
+        return self.__riemannian_scatter(np.ascontiguousarray(combined_data, dtype=np.float64), stage)
 
-    def riemannian_correlation_matrix(self) -> np.ndarray:
+    def riemannian_correlation_matrix(self) -> Union[np.ndarray, sparse.csr_matrix]:
         """
         Calculates the Riemannian correlation matrix from the Riemannian covariance matrix.
 
+        For sparse input the correlation is a sparse matrix. Columns with zero Riemannian variance (e.g. absent
+        terms) get zero correlations instead of NaN, so they stay empty and drop out of the components.
+
         Returns:
-            numpy.ndarray: Riemannian correlation matrix.
+            numpy.ndarray or scipy.sparse.csr_matrix: Riemannian correlation matrix.
         """
-        cov_matrix_riemannian = self._riemannian_covariance_matrix()
-        n = cov_matrix_riemannian.shape[0]
-        corr_matrix_riemannian = np.zeros_like(cov_matrix_riemannian)
-        for i in range(n):
-            for j in range(n):
-                corr_matrix_riemannian[i, j] = cov_matrix_riemannian[i, j] / np.sqrt(
-                    cov_matrix_riemannian[i, i] * cov_matrix_riemannian[j, j])
-        return corr_matrix_riemannian
-
-    def riemannian_components_from_data_and_correlation(self, corr_matrix: np.ndarray) -> np.ndarray:
+        return self.__riemannian_correlation()
+
+    def __riemannian_correlation(self, cancel_token: Optional[CancellationToken] = None
+                                 ) -> Union[np.ndarray, sparse.csr_matrix]:
+        """Riemannian correlation matrix; `cancel_token` is checked besides the analysis' own token."""
+        with self._profiler.stage("correlation", cancel_token):
+            cov_matrix_riemannian = self._riemannian_covariance_matrix(cancel_token)
+            if sparse.issparse(cov_matrix_riemannian):
+                scale = sparse.diags(_inverse_std(cov_matrix_riemannian.diagonal()))
+                return (scale @ cov_matrix_riemannian @ scale).tocsr()
+            std = np.sqrt(np.diag(cov_matrix_riemannian))
+            return cov_matrix_riemannian / np.outer(std, std)
+
+    def __riemannian_pca(self, corr_matrix: np.ndarray, n_components: Optional[int] = None,
+                         cancel_token: Optional[CancellationToken] = None) -> np.ndarray:
         """
-        Performs Riemannian principal component analysis (PCA) using the data and the provided correlation matrix.
+        Projects the Riemannian-standardized data onto the eigenvectors of the correlation matrix.
 
         Parameters:
-            corr_matrix (numpy.ndarray): Correlation matrix of the variables.
+            corr_matrix (numpy.ndarray or scipy.sparse matrix): Correlation matrix of the variables.
+            n_components (int, optional): Number of leading components. Defaults to all of them for dense data.
+            cancel_token (CancellationToken, optional): Token checked besides the analysis' own. Default is None.
 
         Returns:
             numpy.ndarray: Matrix of principal components.
@@ -296,29 +1158,53 @@ class RiemannianAnalysis:
         """
         if corr_matrix.shape[0] != corr_matrix.shape[1]:
             raise ValueError("The correlation matrix must be square.")
-        if self._data.shape[1] != corr_matrix.shape[0]:
+        if self._values.shape[1] != corr_matrix.shape[0]:
             raise ValueError("The number of columns in the data must match the size of the correlation matrix.")
 
-        riemannian_mean_index = np.argmin(np.sum(self.umap_distance_matrix, axis=1))
-        riemannian_mean_centered_data = np.zeros_like(self._data)
-        for i in range(self._data.shape[0]):
-            riemannian_mean_centered_data[i] = self.rho[i, riemannian_mean_index] * (
-                    self._data.iloc[i] - self._data.iloc[riemannian_mean_index])
-        riemannian_std_population = np.sqrt(np.sum(riemannian_mean_centered_data ** 2, axis=0) / self._data.shape[0])
-        standardized_data = riemannian_mean_centered_data / riemannian_std_population
+        if sparse.issparse(self._values):
+            return self.__sparse_riemannian_pca(corr_matrix, n_components or 2, cancel_token)
 
-        eigenvalues, eigenvectors = np.linalg.eig(corr_matrix)
-        sorted_indices = np.argsort(eigenvalues)[::-1]
-        eigenvectors = eigenvectors[:, sorted_indices]
-        principal_components = np.dot(standardized_data, eigenvectors)
-        return principal_components
+        with self._profiler.stage("components", cancel_token):
+            riemannian_mean_centered_data = self.__riemannian_mean_centered(self._values)
+            riemannian_std_population = np.sqrt(
+                np.sum(riemannian_mean_centered_data ** 2, axis=0) / self._values.shape[0])
+            standardized_data = riemannian_mean_centered_data / riemannian_std_population
 
-    def riemannian_components(self, corr_matrix: np.ndarray) -> np.ndarray:
+            # The correlation matrix is symmetric: eigh returns real eigenpairs in increasing order.
+            eigenvectors = np.linalg.eigh(corr_matrix)[1][:, ::-1][:, :n_components]
+            principal_components = np.dot(standardized_data, eigenvectors)
+            return principal_components
+
+    def __sparse_riemannian_pca(self, corr_matrix: Any, n_components: int,
+                                cancel_token: Optional[CancellationToken] = None) -> np.ndarray:
         """
-        Performs Riemannian principal component analysis (PCA) using the supplied correlation matrix.
+        Leading Riemannian principal components of sparse data, from a truncated eigensolver.
+
+        The eigenvectors V of the correlation matrix come from `scipy.sparse.linalg.eigsh`. The standardized
+        data W (X - 1 x_m^T) D^-1 is never formed: its product with V is W (X (D^-1 V) - 1 x_m^T (D^-1 V)),
+        two sparse-times-dense products of width n_components.
+        """
+        with self._profiler.stage("components", cancel_token):
+            riemannian_mean_index, weights = self.__riemannian_mean_weights(np.float64)
+            if sparse.issparse(corr_matrix):
+                corr_matrix = corr_matrix.tocsr()
+            else:
+                corr_matrix = sparse.csr_matrix(corr_matrix)
+            _, eigenvectors = _top_eigenpairs(corr_matrix, n_components)
+            scaled = eigenvectors * _inverse_std(self.__sparse_riemannian_variances())[:, np.newaxis]
+            principal_components = np.asarray(self._values @ scaled)
+            principal_components -= self._values[riemannian_mean_index] @ scaled
+            principal_components *= weights[:, np.newaxis]
+            return principal_components
+
+    def riemannian_components_from_data_and_correlation(self, corr_matrix: np.ndarray,
+                                                        n_components: Optional[int] = None) -> np.ndarray:
+        """
+        Performs Riemannian principal component analysis (PCA) using the data and the provided correlation matrix.
 
         Parameters:
-            corr_matrix (numpy.ndarray): Riemannian correlation matrix.
+            corr_matrix (numpy.ndarray or scipy.sparse matrix): Correlation matrix of the variables.
+            n_components (int, optional): Number of leading components, see `riemannian_components`.
 
         Returns:
             numpy.ndarray: Matrix of principal components.
@@ -326,24 +1212,28 @@ class RiemannianAnalysis:
         Raises:
             ValueError: If the correlation matrix is not square or if its size does not match the number of data columns.
         """
-        if corr_matrix.shape[0] != corr_matrix.shape[1]:
-            raise ValueError("The correlation matrix must be square.")
-        if self._data.shape[1] != corr_matrix.shape[0]:
-            raise ValueError("The number of columns in the data must match the size of the correlation matrix.")
+        return self.__riemannian_pca(corr_matrix, n_components)
+
+    def riemannian_components(self, corr_matrix: np.ndarray, n_components: Optional[int] = None) -> np.ndarray:
+        """
+        Performs Riemannian principal component analysis (PCA) using the supplied correlation matrix.
+
+        For sparse input only the leading components are computed, with a truncated Lanczos solver
+        (`scipy.sparse.linalg.eigsh`) on the sparse correlation matrix; neither the data nor the correlation
+        matrix is densified.
 
-        riemannian_mean_index = np.argmin(np.sum(self.umap_distance_matrix, axis=1))
-        riemannian_mean_centered_data = np.zeros_like(self._data)
-        for i in range(self._data.shape[0]):
-            riemannian_mean_centered_data[i] = self.rho[i, riemannian_mean_index] * (
-                    self._data.iloc[i] - self._data.iloc[riemannian_mean_index])
-        riemannian_std_population = np.sqrt(np.sum(riemannian_mean_centered_data ** 2, axis=0) / self._data.shape[0])
-        standardized_data = riemannian_mean_centered_data / riemannian_std_population
+        Parameters:
+            corr_matrix (numpy.ndarray or scipy.sparse matrix): Riemannian correlation matrix.
+            n_components (int, optional): Number of leading components. Defaults to all of them for dense data
+                and to 2 for sparse data.
 
-        eigenvalues, eigenvectors = np.linalg.eig(corr_matrix)
-        sorted_indices = np.argsort(eigenvalues)[::-1]
-        eigenvectors = eigenvectors[:, sorted_indices]
-        principal_components = np.dot(standardized_data, eigenvectors)
-        return principal_components
+        Returns:
+            numpy.ndarray: Matrix of principal components, shape (n_samples, n_components).
+
+        Raises:
+            ValueError: If the correlation matrix is not square or if its size does not match the number of data columns.
+        """
+        return self.__riemannian_pca(corr_matrix, n_components)
 
     def riemannian_correlation_variables_components(self, components: np.ndarray) -> pd.DataFrame:
         """
@@ -355,19 +1245,116 @@ class RiemannianAnalysis:
         Returns:
             pandas.DataFrame: DataFrame with the correlation of each original variable with the first and second components.
         """
-        combined_data = pd.DataFrame(
-            np.hstack((self._data, components[:, 0:2])),
-            columns=[f"feature_{i + 1}" for i in range(self._data.shape[1])] + ["Component_1", "Component_2"]
-        )
-        riemannian_cov_matrix = self._riemannian_covariance_matrix_general(combined_data)
-        correlations = pd.DataFrame(
-            index=[f"feature_{i + 1}" for i in range(self._data.shape[1])],
+        n_features = self._values.shape[1]
+        with self._profiler.stage("variables_components"):
+            if sparse.issparse(self._values):
+                correlations = self.__sparse_correlation_variables_components(np.real(components[:, 0:2]))
+            else:
+                combined_data = np.hstack((self._values, np.real(components[:, 0:2])))
+                riemannian_cov_matrix = self._riemannian_covariance_matrix_general(combined_data,
+                                                                                   "variables_components")
+                variances = np.diag(riemannian_cov_matrix)
+                correlations = riemannian_cov_matrix[:n_features, -2:] / np.sqrt(
+                    np.outer(variances[:n_features], variances[-2:]))
+        return pd.DataFrame(
+            correlations,
+            index=[f"feature_{i + 1}" for i in range(n_features)],
             columns=["Component_1", "Component_2"]
         )
-        for i in range(self._data.shape[1]):
-            correlations.loc[f"feature_{i + 1}", "Component_1"] = riemannian_cov_matrix[i, -2] / np.sqrt(
-                riemannian_cov_matrix[i, i] * riemannian_cov_matrix[-2, -2])
-        for i in range(self._data.shape[1]):
-            correlations.loc[f"feature_{i + 1}", "Component_2"] = riemannian_cov_matrix[i, -1] / np.sqrt(
-                riemannian_cov_matrix[i, i] * riemannian_cov_matrix[-1, -1])
-        return correlations
+
+    def __sparse_correlation_variables_components(self, components: np.ndarray) -> np.ndarray:
+        """
+        Riemannian correlations between the sparse variables and dense components, without stacking them.
+
+        The cross covariance is (X^T (W C) - x_m^T sum(W C)) / n, with C the components weighted and centered
+        on the mean row, so only sparse-times-dense products of width 2 are needed.
+        """
+        riemannian_mean_index, weights = self.__riemannian_mean_weights(np.float64)
+        n_rows = self._values.shape[0]
+        centered = (components - components[riemannian_mean_index]) * weights[:, np.newaxis]
+        weighted = centered * weights[:, np.newaxis]
+        mean_row = self._values[riemannian_mean_index].toarray().ravel()
+        cross = (np.asarray(self._values.T @ weighted) - np.outer(mean_row, weighted.sum(axis=0))) / n_rows
+        component_variances = np.einsum("ij,ij->j", centered, centered) / n_rows
+        return cross / np.sqrt(np.outer(self.__sparse_riemannian_variances(), component_variances))
+
+    def riemannian_components_by_group(self, groups: Union[np.ndarray, pd.Series, Sequence[Any]]
+                                       ) -> Dict[Any, GroupComponents]:
+        """
+        Performs a separate Riemannian PCA on every group of rows, reusing the UMAP graph fitted on all the data.
+
+        The Riemannian mean of a group is its medoid: the member with the smallest total UMAP distance to the
+        other members. Every row is centered on the mean of its group and weighted by its Rho value with
+        respect to it. The groups are zero-padded into one (n_groups, max_group_size, n_features) tensor, so
+        the covariances, eigendecompositions and projections of all groups are single batched operations.
+
+        Parameters:
+            groups (array-like): Group label of every row, e.g. the `cluster` column of the data.
+
+        Returns:
+            Dict[Any, GroupComponents]: Results per group label, in sorted label order.
+
+        Raises:
+            ValueError: If the UMAP distance matrix has not been calculated, if `groups` does not have one
+                label per row, has missing labels, if a group has fewer than two rows, or if the data is sparse.
+        """
+        if self.__umap_distance_matrix is None:
+            raise ValueError("UMAP distance matrix must be calculated before obtaining grouped components.")
+        self.__require_dense("riemannian_components_by_group()")
+        n_rows, n_features = self._values.shape
+        codes, labels = pd.factorize(np.asarray(groups).ravel(), sort=True)
+        if codes.shape[0] != n_rows:
+            raise ValueError(f"Expected one group label per row ({n_rows}), got {codes.shape[0]}.")
+        if (codes < 0).any():
+            raise ValueError("Group labels must not be missing.")
+        sizes = np.bincount(codes, minlength=len(labels))
+        if (sizes < 2).any():
+            raise ValueError(f"Every group needs at least two rows; too small: {list(labels[sizes < 2])}.")
+
+        with self._profiler.stage("grouped_components"):
+            n_groups = len(labels)
+            membership = sparse.csr_matrix((np.ones(n_rows), (np.arange(n_rows), codes)),
+                                           shape=(n_rows, n_groups))
+            # Total distance of every row to the members of its own group, one block of rows at a time.
+            own_sums = np.empty(n_rows)
+            for start, stop in self.__row_blocks(n_rows):
+                block_sums = membership.T @ self.__distance_rows(start, stop).T
+                own_sums[start:stop] = block_sums[codes[start:stop], np.arange(stop - start)]
+                self._profiler.progress("grouped_components", stop, n_rows)
+            group_starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+            mean_indices = np.lexsort((own_sums, codes))[group_starts]
+
+            if self.__rho is not None:
+                mean_weights = np.asarray(self.__rho[:, mean_indices]).T
+            else:
+                mean_weights = np.vstack([self.__rho_rows(index, index + 1) for index in mean_indices])
+            weights = mean_weights[codes, np.arange(n_rows)]
+            centered = np.subtract(self._values, self._values[mean_indices][codes], dtype=np.float64)
+            centered *= weights[:, np.newaxis]
+
+            by_group = np.argsort(codes, kind="stable")
+            ranks = np.empty(n_rows, dtype=np.intp)
+            ranks[by_group] = np.arange(n_rows) - np.repeat(group_starts, sizes)
+            padded = np.zeros((n_groups, sizes.max(), n_features))
+            padded[codes, ranks] = centered
+
+            covariances = np.matmul(padded.transpose(0, 2, 1), padded) / sizes[:, np.newaxis, np.newaxis]
+            std = np.sqrt(np.diagonal(covariances, axis1=1, axis2=2))
+            correlations = covariances / (std[:, :, np.newaxis] * std[:, np.newaxis, :])
+            eigenvalues, eigenvectors = np.linalg.eigh(correlations)
+            eigenvalues, eigenvectors = eigenvalues[:, ::-1], eigenvectors[:, :, ::-1]
+            components = np.matmul(padded / std[:, np.newaxis, :], eigenvectors)
+            inertia = eigenvalues / eigenvalues.sum(axis=1, keepdims=True)
+
+        return {
+            label: GroupComponents(
+                indices=by_group[group_starts[g]:group_starts[g] + sizes[g]],
+                mean_index=int(mean_indices[g]),
+                covariance=covariances[g],
+                correlation=correlations[g],
+                eigenvalues=eigenvalues[g],
+                components=components[g, :sizes[g]],
+                inertia=inertia[g],
+            )
+            for g, label in enumerate(labels)
+        }
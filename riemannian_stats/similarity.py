@@ -0,0 +1,239 @@
+import abc
+from typing import Any, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Constants of UMAP's `smooth_knn_dist`, so that `FuzzyKNNSimilarity` reproduces its membership strengths.
+_SMOOTH_K_TOLERANCE = 1e-5
+_MIN_K_DIST_SCALE = 1e-3
+_BISECTION_STEPS = 64
+# Cost classes of the graph stage known to the planner: a UMAP fit, or one exact kNN search.
+PLANNING_KINDS = ("umap", "knn")
+
+
+class SimilarityBackend(abc.ABC):
+    """
+    Builds the sparse similarity graph whose entries s_ij give the Riemannian weights rho_ij = 1 - s_ij.
+
+    Subclasses implement `graph(values)`; it must return a symmetric (n, n) CSR matrix with entries in
+    [0, 1] and a zero diagonal. `RiemannianAnalysis` accepts an instance through its `similarity`
+    argument, or a name from `SIMILARITY_BACKENDS` built with the analysis' n_neighbors, min_dist and metric.
+    The class attribute `planning_kind` tells the planner which cost class of `PLANNING_KINDS` the graph
+    stage belongs to; it defaults to "umap", the most expensive one.
+
+    Parameters:
+        n_neighbors (int): Size of the neighbourhood of every row, the row itself included. Default is 3.
+        metric (str): Distance metric of the neighbour search. Default is "euclidean".
+
+    Methods:
+        graph(values: np.ndarray) -> scipy.sparse.csr_matrix:
+            Similarity graph of the rows of `values`.
+    """
+
+    planning_kind = "umap"
+
+    def __init__(self, n_neighbors: int = 3, metric: str = "euclidean") -> None:
+        if n_neighbors < 2:
+            raise ValueError("n_neighbors must be at least 2.")
+        self.n_neighbors = n_neighbors
+        self.metric = metric
+
+    @abc.abstractmethod
+    def graph(self, values: np.ndarray) -> sparse.csr_matrix:
+        """Returns the symmetric (n, n) similarity graph of the rows of `values`."""
+
+    def __repr__(self) -> str:
+        params = ", ".join(f"{name}={value!r}" for name, value in vars(self).items())
+        return f"{type(self).__name__}({params})"
+
+    def __eq__(self, other: Any) -> bool:
+        return type(self) is type(other) and vars(self) == vars(other)
+
+    def __hash__(self) -> int:
+        return hash(repr(self))
+
+
+class UMAPSimilarity(SimilarityBackend):
+    """
+    The fuzzy simplicial set of a fitted `umap.UMAP` (its `graph_`); the default backend.
+
+    UMAP fits a full embedding as well, and imports numba and pynndescent, whose kernels are compiled on
+    the first fit of a process (see `RiemannianAnalysis.warmup`).
+
+    Parameters:
+        n_neighbors (int): UMAP neighbourhood size. Default is 3.
+        min_dist (float): UMAP min_dist. It only shapes the embedding, not the graph. Default is 0.1.
+        metric (str): UMAP metric. Default is "euclidean".
+    """
+
+    def __init__(self, n_neighbors: int = 3, min_dist: float = 0.1, metric: str = "euclidean") -> None:
+        super().__init__(n_neighbors, metric)
+        self.min_dist = min_dist
+
+    def graph(self, values: np.ndarray) -> sparse.csr_matrix:
+        # umap (with numba and pynndescent) takes seconds to import, so it is only loaded when a graph is fitted.
+        import umap
+
+        reducer = umap.UMAP(n_neighbors=self.n_neighbors, min_dist=self.min_dist, metric=self.metric)
+        reducer.fit(values)
+        return sparse.csr_matrix(reducer.graph_)
+
+
+class _KNNSimilarity(SimilarityBackend):
+    """
+    Base of the backends built on an exact scikit-learn `NearestNeighbors` search.
+
+    Parameters:
+        n_neighbors (int): Neighbours per row, the row itself included. Default is 3.
+        metric (str): Any metric of `sklearn.neighbors.NearestNeighbors`. Default is "euclidean".
+        algorithm (str): "kd_tree", "ball_tree", "brute" or "auto". Default is "auto".
+        leaf_size (int): Leaf size of the tree. Default is 30.
+    """
+
+    planning_kind = "knn"
+
+    def __init__(self, n_neighbors: int = 3, metric: str = "euclidean", algorithm: str = "auto",
+                 leaf_size: int = 30) -> None:
+        super().__init__(n_neighbors, metric)
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+
+    def _kneighbors(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the distances and positions of the n_neighbors nearest rows of every row, itself first."""
+        # scikit-learn takes a while to import, so it is only loaded when a graph is fitted.
+        from sklearn.neighbors import NearestNeighbors
+
+        n_neighbors = min(self.n_neighbors, values.shape[0])
+        search = NearestNeighbors(n_neighbors=n_neighbors, metric=self.metric, algorithm=self.algorithm,
+                                  leaf_size=self.leaf_size).fit(values)
+        distances, indices = search.kneighbors(values)
+        # With duplicate rows the row itself may not come first; swap it into column 0.
+        self_column = np.argmax(indices == np.arange(len(indices))[:, np.newaxis], axis=1)
+        rows = np.arange(len(indices))
+        indices[rows, self_column], distances[rows, self_column] = indices[:, 0].copy(), distances[:, 0].copy()
+        indices[:, 0], distances[:, 0] = rows, 0.0
+        return distances, indices
+
+    @staticmethod
+    def _to_graph(weights: np.ndarray, indices: np.ndarray) -> sparse.csr_matrix:
+        """Builds the directed (n, n) kNN graph from per-row weights, without the self entries."""
+        n_rows = indices.shape[0]
+        rows = np.repeat(np.arange(n_rows), indices.shape[1] - 1)
+        graph = sparse.csr_matrix((weights[:, 1:].ravel(), (rows, indices[:, 1:].ravel())), shape=(n_rows, n_rows))
+        graph.eliminate_zeros()
+        return graph
+
+
+class FuzzyKNNSimilarity(_KNNSimilarity):
+    """
+    UMAP's fuzzy simplicial set computed directly from an exact kNN search, without fitting an embedding.
+
+    As in `umap.umap_.fuzzy_simplicial_set`, the membership of neighbour j of row i is
+    exp(-(d_ij - r_i) / sigma_i), where r_i is the distance to the nearest other row and sigma_i is found by
+    bisection so that the memberships of row i sum to log2(n_neighbors). The directed graph A is then
+    symmetrized by the fuzzy union A + A^T - A * A^T. All rows are solved together with NumPy, so neither
+    numba nor pynndescent is needed. The graph equals UMAP's whenever UMAP's own neighbour search is exact
+    (fewer than 4096 rows), up to ties between equidistant neighbours.
+
+    Parameters:
+        n_neighbors (int): Neighbours per row, the row itself included. Default is 3.
+        metric (str): Any metric of `sklearn.neighbors.NearestNeighbors`. Default is "euclidean".
+        algorithm (str): "kd_tree", "ball_tree", "brute" or "auto". Default is "auto".
+        leaf_size (int): Leaf size of the tree. Default is 30.
+    """
+
+    def graph(self, values: np.ndarray) -> sparse.csr_matrix:
+        distances, indices = self._kneighbors(values)
+        others = distances[:, 1:]
+        # r_i: distance to the nearest other row at a positive distance (local_connectivity = 1).
+        positive = np.where(others > 0, others, np.inf).min(axis=1)
+        r = np.where(np.isfinite(positive), positive, 0.0)
+
+        target = np.log2(distances.shape[1])
+        # Neighbours no farther than r_i have membership exp(0) = 1.
+        shifted = np.maximum(others - r[:, np.newaxis], 0.0)
+        low, high, sigma = np.zeros(len(r)), np.full(len(r), np.inf), np.ones(len(r))
+        active = np.ones(len(r), dtype=bool)
+        for _ in range(_BISECTION_STEPS):
+            total = np.exp(-shifted / sigma[:, np.newaxis]).sum(axis=1)
+            active &= np.abs(total - target) >= _SMOOTH_K_TOLERANCE
+            if not active.any():
+                break
+            above = active & (total > target)
+            below = active & ~above
+            high[above] = sigma[above]
+            low[below] = sigma[below]
+            doubled = below & np.isinf(high)
+            sigma[doubled] *= 2
+            bisected = active & ~doubled
+            sigma[bisected] = (low[bisected] + high[bisected]) / 2
+        scale = np.where(r > 0, distances.mean(axis=1), distances.mean())
+        sigma = np.maximum(sigma, _MIN_K_DIST_SCALE * scale)
+
+        # sigma_i is only 0 when every neighbour of row i is a duplicate; their memberships are then 1.
+        sigma = np.where(sigma > 0, sigma, 1.0)
+        weights = np.hstack((np.zeros((len(r), 1)), np.exp(-shifted / sigma[:, np.newaxis])))
+        directed = self._to_graph(weights, indices)
+        transposed = directed.T.tocsr()
+        graph = directed + transposed - directed.multiply(transposed)
+        graph.eliminate_zeros()
+        return graph.tocsr()
+
+
+class GaussianKNNSimilarity(_KNNSimilarity):
+    """
+    Self-tuning Gaussian kernel on the kNN graph: s_ij = exp(-d_ij^2 / (sigma_i * sigma_j)).
+
+    sigma_i is the distance from row i to its farthest kNN neighbour, so the kernel adapts to the local
+    density. Rows that are neighbours in either direction get the same similarity, so the graph is symmetric.
+    It is the cheapest backend: one kNN search and one exponential per edge.
+
+    Parameters:
+        n_neighbors (int): Neighbours per row, the row itself included. Default is 3.
+        metric (str): Any metric of `sklearn.neighbors.NearestNeighbors`. Default is "euclidean".
+        algorithm (str): "kd_tree", "ball_tree", "brute" or "auto". Default is "auto".
+        leaf_size (int): Leaf size of the tree. Default is 30.
+    """
+
+    def graph(self, values: np.ndarray) -> sparse.csr_matrix:
+        distances, indices = self._kneighbors(values)
+        sigma = distances[:, -1]
+        sigma = np.where(sigma > 0, sigma, 1.0)
+        weights = np.exp(-distances ** 2 / (sigma[:, np.newaxis] * sigma[indices]))
+        directed = self._to_graph(weights, indices)
+        return directed.maximum(directed.T).tocsr()
+
+
+SIMILARITY_BACKENDS = {
+    "umap": UMAPSimilarity,
+    "fuzzy_knn": FuzzyKNNSimilarity,
+    "gaussian_knn": GaussianKNNSimilarity,
+}
+
+
+def make_similarity(similarity: Any, n_neighbors: int = 3, min_dist: float = 0.1,
+                    metric: str = "euclidean") -> SimilarityBackend:
+    """
+    Returns the backend for a `similarity` argument of `RiemannianAnalysis`.
+
+    Parameters:
+        similarity (str or SimilarityBackend): A name from `SIMILARITY_BACKENDS`, or a backend used as is.
+        n_neighbors (int): Neighbourhood size of a named backend. Default is 3.
+        min_dist (float): UMAP min_dist of the "umap" backend. Default is 0.1.
+        metric (str): Metric of a named backend. Default is "euclidean".
+
+    Returns:
+        SimilarityBackend: The backend.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if isinstance(similarity, SimilarityBackend):
+        return similarity
+    if similarity not in SIMILARITY_BACKENDS:
+        raise ValueError(f"Unknown similarity {similarity!r}; expected one of {tuple(SIMILARITY_BACKENDS)} "
+                         "or a SimilarityBackend.")
+    if similarity == "umap":
+        return UMAPSimilarity(n_neighbors=n_neighbors, min_dist=min_dist, metric=metric)
+    return SIMILARITY_BACKENDS[similarity](n_neighbors=n_neighbors, metric=metric)
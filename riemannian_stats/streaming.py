@@ -0,0 +1,261 @@
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_processing import DataProcessing
+
+
+class StreamingRiemannianCovariance:
+    """
+    Accumulates the Riemannian covariance of a dataset chunk by chunk.
+
+    Each row x_i contributes its weighted deviation z_i = rho_i * (x_i - mean) from the fixed Riemannian mean.
+    The covariance is (1/n) * sum(z_i z_i^T). Every chunk is reduced to its count, mean deviation and centered
+    scatter matrix. Chunks are combined with the pairwise merged-moment update of Chan et al., so large offsets
+    in z do not cancel catastrophically. Partial accumulators built on different chunks (e.g. in other
+    processes) can be combined with `merge`.
+
+    Parameters:
+        mean (np.ndarray): The Riemannian mean row, shape (n_features,).
+        weights (np.ndarray, optional): Rho weight of every row, shape (n_samples,). When given, `update` takes
+            the weights of consecutive chunks from it; otherwise they must be passed with every chunk.
+
+    Attributes:
+        n_samples_ (int): Number of rows accumulated so far.
+    """
+
+    def __init__(self, mean: np.ndarray, weights: Optional[np.ndarray] = None) -> None:
+        self.mean = np.asarray(mean, dtype=np.float64).ravel()
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64).ravel()
+        n_features = self.mean.shape[0]
+        self.n_samples_ = 0
+        self._deviation_mean = np.zeros(n_features)
+        self._scatter = np.zeros((n_features, n_features))
+
+    def update(self, chunk: Any, weights: Optional[np.ndarray] = None) -> "StreamingRiemannianCovariance":
+        """
+        Adds a chunk of rows.
+
+        Parameters:
+            chunk (np.ndarray, pd.DataFrame or pyarrow.Table): The next rows of the data, shape (m, n_features).
+            weights (np.ndarray, optional): Rho weights of these rows. Defaults to the next m entries of `weights`.
+
+        Returns:
+            StreamingRiemannianCovariance: self, for chaining.
+
+        Raises:
+            ValueError: If the chunk has the wrong number of columns or no weights are available for its rows.
+        """
+        deviations = self._weighted_deviations(chunk, weights, self.n_samples_)
+        count = deviations.shape[0]
+        if count == 0:
+            return self
+        chunk_mean = deviations.mean(axis=0)
+        deviations -= chunk_mean
+        self._combine(count, chunk_mean, deviations.T @ deviations)
+        return self
+
+    def merge(self, other: "StreamingRiemannianCovariance") -> "StreamingRiemannianCovariance":
+        """
+        Adds the moments accumulated by another instance with the same Riemannian mean.
+
+        Parameters:
+            other (StreamingRiemannianCovariance): Accumulator over a disjoint set of rows.
+
+        Returns:
+            StreamingRiemannianCovariance: self, for chaining.
+
+        Raises:
+            ValueError: If the two accumulators are centered on different means.
+        """
+        if not np.array_equal(self.mean, other.mean):
+            raise ValueError("Only accumulators centered on the same Riemannian mean can be merged.")
+        if other.n_samples_:
+            self._combine(other.n_samples_, other._deviation_mean, other._scatter)
+        return self
+
+    @property
+    def covariance_(self) -> np.ndarray:
+        """Returns the Riemannian covariance matrix of the rows accumulated so far."""
+        if self.n_samples_ == 0:
+            raise ValueError("No rows have been accumulated.")
+        return (self._scatter + self.n_samples_ * np.outer(self._deviation_mean, self._deviation_mean)) \
+            / self.n_samples_
+
+    @property
+    def correlation_(self) -> np.ndarray:
+        """Returns the Riemannian correlation matrix of the rows accumulated so far."""
+        covariance = self.covariance_
+        std = np.sqrt(np.diag(covariance))
+        return covariance / np.outer(std, std)
+
+    def _weighted_deviations(self, chunk: Any, weights: Optional[np.ndarray], start: int) -> np.ndarray:
+        """Returns rho_i * (x_i - mean) for the rows of `chunk`, whose first row is row `start` of the data."""
+        values = DataProcessing.to_float_array(chunk)[0]
+        if values.shape[1] != self.mean.shape[0]:
+            raise ValueError(f"Chunks must have {self.mean.shape[0]} columns, got {values.shape[1]}.")
+        if weights is None:
+            if self.weights is None:
+                raise ValueError("Pass the Rho weights of the chunk or construct the accumulator with weights.")
+            weights = self.weights[start:start + values.shape[0]]
+        weights = np.asarray(weights, dtype=np.float64).ravel()
+        if weights.shape[0] != values.shape[0]:
+            raise ValueError(f"Expected {values.shape[0]} weights for the chunk, got {weights.shape[0]}; "
+                             f"the chunks contain more rows than the weights.")
+        deviations = np.subtract(values, self.mean, dtype=np.float64)
+        deviations *= weights[:, np.newaxis]
+        return deviations
+
+    def _combine(self, count: int, mean: np.ndarray, scatter: np.ndarray) -> None:
+        """Merges (count, mean, centered scatter) moments into the running totals."""
+        total = self.n_samples_ + count
+        delta = mean - self._deviation_mean
+        self._scatter += scatter + np.outer(delta, delta) * (self.n_samples_ * count / total)
+        self._deviation_mean += delta * (count / total)
+        self.n_samples_ = total
+
+
+class StreamingRiemannianPCA:
+    """
+    Riemannian covariance, correlation and principal components computed from row chunks in O(p^2 + chunk) memory.
+
+    The Riemannian mean and the Rho weights of every row are the only inputs needed from the fitted UMAP
+    geometry (see `RiemannianAnalysis.streaming_pca`). Only the weights, one float per row, scale with n.
+    The chunks themselves are read one at a time, e.g. from `DataProcessing.iter_chunks`. A first pass
+    (`partial_fit` or `fit`) accumulates the covariance. A second pass (`iter_components`,
+    `correlation_variables_components`) projects the chunks onto the components. The results equal those of
+    `RiemannianAnalysis` on the in-memory data.
+
+    Parameters:
+        mean (np.ndarray): The Riemannian mean row, shape (n_features,).
+        weights (np.ndarray): Rho weight of every row with respect to the mean, shape (n_samples,).
+
+    Properties:
+        n_samples_ (int): Number of rows accumulated.
+        covariance_ (np.ndarray): Riemannian covariance matrix.
+        correlation_ (np.ndarray): Riemannian correlation matrix.
+        eigenvalues_ (np.ndarray): Eigenvalues of the correlation matrix in decreasing order.
+        eigenvectors_ (np.ndarray): Matching eigenvectors as columns.
+    """
+
+    def __init__(self, mean: np.ndarray, weights: np.ndarray) -> None:
+        self._covariance = StreamingRiemannianCovariance(mean, weights)
+        self.__eigen = None
+
+    @property
+    def n_samples_(self) -> int:
+        return self._covariance.n_samples_
+
+    @property
+    def covariance_(self) -> np.ndarray:
+        return self._covariance.covariance_
+
+    @property
+    def correlation_(self) -> np.ndarray:
+        return self._covariance.correlation_
+
+    @property
+    def eigenvalues_(self) -> np.ndarray:
+        return self.__eigendecomposition()[0]
+
+    @property
+    def eigenvectors_(self) -> np.ndarray:
+        return self.__eigendecomposition()[1]
+
+    def partial_fit(self, chunk: Any, weights: Optional[np.ndarray] = None) -> "StreamingRiemannianPCA":
+        """
+        Accumulates the next chunk of rows into the covariance.
+
+        Parameters:
+            chunk (np.ndarray, pd.DataFrame or pyarrow.Table): The next rows of the data.
+            weights (np.ndarray, optional): Rho weights of these rows; defaults to the matching slice of `weights`.
+
+        Returns:
+            StreamingRiemannianPCA: self, for chaining.
+        """
+        self._covariance.update(chunk, weights)
+        self.__eigen = None
+        return self
+
+    def fit(self, chunks: Iterable[Any]) -> "StreamingRiemannianPCA":
+        """
+        Accumulates every chunk of an iterable (first pass over the data).
+
+        Parameters:
+            chunks (Iterable): Consecutive row chunks, e.g. `DataProcessing.iter_chunks(path)`.
+
+        Returns:
+            StreamingRiemannianPCA: self, for chaining.
+        """
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def transform(self, chunk: Any, start: int = 0, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Projects a chunk of rows onto the Riemannian principal components.
+
+        Parameters:
+            chunk (np.ndarray, pd.DataFrame or pyarrow.Table): Rows of the data.
+            start (int): Position of the chunk's first row in the data, used to look up its weights. Default is 0.
+            weights (np.ndarray, optional): Rho weights of these rows, overriding the lookup.
+
+        Returns:
+            np.ndarray: Principal components of the rows, shape (m, n_features).
+        """
+        deviations = self._covariance._weighted_deviations(chunk, weights, start)
+        std = np.sqrt(np.diag(self.covariance_))
+        return np.dot(deviations / std, self.eigenvectors_)
+
+    def iter_components(self, chunks: Iterable[Any]) -> Iterator[np.ndarray]:
+        """
+        Yields the principal components of consecutive chunks (second pass over the data).
+
+        Parameters:
+            chunks (Iterable): The same chunks, in the same order, as were used for fitting.
+
+        Yields:
+            np.ndarray: Components of the next chunk.
+        """
+        start = 0
+        for chunk in chunks:
+            components = self.transform(chunk, start=start)
+            start += components.shape[0]
+            yield components
+
+    def correlation_variables_components(self, chunks: Iterable[Any]) -> pd.DataFrame:
+        """
+        Calculates the Riemannian correlation between the variables and the first two components (second pass).
+
+        Parameters:
+            chunks (Iterable): The same chunks, in the same order, as were used for fitting.
+
+        Returns:
+            pandas.DataFrame: Correlation of each variable with the first and second components.
+        """
+        covariance = self._covariance
+        n_features = covariance.mean.shape[0]
+        combined = StreamingRiemannianCovariance(np.concatenate([covariance.mean, np.zeros(2)]), covariance.weights)
+        start = 0
+        for chunk in chunks:
+            values = DataProcessing.to_float_array(chunk)[0]
+            components = self.transform(values, start=start)
+            # The mean row projects onto the origin, so the components are centered on zero.
+            combined.update(np.hstack((values, components[:, :2])))
+            start += values.shape[0]
+        variances = np.diag(combined.covariance_)
+        correlations = combined.covariance_[:n_features, -2:] / np.sqrt(
+            np.outer(variances[:n_features], variances[-2:]))
+        return pd.DataFrame(
+            correlations,
+            index=[f"feature_{i + 1}" for i in range(n_features)],
+            columns=["Component_1", "Component_2"]
+        )
+
+    def __eigendecomposition(self):
+        """Eigenpairs of the correlation matrix sorted by decreasing eigenvalue, as in `RiemannianAnalysis`."""
+        if self.__eigen is None:
+            eigenvalues, eigenvectors = np.linalg.eigh(self.correlation_)
+            self.__eigen = eigenvalues[::-1], eigenvectors[:, ::-1]
+        return self.__eigen
@@ -1,6 +1,7 @@
-import numpy as np
+from typing import Optional, Sequence, Tuple, Union
 
 import numpy as np
+from scipy import sparse
 
 
 class Utilities:
@@ -34,10 +35,123 @@ class Utilities:
         if not (0 <= component1 < correlation_matrix.shape[0]) or not (0 <= component2 < correlation_matrix.shape[0]):
             raise ValueError("Component indices are out of bounds.")
 
-        eigenvalues, _ = np.linalg.eig(correlation_matrix)
-        sorted_eigenvalues = np.sort(eigenvalues)[::-1]
-
-        total_inertia = np.sum(sorted_eigenvalues)
+        if sparse.issparse(correlation_matrix):
+            # Only the leading eigenvalues are computed; the total inertia is the trace.
+            sorted_eigenvalues = Utilities.pca_spectrum(correlation_matrix, max(component1, component2) + 1)
+            total_inertia = correlation_matrix.diagonal().sum()
+        else:
+            sorted_eigenvalues = Utilities.pca_spectrum(correlation_matrix)
+            total_inertia = np.sum(sorted_eigenvalues)
         selected_inertia = sorted_eigenvalues[component1] + sorted_eigenvalues[component2]
         return selected_inertia / total_inertia
 
+    @staticmethod
+    def pca_spectrum(correlation_matrix: np.ndarray, n_components: Optional[int] = None) -> np.ndarray:
+        """
+        Computes the eigenvalues of a correlation matrix once, sorted in decreasing order.
+
+        The matrix is assumed symmetric (as correlation matrices are), so the symmetric solver
+        `np.linalg.eigvalsh` is used: it is faster than a general eigendecomposition and always returns
+        real eigenvalues. Pass the result to `pca_inertia` or `pca_inertia_by_component_pairs` to avoid
+        decomposing the same matrix again.
+
+        A scipy sparse correlation matrix (from sparse data) is never densified: only its `n_components`
+        largest eigenvalues are computed with a truncated Lanczos solver (`scipy.sparse.linalg.eigsh`).
+
+        Parameters:
+            correlation_matrix (np.ndarray or scipy.sparse matrix): Square, symmetric correlation matrix.
+            n_components (int, optional): Number of leading eigenvalues. Defaults to all of them for a dense
+                matrix and to 2 for a sparse one.
+
+        Returns:
+            np.ndarray: Eigenvalues sorted from largest to smallest.
+
+        Raises:
+            ValueError: If the correlation matrix is not square.
+        """
+        if sparse.issparse(correlation_matrix):
+            return _top_eigenpairs(correlation_matrix, n_components or 2)[0]
+        correlation_matrix = np.asarray(correlation_matrix)
+        if correlation_matrix.ndim != 2 or correlation_matrix.shape[0] != correlation_matrix.shape[1]:
+            raise ValueError("The correlation matrix must be square.")
+        return np.linalg.eigvalsh(correlation_matrix)[::-1][:n_components]
+
+    @staticmethod
+    def pca_inertia(spectrum: np.ndarray, total: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates the inertia (explained variance ratio) of every component and its cumulative sum.
+
+        Parameters:
+            spectrum (np.ndarray): Eigenvalues from `pca_spectrum`, or a correlation matrix (decomposed once).
+            total (float, optional): Total inertia. Defaults to the sum of `spectrum`; pass the trace of the
+                correlation matrix when `spectrum` only holds the leading eigenvalues.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Per-component inertia and cumulative inertia, both between 0 and 1.
+        """
+        eigenvalues = Utilities._as_spectrum(spectrum)
+        inertia = eigenvalues / (np.sum(eigenvalues) if total is None else total)
+        return inertia, np.cumsum(inertia)
+
+    @staticmethod
+    def pca_inertia_by_component_pairs(spectrum: np.ndarray,
+                                       pairs: Union[np.ndarray, Sequence[Tuple[int, int]]]) -> np.ndarray:
+        """
+        Calculates the inertia explained by each pair of components, vectorized over all pairs.
+
+        Equivalent to calling `pca_inertia_by_components` for every pair, with a single decomposition.
+
+        Parameters:
+            spectrum (np.ndarray): Eigenvalues from `pca_spectrum`, or a correlation matrix (decomposed once).
+            pairs (array-like): Sequence of (component1, component2) 0-based index pairs, shape (n_pairs, 2).
+
+        Returns:
+            np.ndarray: Inertia of each pair, shape (n_pairs,).
+
+        Raises:
+            ValueError: If `pairs` does not have shape (n_pairs, 2) or an index is out of bounds.
+        """
+        eigenvalues = Utilities._as_spectrum(spectrum)
+        pairs = np.asarray(pairs, dtype=np.intp)
+        if pairs.size == 0:
+            pairs = pairs.reshape(0, 2)
+        if pairs.ndim != 2 or pairs.shape[1] != 2:
+            raise ValueError("Component pairs must have shape (n_pairs, 2).")
+        if np.any(pairs < 0) or np.any(pairs >= eigenvalues.shape[0]):
+            raise ValueError("Component indices are out of bounds.")
+        return (eigenvalues[pairs[:, 0]] + eigenvalues[pairs[:, 1]]) / np.sum(eigenvalues)
+
+    @staticmethod
+    def _as_spectrum(spectrum: np.ndarray) -> np.ndarray:
+        """Accepts either a precomputed spectrum or a correlation matrix to decompose."""
+        spectrum = np.asarray(spectrum)
+        if spectrum.ndim == 2:
+            return Utilities.pca_spectrum(spectrum)
+        if spectrum.ndim != 1:
+            raise ValueError("Expected a 1-D spectrum or a square correlation matrix.")
+        return spectrum
+
+
+def _top_eigenpairs(matrix: sparse.spmatrix, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the k largest eigenvalues (decreasing) and eigenvectors of a symmetric sparse matrix.
+
+    Uses the Lanczos solver `eigsh`, which only multiplies by the matrix; matrices too small for it
+    (k >= size - 1) are decomposed densely.
+
+    Raises:
+        ValueError: If the matrix is not square or k is not in [1, size].
+    """
+    size = matrix.shape[0]
+    if matrix.ndim != 2 or matrix.shape[1] != size:
+        raise ValueError("The correlation matrix must be square.")
+    if not 1 <= k <= size:
+        raise ValueError(f"The number of components must be between 1 and {size}, got {k}.")
+    if k >= size - 1:
+        eigenvalues, eigenvectors = np.linalg.eigh(matrix.toarray())
+    else:
+        from scipy.sparse.linalg import eigsh
+
+        eigenvalues, eigenvectors = eigsh(matrix.astype(np.float64), k=k, which="LA")
+    order = np.argsort(eigenvalues)[::-1][:k]
+    return eigenvalues[order], eigenvectors[:, order]
@@ -1,8 +1,39 @@
-from typing import Optional, Tuple, Union
-import matplotlib.pyplot as plt
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple, Union
 import numpy as np
 import pandas as pd
 
+# Above this many points the principal-plane plots switch to their large-data defaults: rasterized markers
+# and labels only for the _DEFAULT_MAX_LABELS points farthest from the origin.
+_LARGE_N = 5000
+_DEFAULT_MAX_LABELS = 50
+_DENSITY_KINDS = ("hexbin", "hist2d")
+# The correlation circle labels every variable up to _MAX_CIRCLE_LABELS arrows and otherwise keeps one label
+# per cell of a _CIRCLE_LABEL_GRID x _CIRCLE_LABEL_GRID grid.
+_MAX_CIRCLE_LABELS = 50
+_CIRCLE_LABEL_GRID = 16
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+
+def _to_rgba(color) -> np.ndarray:
+    """Converts a matplotlib color specification into an RGBA array."""
+    from matplotlib.colors import to_rgba
+
+    return np.asarray(to_rgba(color))
+
+
+def _pyplot():
+    """
+    Imports matplotlib.pyplot on first use.
+
+    Importing pyplot selects a backend, so it is deferred until a plot is drawn; the backend stays the
+    caller's choice (``matplotlib.use`` or the ``MPLBACKEND`` environment variable).
+    """
+    import matplotlib.pyplot as plt
+
+    return plt
+
 
 class Visualization:
     """
@@ -22,10 +53,14 @@ class Visualization:
         explained_inertia (float): Read-only access to the explained inertia percentage.
         clusters (np.ndarray or None): Read-only access to cluster labels.
 
+    Every plot method returns its matplotlib Figure, accepts `save_to=` to write it to a file and `show=False`
+    to skip `plt.show()` (see `Report` for rendering a full set of plots in batch jobs).
+
     Methods:
         plot_principal_plane(title=""): 2D projection of the components with point labels.
         plot_principal_plane_with_clusters(title=""): Same as above, but colored by clusters.
-        plot_correlation_circle(correlations, title="", scale=1, draw_circle=True): Visualizes correlation of variables.
+        plot_correlation_circle(correlations, title="", scale=1, draw_circle=True, top_k=None, min_norm=0.0):
+            Visualizes correlation of variables.
         plot_2d_scatter_with_clusters(x_col, y_col, cluster_col, title="", figsize=(10, 8)): 2D scatter plot by cluster.
         plot_3d_scatter_with_clusters(x_col, y_col, z_col, cluster_col, title="", ...): 3D scatter plot by cluster.
     """
@@ -72,13 +107,35 @@ class Visualization:
         """Returns the cluster labels for each data point."""
         return self._clusters
 
-    def plot_principal_plane(self, title: str = "") -> None:
+    def plot_principal_plane(self, title: str = "", max_labels: Optional[int] = None,
+                             label_subset: Optional[Sequence] = None, rasterized: Optional[bool] = None,
+                             density: Optional[str] = None, gridsize: int = 50, save_to: Optional[str] = None,
+                             show: bool = True) -> "Figure":
         """
         Generates a plot of the principal plane using the principal components.
 
         Parameters:
             title (str, optional): Custom title to add above the default title.
+            max_labels (int, optional): Label only the points farthest from the origin, at most this many.
+                Defaults to every point, or to 50 points when there are more than 5,000.
+            label_subset (Sequence, optional): Index labels of the points to annotate; overrides `max_labels`.
+            rasterized (bool, optional): Rasterize the markers so vector output stays small. Defaults to True
+                above 5,000 points.
+            density (str, optional): "hexbin" or "hist2d" to draw the point density instead of the individual
+                points, keeping render time constant as n grows. Default is None.
+            gridsize (int, optional): Number of bins per axis of the density layer. Defaults to 50.
+            save_to (str, optional): Path the figure is saved to; the format (e.g. PNG, SVG, PDF) follows the
+                extension. Default is None.
+            show (bool, optional): Whether to call `plt.show()`. Pass False in scripts and batch jobs, and close
+                the returned figure when done. Defaults to True.
+
+        Returns:
+            matplotlib.figure.Figure: The figure drawn.
+
+        Raises:
+            ValueError: If `density` is not a known kind or `label_subset` contains unknown labels.
         """
+        plt = _pyplot()
         default_title = "Principal Plane"
         if title:
             full_title = f"{title}\n{default_title} (Explained Inertia: {self.explained_inertia:.2f}%)"
@@ -86,27 +143,53 @@ class Visualization:
             full_title = f"{default_title} (Explained Inertia: {self.explained_inertia:.2f}%)"
         # Assumes self.components is a numpy array with at least 2 columns.
         x, y = self.components[:, 0], self.components[:, 1]
-        plt.scatter(x, y, color="gray")
+        fig = plt.figure()
+        if density is None:
+            plt.scatter(x, y, color="gray", rasterized=self._rasterize(rasterized, len(x)))
+        else:
+            self._density_layer(plt, x, y, density, gridsize)
         # Use the data index for labels.
-        for i, label in enumerate(self.data.index):
-            plt.text(x[i], y[i], label, fontsize=9, ha="right")
+        labels = self.data.index
+        for i in self._label_positions(x, y, max_labels, label_subset):
+            plt.text(x[i], y[i], labels[i], fontsize=9, ha="right")
         plt.title(full_title)
         plt.axhline(y=0, color="dimgrey", linestyle="--")
         plt.axvline(x=0, color="dimgrey", linestyle="--")
         plt.xlabel("Component 1")
         plt.ylabel("Component 2")
-        plt.show()
+        return self._finish(plt, fig, save_to, show)
 
-    def plot_principal_plane_with_clusters(self, title: str = "") -> None:
+    def plot_principal_plane_with_clusters(self, title: str = "", max_labels: Optional[int] = None,
+                                           label_subset: Optional[Sequence] = None,
+                                           rasterized: Optional[bool] = None, density: Optional[str] = None,
+                                           gridsize: int = 50, max_legend_clusters: Optional[int] = 20,
+                                           save_to: Optional[str] = None, show: bool = True) -> "Figure":
         """
         Generates a plot of the principal plane with points colored according to clusters.
 
         Parameters:
             title (str, optional): Custom title to add above the default title.
+            max_labels (int, optional): Label only the points farthest from the origin, at most this many.
+                Defaults to every point, or to 50 points when there are more than 5,000.
+            label_subset (Sequence, optional): Index labels of the points to annotate; overrides `max_labels`.
+            rasterized (bool, optional): Rasterize the markers. Defaults to True above 5,000 points.
+            density (str, optional): "hexbin" or "hist2d" to draw a density layer beneath the clusters.
+            gridsize (int, optional): Number of bins per axis of the density layer. Defaults to 50.
+            max_legend_clusters (int, optional): Maximum number of legend entries; the smallest clusters beyond it
+                are drawn in grey under a single "Other" entry. None lists every cluster. Defaults to 20.
+            save_to (str, optional): Path the figure is saved to; the format (e.g. PNG, SVG, PDF) follows the
+                extension. Default is None.
+            show (bool, optional): Whether to call `plt.show()`. Pass False in scripts and batch jobs, and close
+                the returned figure when done. Defaults to True.
+
+        Returns:
+            matplotlib.figure.Figure: The figure drawn.
 
         Raises:
-            ValueError: If cluster information is not provided.
+            ValueError: If cluster information is not provided, `density` is not a known kind or
+                `label_subset` contains unknown labels.
         """
+        plt = _pyplot()
         if self.clusters is None:
             raise ValueError("Cluster information is required for this plot.")
         default_title = "Principal Plane With Clusters"
@@ -115,84 +198,127 @@ class Visualization:
         else:
             full_title = f"{default_title} (Explained Inertia: {self.explained_inertia:.2f}%)"
         x, y = self.components[:, 0], self.components[:, 1]
-        plt.figure(figsize=(10, 8))
-        unique_clusters = np.unique(self.clusters)
-        for cluster in unique_clusters:
-            cluster_points = self.clusters == cluster
-            plt.scatter(x[cluster_points], y[cluster_points], label=f"Cluster {cluster}", alpha=0.7)
-        for i, label in enumerate(self.data.index):
-            plt.text(x[i], y[i], label, fontsize=8, ha="right")
+        fig = plt.figure(figsize=(10, 8))
+        if density is not None:
+            self._density_layer(plt, x, y, density, gridsize, cmap="Greys")
+        point_colors, handles = self._cluster_colors(plt, self.clusters, max_legend_clusters)
+        plt.scatter(x, y, c=point_colors, alpha=0.7, rasterized=self._rasterize(rasterized, len(x)))
+        labels = self.data.index
+        for i in self._label_positions(x, y, max_labels, label_subset):
+            plt.text(x[i], y[i], labels[i], fontsize=8, ha="right")
         plt.title(full_title)
         plt.axhline(y=0, color="dimgrey", linestyle="--")
         plt.axvline(x=0, color="dimgrey", linestyle="--")
         plt.xlabel("Component 1")
         plt.ylabel("Component 2")
-        plt.legend()
-        plt.show()
+        plt.legend(handles=handles)
+        return self._finish(plt, fig, save_to, show)
 
     def plot_correlation_circle(self, correlations: pd.DataFrame, title: str = "", scale: float = 1,
-                                draw_circle: bool = True) -> None:
+                                draw_circle: bool = True, top_k: Optional[int] = None, min_norm: float = 0.0,
+                                label_grid: Optional[int] = None, save_to: Optional[str] = None,
+                                show: bool = True) -> "Figure":
         """
         Generates a correlation circle for the principal components.
 
+        All arrows are drawn by a single `quiver` call. Labels are thinned on a grid: each grid cell keeps only
+        the label of its longest arrow, so overlapping labels are removed without any text layout pass.
+
         Parameters:
             correlations (pandas.DataFrame): DataFrame containing the correlations for each variable.
             title (str, optional): Custom title to add above the default title.
             scale (float, optional): Scaling factor for the arrows. Defaults to 1.
             draw_circle (bool, optional): Whether to draw the unit circle. Defaults to True.
+            top_k (int, optional): Draw only the `top_k` variables with the largest loading norm. Default is None.
+            min_norm (float, optional): Draw only variables whose loading norm is at least this value. Default is 0.
+            label_grid (int, optional): Number of grid cells per axis used to thin the labels. Defaults to
+                labelling every variable up to 50 drawn variables, and to a 16 x 16 grid beyond.
+            save_to (str, optional): Path the figure is saved to; the format (e.g. PNG, SVG, PDF) follows the
+                extension. Default is None.
+            show (bool, optional): Whether to call `plt.show()`. Pass False in scripts and batch jobs, and close
+                the returned figure when done. Defaults to True.
+
+        Returns:
+            matplotlib.figure.Figure: The figure drawn.
         """
+        plt = _pyplot()
         default_title = "Correlation Circle"
         if title:
             full_title = f"{title}\n{default_title} (Explained Inertia: {self.explained_inertia:.2f}%)"
         else:
             full_title = f"{default_title} (Explained Inertia: {self.explained_inertia:.2f}%)"
+        loadings = np.real(correlations.iloc[:, :2].to_numpy()).astype(float) * scale
+        norms = np.hypot(loadings[:, 0], loadings[:, 1])
+        selected = np.flatnonzero(norms >= min_norm)
+        if top_k is not None and top_k < len(selected):
+            selected = selected[np.argsort(-norms[selected], kind="stable")[:max(top_k, 0)]]
+        fig = plt.figure()
         if draw_circle:
             circle = plt.Circle((0, 0), radius=1.05, color="steelblue", fill=False)
             plt.gca().add_patch(circle)
         plt.axis("scaled")
         plt.axhline(y=0, color="dimgrey", linestyle="--")
         plt.axvline(x=0, color="dimgrey", linestyle="--")
-        for i in range(correlations.shape[0]):
-            plt.arrow(0, 0, correlations.iloc[i, 0] * scale, correlations.iloc[i, 1] * scale,
-                      color="steelblue", alpha=0.5, head_width=0.05, head_length=0.05)
-            plt.text(correlations.iloc[i, 0] * scale, correlations.iloc[i, 1] * scale,
-                     self.data.columns[i], fontsize=9, ha="right")
+        if len(selected):
+            u, v = loadings[selected, 0], loadings[selected, 1]
+            plt.quiver(np.zeros_like(u), np.zeros_like(v), u, v, angles="xy", scale_units="xy", scale=1,
+                       color="steelblue", alpha=0.5, width=0.004)
+        limit = max(1.1 if draw_circle else 0.0, 1.1 * float(norms[selected].max()) if len(selected) else 1.0)
+        plt.xlim(-limit, limit)
+        plt.ylim(-limit, limit)
+        names = self.data.columns
+        for i in self._circle_label_positions(loadings, norms, selected, label_grid, limit):
+            plt.text(loadings[i, 0], loadings[i, 1], names[i], fontsize=9, ha="right")
         plt.title(full_title)
-        plt.show()
+        return self._finish(plt, fig, save_to, show)
 
     def plot_2d_scatter_with_clusters(self, x_col: str, y_col: str, cluster_col: str,
-                                      title: str = "", figsize: Tuple[int, int] = (10, 8)) -> None:
+                                      title: str = "", figsize: Tuple[int, int] = (10, 8),
+                                      max_legend_clusters: Optional[int] = 20, save_to: Optional[str] = None,
+                                      show: bool = True) -> "Figure":
         """
         Generates a 2D scatter plot colored by cluster.
 
+        All points are drawn as a single scatter collection; the legend uses proxy entries.
+
         Parameters:
             x_col (str): Name of the column for the x-axis.
             y_col (str): Name of the column for the y-axis.
             cluster_col (str): Name of the column containing cluster labels.
             title (str, optional): Custom title to add above the default title.
             figsize (tuple, optional): Figure size. Defaults to (10, 8).
+            max_legend_clusters (int, optional): Maximum number of legend entries; the smallest clusters beyond it
+                are drawn in grey under a single "Other" entry. None lists every cluster. Defaults to 20.
+            save_to (str, optional): Path the figure is saved to; the format (e.g. PNG, SVG, PDF) follows the
+                extension. Default is None.
+            show (bool, optional): Whether to call `plt.show()`. Pass False in scripts and batch jobs, and close
+                the returned figure when done. Defaults to True.
+
+        Returns:
+            matplotlib.figure.Figure: The figure drawn.
         """
+        plt = _pyplot()
         default_title = "2D Cluster Projection – Visualization of Groupings"
         if title:
             full_title = f"{title}\n{default_title} (Explained Inertia: {self.explained_inertia:.2f}%)"
         else:
             full_title = f"{default_title} (Explained Inertia: {self.explained_inertia:.2f}%)"
-        plt.figure(figsize=figsize)
-        unique_clusters = np.unique(self.data[cluster_col])
-        for cluster in unique_clusters:
-            subset = self.data[self.data[cluster_col] == cluster]
-            plt.scatter(subset[x_col], subset[y_col], label=f"Cluster {cluster}", s=20, edgecolor="k")
+        fig = plt.figure(figsize=figsize)
+        point_colors, handles = self._cluster_colors(plt, self.data[cluster_col], max_legend_clusters)
+        plt.scatter(self.data[x_col], self.data[y_col], c=point_colors, s=20, edgecolor="k")
         plt.title(full_title)
         plt.xlabel(x_col)
         plt.ylabel(y_col)
         plt.axis("equal")
-        plt.legend(title="Clusters", loc="best", bbox_to_anchor=(1.05, 1))
+        plt.legend(handles=handles, title="Clusters", loc="best", bbox_to_anchor=(1.05, 1))
         plt.tight_layout()
-        plt.show()
+        return self._finish(plt, fig, save_to, show)
 
     def plot_3d_scatter_with_clusters(self, x_col: str, y_col: str, z_col: str, cluster_col: str,
                                       title: str = "", figsize: Tuple[int, int] = (12, 8),
-                                      cmap: str = "viridis", s: int = 50, alpha: float = 0.7) -> None:
+                                      cmap: str = "viridis", s: int = 50, alpha: float = 0.7,
+                                      max_legend_clusters: Optional[int] = 20, save_to: Optional[str] = None,
+                                      show: bool = True) -> "Figure":
         """
         Creates a 3D scatter plot colored by cluster.
 
@@ -206,27 +332,133 @@ class Visualization:
             cmap (str, optional): Colormap to use. Defaults to "viridis".
             s (int, optional): Size of the points. Defaults to 50.
             alpha (float, optional): Transparency of the points. Defaults to 0.7.
+            max_legend_clusters (int, optional): Maximum number of legend entries; the smallest clusters beyond it
+                are drawn in grey under a single "Other" entry. None lists every cluster. Defaults to 20.
+            save_to (str, optional): Path the figure is saved to; the format (e.g. PNG, SVG, PDF) follows the
+                extension. Default is None.
+            show (bool, optional): Whether to call `plt.show()`. Pass False in scripts and batch jobs, and close
+                the returned figure when done. Defaults to True.
+
+        Returns:
+            matplotlib.figure.Figure: The figure drawn.
         """
+        plt = _pyplot()
         default_title = "3D Scatter Plot – Cluster Distribution"
         if title:
             full_title = f"{title}\n{default_title} (Explained Inertia: {self.explained_inertia:.2f}%)"
         else:
             full_title = f"{default_title} (Explained Inertia: {self.explained_inertia:.2f}%)"
 
-        cluster_codes, unique_clusters = pd.factorize(self.data[cluster_col])
+        point_colors, handles = self._cluster_colors(plt, self.data[cluster_col], max_legend_clusters,
+                                                     cmap=cmap, sort=False)
 
         fig = plt.figure(figsize=figsize)
         ax = fig.add_subplot(111, projection="3d")
-        scatter = ax.scatter(self.data[x_col], self.data[y_col], self.data[z_col],
-                             c=cluster_codes, cmap=cmap, s=s, alpha=alpha)
-
-        for i, cluster_name in enumerate(unique_clusters):
-            color = plt.cm.get_cmap(cmap)(scatter.norm(i))
-            ax.scatter([], [], [], color=color, label=f"Cluster {cluster_name}")
+        ax.scatter(self.data[x_col], self.data[y_col], self.data[z_col], c=point_colors, s=s, alpha=alpha)
         ax.set_title(full_title)
         ax.set_xlabel(x_col)
         ax.set_ylabel(y_col)
         ax.set_zlabel(z_col)
-        ax.legend(title="Clusters", loc="upper left", bbox_to_anchor=(1, 0.8))
+        ax.legend(handles=handles, title="Clusters", loc="upper left", bbox_to_anchor=(1, 0.8))
         plt.tight_layout()
-        plt.show()
+        return self._finish(plt, fig, save_to, show)
+
+    @staticmethod
+    def _finish(plt, fig: "Figure", save_to: Optional[str], show: bool) -> "Figure":
+        """Saves the figure when a path is given, shows it when requested and returns it."""
+        if save_to is not None:
+            fig.savefig(save_to, bbox_inches="tight")
+        if show:
+            plt.show()
+        return fig
+
+    def _label_positions(self, x: np.ndarray, y: np.ndarray, max_labels: Optional[int],
+                         label_subset: Optional[Sequence]) -> np.ndarray:
+        """
+        Returns the positions of the points to annotate: `label_subset`, else the `max_labels` points farthest
+        from the origin (all points up to _LARGE_N, _DEFAULT_MAX_LABELS beyond).
+        """
+        n_points = len(x)
+        if label_subset is not None:
+            positions = self.data.index.get_indexer(pd.Index(label_subset))
+            if np.any(positions < 0):
+                raise ValueError("label_subset contains labels that are not in the data index.")
+            return positions
+        if max_labels is None:
+            max_labels = n_points if n_points <= _LARGE_N else _DEFAULT_MAX_LABELS
+        if max_labels >= n_points:
+            return np.arange(n_points)
+        if max_labels <= 0:
+            return np.empty(0, dtype=np.intp)
+        distances = np.hypot(np.real(x), np.real(y))
+        return np.argpartition(distances, n_points - max_labels)[n_points - max_labels:]
+
+    @staticmethod
+    def _rasterize(rasterized: Optional[bool], n_points: int) -> bool:
+        """Rasterizes markers when requested, or by default for more than _LARGE_N points."""
+        return n_points > _LARGE_N if rasterized is None else rasterized
+
+    @staticmethod
+    def _density_layer(plt, x: np.ndarray, y: np.ndarray, density: str, gridsize: int,
+                       cmap: str = "viridis") -> None:
+        """Draws a hexbin or 2D-histogram layer whose cost depends on the grid, not on the number of points."""
+        if density not in _DENSITY_KINDS:
+            raise ValueError(f"Unknown density {density!r}; expected one of {', '.join(_DENSITY_KINDS)}.")
+        x, y = np.real(x), np.real(y)
+        if density == "hexbin":
+            plt.hexbin(x, y, gridsize=gridsize, cmap=cmap, mincnt=1)
+        else:
+            plt.hist2d(x, y, bins=gridsize, cmap=cmap, cmin=1)
+        plt.colorbar(label="Points")
+
+    @staticmethod
+    def _cluster_colors(plt, clusters, max_legend: Optional[int], cmap: Optional[str] = None,
+                        sort: bool = True) -> Tuple[np.ndarray, list]:
+        """
+        Factorizes the cluster labels once and returns one RGBA color per point plus proxy legend handles.
+
+        Clusters get the colors of the property cycle (or `tab20`, or samples of `cmap`). When there are more
+        than `max_legend` clusters, the largest `max_legend - 1` keep their colors. The rest are drawn in grey
+        and share one "Other" legend entry.
+        """
+        codes, uniques = pd.factorize(np.asarray(clusters), sort=sort)
+        n_groups = len(uniques)
+        shown = np.arange(n_groups)
+        if max_legend is not None and n_groups > max_legend:
+            sizes = np.bincount(codes, minlength=n_groups)
+            shown = np.sort(np.argsort(-sizes, kind="stable")[:max(max_legend - 1, 0)])
+        palette = np.tile(_to_rgba("lightgray"), (n_groups, 1))
+        if cmap is not None:
+            palette[shown] = plt.get_cmap(cmap)(np.linspace(0, 1, len(shown)))
+        else:
+            cycle = plt.rcParams["axes.prop_cycle"].by_key().get("color", [])
+            if len(shown) <= len(cycle):
+                palette[shown] = [_to_rgba(color) for color in cycle[:len(shown)]]
+            elif len(shown) <= 20:
+                palette[shown] = plt.get_cmap("tab20")(np.arange(len(shown)))
+            else:
+                palette[shown] = plt.get_cmap("turbo")(np.linspace(0, 1, len(shown)))
+        handles = [plt.Line2D([], [], marker="o", linestyle="", color=palette[i], label=f"Cluster {uniques[i]}")
+                   for i in shown]
+        n_other = n_groups - len(shown)
+        if n_other:
+            handles.append(plt.Line2D([], [], marker="o", linestyle="", color=_to_rgba("lightgray"),
+                                      label=f"Other ({n_other} clusters)"))
+        return palette[codes], handles
+
+    @staticmethod
+    def _circle_label_positions(loadings: np.ndarray, norms: np.ndarray, selected: np.ndarray,
+                                label_grid: Optional[int], limit: float) -> np.ndarray:
+        """
+        Returns the variables to label: all of `selected` without a grid, otherwise the longest arrow per grid cell.
+        """
+        if label_grid is None:
+            if len(selected) <= _MAX_CIRCLE_LABELS:
+                return selected
+            label_grid = _CIRCLE_LABEL_GRID
+        cells = np.floor((loadings[selected] + limit) / (2 * limit) * label_grid).astype(np.intp)
+        cell_ids = np.clip(cells[:, 0], 0, label_grid - 1) * label_grid + np.clip(cells[:, 1], 0, label_grid - 1)
+        order = np.lexsort((-norms[selected], cell_ids))
+        first_in_cell = np.ones(len(order), dtype=bool)
+        first_in_cell[1:] = cell_ids[order][1:] != cell_ids[order][:-1]
+        return selected[order[first_in_cell]]
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from riemannian_stats import riemannian_analysis, RiemannianAnalysis
+from riemannian_stats import aio
+
+
+class CountingCallback:
+    """Counts stage starts and blocks until released at the first progress report of a stage."""
+
+    def __init__(self, block_on=None):
+        self.started = []
+        self.progress = 0
+        self.block_on = block_on
+        self.reached = threading.Event()
+        self.release = threading.Event()
+
+    def on_stage_start(self, name):
+        self.started.append(name)
+
+    def on_progress(self, name, done, total):
+        if name == self.block_on:
+            self.progress += 1
+            self.reached.set()
+            self.release.wait(10)
+
+
+class TestAsyncAnalysis(unittest.TestCase):
+    """
+    Unit tests for RiemannianAnalysis.afit and atransform, run with asyncio alone.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = np.random.default_rng(4).normal(size=(40, 3))
+        cls.reference = riemannian_analysis(cls.data, n_neighbors=5)
+
+    def test_afit_and_atransform_match_sync(self):
+        """
+        Verifies that the coroutines produce the same distances and components as the blocking API.
+        """
+        async def run():
+            analysis = await RiemannianAnalysis.afit(self.data, n_neighbors=5)
+            return analysis, await analysis.atransform()
+
+        analysis, components = asyncio.run(run())
+        np.testing.assert_allclose(analysis.umap_distance_matrix, self.reference.umap_distance_matrix)
+        expected = self.reference.riemannian_components(self.reference.riemannian_correlation_matrix())
+        np.testing.assert_allclose(np.abs(components), np.abs(expected))
+        self.assertIsNone(analysis.cancel_token)
+
+    def test_identical_requests_share_one_fit(self):
+        """
+        Verifies that concurrent identical afit calls run a single fit and return the same object.
+        """
+        callback = CountingCallback()
+
+        async def run():
+            return await asyncio.gather(*(RiemannianAnalysis.afit(self.data, n_neighbors=5, callbacks=[callback])
+                                          for _ in range(3)))
+
+        results = asyncio.run(run())
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(callback.started.count("graph"), 1)
+        self.assertEqual(aio._IN_FLIGHT, {})
+
+    def test_cancelling_every_waiter_cancels_the_fit(self):
+        """
+        Verifies that cancelling the only waiter stops the fit at its next block and unregisters it.
+        """
+        callback = CountingCallback(block_on="distance")
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            task = asyncio.ensure_future(RiemannianAnalysis.afit(
+                self.data, n_neighbors=5, strategy="tiled", block_size=2, callbacks=[callback], executor=executor))
+            await loop.run_in_executor(None, callback.reached.wait, 10)
+            task.cancel()
+            # Release the worker only once the cancelled waiter has cancelled the token.
+            while aio._IN_FLIGHT:
+                await asyncio.sleep(0)
+            callback.release.set()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertEqual(aio._IN_FLIGHT, {})
+            # The single worker picks this up only after the cancelled fit has stopped.
+            await loop.run_in_executor(executor, lambda: None)
+
+        asyncio.run(run())
+        executor.shutdown()
+        self.assertEqual(callback.progress, 1)
+        with self.assertRaises(TypeError):
+            asyncio.run(RiemannianAnalysis.afit(self.data, cancel_token=None))
+
+    def test_cancelled_atransform_keeps_the_instance_token(self):
+        """
+        Verifies that atransform cancels through its own token, leaving the shared analysis' token untouched.
+        """
+        analysis = riemannian_analysis(self.data, n_neighbors=5, strategy="tiled", block_size=2)
+        callback = CountingCallback(block_on="covariance")
+        tokens = []
+        callback.on_stage_start = lambda name: tokens.append(analysis.cancel_token)
+        analysis.add_callback(callback)
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            task = asyncio.ensure_future(analysis.atransform(executor))
+            await loop.run_in_executor(None, callback.reached.wait, 10)
+            task.cancel()
+            # Release the worker only once the cancelled waiter has cancelled the token.
+            while aio._IN_FLIGHT:
+                await asyncio.sleep(0)
+            callback.release.set()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await loop.run_in_executor(executor, lambda: None)
+
+        asyncio.run(run())
+        executor.shutdown()
+        self.assertEqual(callback.progress, 1)
+        self.assertTrue(tokens and all(token is None for token in tokens))
+        self.assertIsNone(analysis.cancel_token)
+        self.assertEqual(aio._IN_FLIGHT, {})
+
+    def test_request_key_hashes_dataframe_columns(self):
+        """
+        Verifies that DataFrame keys follow the values, labels and dtypes without converting the frame.
+        """
+        frame = pd.DataFrame({"x": [1.0, 2.0, 3.0], "y": [4, 5, 6], "label": ["a", "b", "c"]})
+        with mock.patch.object(aio.DataProcessing, "to_float_array", side_effect=AssertionError):
+            key = aio.request_key(frame, {"n_neighbors": 2})
+            self.assertEqual(aio.request_key(frame.copy(), {"n_neighbors": 2}), key)
+            self.assertNotEqual(aio.request_key(frame, {"n_neighbors": 3}), key)
+            self.assertNotEqual(aio.request_key(frame.assign(label=["a", "b", "d"]), {"n_neighbors": 2}), key)
+            self.assertNotEqual(aio.request_key(frame.astype({"y": float}), {"n_neighbors": 2}), key)
+            self.assertNotEqual(aio.request_key(frame.set_axis([1, 2, 3]), {"n_neighbors": 2}), key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from riemannian_stats import riemannian_analysis
+from riemannian_stats.cli import main, parse_bytes
+
+
+class TestCommandLine(unittest.TestCase):
+    """
+    Unit tests for the `riemannian-stats` command-line pipeline.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(6)
+        self.features = pd.DataFrame(rng.normal(size=(30, 3)), columns=["x", "y", "z"])
+        self.path = os.path.join(self.tmpdir.name, "points.csv")
+        self.features.assign(cluster=rng.integers(2, size=30)).to_csv(self.path, index=False)
+        self.output = os.path.join(self.tmpdir.name, "out")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _run(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            status = main([self.path, "--separator", ",", "-o", self.output, *args])
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_pipeline_writes_tables_plots_and_profile(self):
+        """
+        Verifies the written tables against the library results, the headless plots and the profile table.
+        """
+        status, stdout, stderr = self._run("--label-column", "cluster", "--n-neighbors", "5", "--plots", "png",
+                                           "--profile")
+        self.assertEqual(status, 0)
+        written = stdout.split()
+        self.assertIn(os.path.join(self.output, "points_principal_plane_with_clusters.png"), written)
+        self.assertTrue(all(os.path.exists(path) for path in written))
+        self.assertIn("distance", stderr)
+
+        analysis = riemannian_analysis(self.features, n_neighbors=5)
+        corr_matrix = analysis.riemannian_correlation_matrix()
+        inertia = pd.read_csv(os.path.join(self.output, "points_inertia.csv"), index_col=0)
+        np.testing.assert_allclose(inertia["eigenvalue"], np.sort(np.linalg.eigvalsh(corr_matrix))[::-1])
+        np.testing.assert_allclose(inertia["cumulative_inertia"].iloc[-1], 1.0)
+        components = pd.read_csv(os.path.join(self.output, "points_components.csv"), index_col=0)
+        self.assertEqual(components.shape, (30, 3))
+        np.testing.assert_allclose(np.abs(components.to_numpy()),
+                                   np.abs(np.real(analysis.riemannian_components(corr_matrix))))
+
+    def test_errors_exit_with_status_one(self):
+        """
+        Verifies that invalid input data is reported on stderr instead of a traceback.
+        """
+        status, _, stderr = self._run("--label-column", "missing")
+        self.assertEqual(status, 1)
+        self.assertIn("error", stderr)
+
+    def test_parse_bytes(self):
+        """
+        Verifies decimal and binary size suffixes.
+        """
+        self.assertEqual(parse_bytes("1024"), 1024)
+        self.assertEqual(parse_bytes("500MB"), 500 * 10 ** 6)
+        self.assertEqual(parse_bytes("1.5GiB"), 3 * 2 ** 29)
+        with self.assertRaises(Exception):
+            parse_bytes("lots")
+
+
+if __name__ == '__main__':
+    unittest.main()
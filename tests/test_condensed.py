@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+from scipy import sparse
+
+from riemannian_stats import CondensedMatrix
+
+
+class TestCondensedMatrix(unittest.TestCase):
+    """
+    Unit tests for CondensedMatrix, the upper-triangle storage of symmetric matrices.
+    """
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        upper = np.triu(rng.random((7, 7)), k=1)
+        self.dense = upper + upper.T
+        self.condensed = CondensedMatrix.from_dense(self.dense)
+
+    def test_layout_matches_pdist(self):
+        """
+        Verifies the pdist layout, O(1) index mapping in both orders and rejection of diagonal positions.
+        """
+        np.testing.assert_array_equal(self.condensed.data, self.dense[np.triu_indices(7, k=1)])
+        self.assertEqual(self.condensed.index(0, 1), 0)
+        self.assertEqual(self.condensed.index(6, 5), 20)
+        np.testing.assert_array_equal(self.condensed.index([2, 4], [4, 2]), [12, 12])
+        with self.assertRaises(ValueError):
+            self.condensed.index(3, 3)
+
+    def test_rows_and_sums(self):
+        """
+        Verifies row views, dense rows, row blocks, element access, row sums and expansion.
+        """
+        self.assertTrue(np.shares_memory(self.condensed.upper_row(2), self.condensed.data))
+        np.testing.assert_array_equal(self.condensed.row(3), self.dense[3])
+        np.testing.assert_array_equal(self.condensed.rows(2, 5), self.dense[2:5])
+        np.testing.assert_array_equal(self.condensed[[0, 3, 5], [5, 3, 0]], self.dense[[0, 3, 5], [5, 3, 0]])
+        np.testing.assert_allclose(self.condensed.row_sums(), self.dense.sum(axis=1))
+        np.testing.assert_array_equal(self.condensed.to_dense(), self.dense)
+        np.testing.assert_array_equal(np.asarray(self.condensed), self.dense)
+
+    def test_graph_complement(self):
+        """
+        Verifies that 1 - graph is condensed with ones off the graph and on the diagonal.
+        """
+        graph = sparse.csr_matrix(np.where(self.dense > 0.7, self.dense, 0))
+        rho = CondensedMatrix.from_graph_complement(graph)
+        expected = 1 - graph.toarray()
+        np.fill_diagonal(expected, 1)
+        np.testing.assert_allclose(rho.to_dense(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from riemannian_stats import data_processing
+
+
+class TestDataProcessingLoaders(unittest.TestCase):
+    """
+    Unit tests for DataProcessing.load_data and DataProcessing.load_features.
+
+    A small labelled dataset is written as CSV, Parquet, Feather and .npy, and every reader is checked
+    for column selection, float32 downcasting and label splitting.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame(rng.normal(size=(20, 3)), columns=["a", "b", "c"])
+        self.df["cluster"] = rng.integers(3, size=20)
+        self.csv = self._path("data.csv")
+        self.df.to_csv(self.csv, sep=";", decimal=",", index=False)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_load_data_csv_defaults(self):
+        """
+        Verifies that the default CSV reader still returns every column as parsed by pandas.
+        """
+        data = data_processing.load_data(self.csv, separator=";", decimal=",")
+        pd.testing.assert_frame_equal(data, self.df)
+
+    def test_load_data_csv_usecols_and_float32(self):
+        """
+        Verifies that usecols skips columns and dtype downcasts only the numeric columns.
+        """
+        data = data_processing.load_data(self.csv, separator=";", decimal=",", usecols=["a", "c"],
+                                         dtype=np.float32)
+        self.assertEqual(list(data.columns), ["a", "c"])
+        self.assertTrue((data.dtypes == np.float32).all())
+        np.testing.assert_allclose(data.to_numpy(), self.df[["a", "c"]].to_numpy(), rtol=1e-6)
+
+    def test_load_data_pyarrow_engine(self):
+        """
+        Verifies that the pyarrow CSV engine produces the same values as the default engine.
+        """
+        data = data_processing.load_data(self.csv, separator=";", decimal=",", engine="pyarrow")
+        np.testing.assert_allclose(data.to_numpy(dtype=float), self.df.to_numpy(dtype=float))
+
+    def test_load_features_splits_labels(self):
+        """
+        Verifies that label columns are split off with their own type while features are downcast.
+        """
+        iris = pd.DataFrame({"x": [1.0, 2.0], "y": [3.0, 4.0], "tipo": ["setosa", "virginica"]})
+        path = self._path("iris.csv")
+        iris.to_csv(path, sep=";", index=False)
+        features, labels = data_processing.load_features(path, label_columns="tipo", dtype=np.float32)
+        self.assertEqual(list(features.columns), ["x", "y"])
+        self.assertTrue((features.dtypes == np.float32).all())
+        self.assertEqual(labels.tolist(), ["setosa", "virginica"])
+
+    def test_load_features_binary_formats(self):
+        """
+        Verifies that Parquet, Feather and memory-mapped .npy files load the same features and labels.
+        """
+        self.df.to_parquet(self._path("data.parquet"))
+        self.df.to_feather(self._path("data.feather"))
+        np.save(self._path("data.npy"), self.df.to_numpy())
+        expected = self.df[["a", "b", "c"]].to_numpy()
+        for name in ("data.parquet", "data.feather"):
+            features, labels = data_processing.load_features(self._path(name), "cluster", dtype=np.float32)
+            np.testing.assert_allclose(features.to_numpy(), expected, rtol=1e-6)
+            self.assertTrue((features.dtypes == np.float32).all())
+            np.testing.assert_array_equal(labels.to_numpy(), self.df["cluster"].to_numpy())
+        features, labels = data_processing.load_features(self._path("data.npy"), label_columns=3)
+        np.testing.assert_allclose(features.to_numpy(), expected)
+        np.testing.assert_array_equal(labels.to_numpy(), self.df["cluster"].to_numpy())
+
+    def test_load_features_errors(self):
+        """
+        Verifies that missing label columns and non-numeric features raise ValueError.
+        """
+        with self.assertRaises(ValueError):
+            data_processing.load_features(self.csv, label_columns="missing", separator=";", decimal=",")
+        path = self._path("text.csv")
+        pd.DataFrame({"x": [1.0, 2.0], "name": ["p", "q"]}).to_csv(path, sep=";", index=False)
+        with self.assertRaises(ValueError):
+            data_processing.load_features(path)
+
+    def test_iter_chunks_formats(self):
+        """
+        Verifies that every format is streamed in chunks of at most chunksize rows that reassemble the file.
+        """
+        self.df.to_parquet(self._path("data.parquet"), row_group_size=8)
+        self.df.to_feather(self._path("data.feather"))
+        np.save(self._path("data.npy"), self.df[["a", "b"]].to_numpy())
+        cases = [(self.csv, ["a", "b"]), (self._path("data.parquet"), ["a", "b"]),
+                 (self._path("data.feather"), ["a", "b"]), (self._path("data.npy"), None)]
+        for path, usecols in cases:
+            chunks = list(data_processing.iter_chunks(path, chunksize=6, separator=";", decimal=",",
+                                                      usecols=usecols, dtype=np.float32))
+            self.assertTrue(all(len(chunk) <= 6 for chunk in chunks))
+            data = pd.concat(chunks)
+            self.assertEqual(list(data.index), list(range(20)))
+            self.assertTrue((data.dtypes == np.float32).all())
+            np.testing.assert_allclose(data.to_numpy(), self.df[["a", "b"]].to_numpy(), rtol=1e-6)
+
+        with self.assertRaises(ValueError):
+            next(data_processing.iter_chunks(self.csv, chunksize=0))
+
+    def test_late_text_in_a_sniffed_column(self):
+        """
+        Verifies that text after the sniffed rows falls back to an untyped read, or names the column when streaming.
+        """
+        path = self._path("late.csv")
+        frame = pd.DataFrame({"x": np.arange(1500, dtype=float), "y": np.arange(1500, dtype=float)})
+        frame["y"] = frame["y"].astype(object)
+        frame.loc[1400, "y"] = "missing"
+        frame.to_csv(path, sep=";", index=False)
+
+        data = data_processing.load_data(path, dtype=np.float32)
+        self.assertEqual(data["x"].dtype, np.float32)
+        self.assertEqual(data["y"].dtype, object)
+        self.assertEqual(data.loc[1400, "y"], "missing")
+
+        with self.assertRaisesRegex(ValueError, "Column\\(s\\) y "):
+            list(data_processing.iter_chunks(path, chunksize=500, dtype=np.float32))
+
+    def test_csv_cache_reuses_and_rebuilds(self):
+        """
+        Verifies that the sidecar cache returns the parsed data memory-mapped and is rebuilt when the CSV changes.
+        """
+        cache_dir = self._path("cache")
+        parsed = data_processing.load_data(self.csv, separator=";", decimal=",", cache=cache_dir)
+        self.assertEqual(len([name for name in os.listdir(cache_dir) if name.endswith(".npy")]), 1)
+        cached = data_processing.load_data(self.csv, separator=";", decimal=",", cache=cache_dir)
+        pd.testing.assert_frame_equal(cached, parsed)
+        self.assertFalse(cached._mgr.blocks[0].values.flags.owndata)
+
+        features, labels = data_processing.load_features(self.csv, "cluster", separator=";", decimal=",",
+                                                         dtype=np.float32, cache=cache_dir)
+        cached_features, cached_labels = data_processing.load_features(self.csv, "cluster", separator=";",
+                                                                       decimal=",", dtype=np.float32,
+                                                                       cache=cache_dir)
+        pd.testing.assert_frame_equal(cached_features, features)
+        pd.testing.assert_series_equal(cached_labels, labels)
+
+        cached.iloc[0, 0] = 100.0
+        self.assertNotEqual(data_processing.load_data(self.csv, separator=";", decimal=",",
+                                                      cache=cache_dir).iloc[0, 0], 100.0)
+
+        self.df.iloc[:5].to_csv(self.csv, sep=";", decimal=",", index=False)
+        os.utime(self.csv, ns=(0, 0))
+        self.assertEqual(len(data_processing.load_data(self.csv, separator=";", decimal=",", cache=cache_dir)), 5)
+
+    def test_csv_cache_layout(self):
+        """
+        Verifies that the sidecar holds no pickle, that its JSON names the data files and is the commit marker.
+        """
+        cache_dir = self._path("cache")
+        parsed = data_processing.load_data(self.csv, separator=";", decimal=",", cache=cache_dir)
+        extensions = sorted(os.path.splitext(name)[1] for name in os.listdir(cache_dir))
+        self.assertListEqual(extensions, [".json", ".npy", ".parquet"])
+
+        json_path = next(os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith(".json"))
+        with open(json_path) as handle:
+            meta = json.load(handle)
+        self.assertListEqual(meta["columns"], list(parsed.columns))
+        self.assertIn("cluster", meta["other_columns"])
+
+        # A marker naming files that are gone falls back to parsing, and the rebuilt sidecar replaces it.
+        meta["token"] = "0" * 16
+        with open(json_path, "w") as handle:
+            json.dump(meta, handle)
+        pd.testing.assert_frame_equal(data_processing.load_data(self.csv, separator=";", decimal=",",
+                                                                cache=cache_dir), parsed)
+        with open(json_path) as handle:
+            token = json.load(handle)["token"]
+        self.assertNotEqual(token, "0" * 16)
+        self.assertTrue(any(name.endswith(f".{token}.npy") for name in os.listdir(cache_dir)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from riemannian_stats import riemannian_analysis
+
+
+class TestRiemannianComponentsByGroup(unittest.TestCase):
+    """
+    Unit tests for RiemannianAnalysis.riemannian_components_by_group.
+
+    The batched per-group results are compared with a direct computation on each group's rows, using the
+    distance and Rho matrices of the analysis fitted on all the data.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(3)
+        cls.clusters = rng.integers(3, size=45)
+        cls.data = pd.DataFrame(rng.normal(size=(45, 3)) + cls.clusters[:, np.newaxis] * 5.0,
+                                columns=["a", "b", "c"])
+        cls.analysis = riemannian_analysis(cls.data, n_neighbors=8)
+
+    def test_matches_per_group_computation(self):
+        """
+        Verifies medoid, covariance, correlation, eigenvalues, components and inertia of every group.
+        """
+        result = self.analysis.riemannian_components_by_group(self.clusters)
+        self.assertEqual(list(result), [0, 1, 2])
+        values = self.data.to_numpy()
+        distances, rho = self.analysis.umap_distance_matrix, self.analysis.rho
+        for label, group in result.items():
+            members = np.flatnonzero(self.clusters == label)
+            np.testing.assert_array_equal(group.indices, members)
+            medoid = members[np.argmin(distances[np.ix_(members, members)].sum(axis=1))]
+            self.assertEqual(group.mean_index, medoid)
+
+            centered = (values[members] - values[medoid]) * rho[members, medoid][:, np.newaxis]
+            covariance = centered.T @ centered / len(members)
+            std = np.sqrt(np.diag(covariance))
+            np.testing.assert_allclose(group.covariance, covariance)
+            np.testing.assert_allclose(group.correlation, covariance / np.outer(std, std))
+            eigenvalues, eigenvectors = np.linalg.eigh(group.correlation)
+            np.testing.assert_allclose(group.eigenvalues, eigenvalues[::-1])
+            np.testing.assert_allclose(group.inertia, eigenvalues[::-1] / 3)
+            expected = centered / std @ eigenvectors[:, ::-1]
+            np.testing.assert_allclose(np.abs(group.components), np.abs(expected), atol=1e-10)
+
+    def test_single_group_matches_analysis(self):
+        """
+        Verifies that one group spanning all rows reproduces the covariance and correlation of the analysis.
+        """
+        group = self.analysis.riemannian_components_by_group(["all"] * len(self.data))["all"]
+        self.assertEqual(group.mean_index, self.analysis.riemannian_mean_index)
+        np.testing.assert_allclose(group.covariance, self.analysis._riemannian_covariance_matrix())
+        np.testing.assert_allclose(group.correlation, self.analysis.riemannian_correlation_matrix())
+
+    def test_invalid_groups(self):
+        """
+        Verifies that wrong lengths, missing labels and single-row groups raise ValueError.
+        """
+        labels = np.zeros(len(self.data))
+        for groups in (labels[:-1], np.where(np.arange(45) == 0, np.nan, labels),
+                       np.where(np.arange(45) == 0, 1.0, labels)):
+            with self.assertRaises(ValueError):
+                self.analysis.riemannian_components_by_group(groups)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["matplotlib", "umap", "numba", "pynndescent", "sklearn", "tkinter"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import riemannian_stats
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+class TestPackageImport(unittest.TestCase):
+    """
+    Regression tests for the cost of `import riemannian_stats`.
+
+    The import runs in a fresh interpreter so that modules loaded by other tests do not interfere.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Imports the package once in a clean subprocess without a display or a preselected backend.
+        """
+        env = {key: value for key, value in os.environ.items() if key not in ("DISPLAY", "MPLBACKEND")}
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+        output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], check=True, capture_output=True,
+                                text=True, env=env, cwd=PROJECT_ROOT).stdout
+        cls.result = json.loads(output.strip().splitlines()[-1])
+
+    def test_heavy_dependencies_are_deferred(self):
+        """
+        Verifies that matplotlib, Tk, UMAP, numba, pynndescent and scikit-learn are not imported eagerly.
+        """
+        self.assertListEqual(self.result["loaded"], [],
+                             "Importing riemannian_stats must not load plotting or UMAP dependencies.")
+
+    def test_import_time(self):
+        """
+        Verifies that the package imports well below the multi-second cost of UMAP and numba.
+        """
+        self.assertLess(self.result["elapsed"], 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from riemannian_stats import StageProfiler
+
+
+class TestStageProfiler(unittest.TestCase):
+    """
+    Unit tests for the StageProfiler used to instrument the analysis pipeline.
+    """
+
+    def test_records_and_nested_peaks(self):
+        """
+        Verifies that nested stages are recorded and that the outer peak includes the inner allocation.
+        """
+        profiler = StageProfiler(track_memory=True)
+        with profiler.stage("outer"):
+            with profiler.stage("inner"):
+                block = np.ones(1_000_000)
+                del block
+        self.assertListEqual(list(profiler.records), ["inner", "outer"])
+        self.assertGreaterEqual(profiler.records["inner"].peak_memory, 8_000_000)
+        self.assertGreaterEqual(profiler.records["outer"].peak_memory, profiler.records["inner"].peak_memory)
+
+    def test_memory_tracking_disabled(self):
+        """
+        Verifies that peak memory is None when tracking is off.
+        """
+        profiler = StageProfiler()
+        with profiler.stage("stage"):
+            pass
+        self.assertIsNone(profiler.records["stage"].peak_memory)
+
+    def test_failed_stage_not_recorded(self):
+        """
+        Verifies that a stage raising an exception is neither recorded nor reported to callbacks.
+        """
+        seen = []
+        profiler = StageProfiler(callbacks=[lambda name, stats: seen.append(name)])
+        with self.assertRaises(RuntimeError):
+            with profiler.stage("broken"):
+                raise RuntimeError("boom")
+        self.assertNotIn("broken", profiler.records)
+        self.assertListEqual(seen, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
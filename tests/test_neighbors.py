@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+
+from riemannian_stats import riemannian_analysis
+
+
+class TestRiemannianNeighbors(unittest.TestCase):
+    """
+    Unit tests for the Riemannian nearest-neighbour index.
+
+    Every query is compared with a brute-force lookup in the dense UMAP distance matrix.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(5)
+        cls.values = rng.normal(size=(80, 3))
+        cls.analysis = riemannian_analysis(cls.values, n_neighbors=6)
+        cls.distances = cls.analysis.umap_distance_matrix.copy()
+        np.fill_diagonal(cls.distances, np.inf)
+        cls.index = cls.analysis.neighbors_index()
+
+    def test_kneighbors_matches_distance_matrix(self):
+        """
+        Verifies that batched k-nearest queries by row return the same rows and distances as the dense matrix.
+        """
+        rows = np.arange(80)
+        distances, columns = self.index.kneighbors(rows, k=7)
+        expected_columns = np.argsort(self.distances, axis=1, kind="stable")[:, :7]
+        expected = np.take_along_axis(self.distances, expected_columns, axis=1)
+        np.testing.assert_allclose(distances, expected)
+        np.testing.assert_array_equal(columns, expected_columns)
+        self.assertNotIn(True, (columns == rows[:, np.newaxis]).any(axis=1))
+
+    def test_radius_neighbors_matches_distance_matrix(self):
+        """
+        Verifies that radius queries by row return exactly the rows within the radius, sorted by distance.
+        """
+        radius = float(np.median(self.distances[np.isfinite(self.distances)])) / 3
+        distances, columns = self.index.radius_neighbors([0, 10, 79], radius)
+        for i, row in enumerate([0, 10, 79]):
+            expected = np.flatnonzero(self.distances[row] <= radius)
+            self.assertEqual(set(columns[i]), set(expected))
+            np.testing.assert_allclose(distances[i], np.sort(self.distances[row, expected]))
+
+    def test_new_points_are_euclidean(self):
+        """
+        Verifies that new points, which have no graph edges, get Euclidean neighbours.
+        """
+        point = np.array([[0.1, -0.2, 0.3]])
+        distances, columns = self.index.kneighbors(point, k=3)
+        euclidean = np.linalg.norm(self.values - point, axis=1)
+        np.testing.assert_array_equal(columns[0], np.argsort(euclidean)[:3])
+        np.testing.assert_allclose(distances[0], np.sort(euclidean)[:3])
+        with self.assertRaises(ValueError):
+            self.index.kneighbors(np.zeros((1, 2)))
+        with self.assertRaises(ValueError):
+            self.index.kneighbors([0], k=80)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+from riemannian_stats import RiemannianAnalysis, InsufficientMemoryError
+
+
+class TestComputationPlan(unittest.TestCase):
+    """
+    Unit tests for RiemannianAnalysis.plan, the memory and runtime planner.
+    """
+
+    GiB = 2 ** 30
+
+    def test_small_problem_is_dense(self):
+        """
+        Verifies that a problem far below the budget is planned with the dense strategy.
+        """
+        plan = RiemannianAnalysis.plan(250, 10, n_neighbors=50, memory_budget=self.GiB)
+        self.assertEqual(plan.strategy, "dense")
+        self.assertListEqual(list(plan.stages), ["graph", "rho", "diff", "distance", "covariance", "correlation",
+                                                 "components", "variables_components"])
+        self.assertLessEqual(plan.peak_memory, self.GiB)
+        self.assertGreater(plan.seconds, 0)
+
+    def test_falls_back_when_dense_does_not_fit(self):
+        """
+        Verifies that the (n, n, p) tensor of the dense strategy triggers a cheaper strategy.
+        """
+        plan = RiemannianAnalysis.plan(5000, 10, memory_budget=self.GiB)
+        self.assertGreater(plan.alternatives["dense"], self.GiB)
+        self.assertIn(plan.strategy, ("tiled", "sparse", "memmap"))
+        self.assertLessEqual(plan.peak_memory, self.GiB)
+
+    def test_condensed_halves_distance_memory(self):
+        """
+        Verifies that the condensed strategy needs about half the distance storage of the sparse strategy.
+        """
+        sparse = RiemannianAnalysis.plan(20000, 10, strategy="sparse", memory_budget=100 * self.GiB)
+        condensed = RiemannianAnalysis.plan(20000, 10, strategy="condensed", memory_budget=100 * self.GiB)
+        self.assertLess(condensed.peak_memory, 0.6 * sparse.peak_memory)
+        self.assertLess(condensed.stages["distance"].seconds, sparse.stages["distance"].seconds)
+
+    def test_float32_halves_estimates(self):
+        """
+        Verifies that float32 data lowers the estimated footprint.
+        """
+        plan64 = RiemannianAnalysis.plan(2000, 10, strategy="dense", memory_budget=100 * self.GiB)
+        plan32 = RiemannianAnalysis.plan(2000, 10, strategy="dense", memory_budget=100 * self.GiB, dtype="float32")
+        self.assertLess(plan32.peak_memory, plan64.peak_memory)
+
+    def test_refusal_is_actionable(self):
+        """
+        Verifies that an impossible request raises InsufficientMemoryError naming the budget and remedies.
+        """
+        with self.assertRaises(InsufficientMemoryError) as context:
+            RiemannianAnalysis.plan(100000, 10, strategy="sparse", memory_budget=self.GiB)
+        self.assertIn("memory_budget", str(context.exception))
+
+    def test_unknown_strategy(self):
+        """
+        Verifies that an unknown strategy name is rejected.
+        """
+        with self.assertRaises(ValueError):
+            RiemannianAnalysis.plan(10, 2, strategy="gpu")
+        with self.assertRaises(ValueError):
+            RiemannianAnalysis.plan(10, 2, distance_method="fast")
+
+    def test_gram_distance_is_cheaper(self):
+        """
+        Verifies that the Gram-matrix distance stage is estimated faster and smaller than the exact reduction.
+        """
+        gram = RiemannianAnalysis.plan(20000, 50, strategy="tiled", memory_budget=100 * self.GiB)
+        exact = RiemannianAnalysis.plan(20000, 50, strategy="tiled", memory_budget=100 * self.GiB,
+                                        distance_method="exact")
+        self.assertLess(gram.stages["distance"].seconds, exact.stages["distance"].seconds)
+        self.assertLess(gram.stages["distance"].memory, exact.stages["distance"].memory)
+
+    def test_sparse_data_never_densified(self):
+        """
+        Verifies that sparse data with many columns skips the dense strategy and is planned within the budget.
+        """
+        plan = RiemannianAnalysis.plan(5000, 100_000, n_neighbors=15, nnz=250_000, memory_budget=2 * self.GiB)
+        self.assertNotEqual(plan.strategy, "dense")
+        self.assertLessEqual(plan.peak_memory, 2 * self.GiB)
+        with self.assertRaises(InsufficientMemoryError):
+            RiemannianAnalysis.plan(5000, 100_000, n_neighbors=15, memory_budget=2 * self.GiB)
+        with self.assertRaises(ValueError):
+            RiemannianAnalysis.plan(100, 10, nnz=50, strategy="dense")
+        with self.assertRaises(ValueError):
+            RiemannianAnalysis.plan(100, 10, nnz=50, distance_method="exact")
+
+    def test_n_jobs_holds_one_block_per_thread(self):
+        """
+        Verifies that parallel row blocks keep the block size and fit in the budget by running fewer at once.
+        """
+        serial = RiemannianAnalysis.plan(5000, 50, strategy="tiled", memory_budget=self.GiB, block_size=256)
+        parallel = RiemannianAnalysis.plan(5000, 50, strategy="tiled", memory_budget=self.GiB, block_size=256,
+                                           n_jobs=4)
+        self.assertEqual(parallel.n_jobs, 4)
+        self.assertGreater(parallel.stages["distance"].memory, serial.stages["distance"].memory)
+        self.assertGreater(parallel.stages["covariance"].memory, serial.stages["covariance"].memory)
+        auto_serial = RiemannianAnalysis.plan(40, 3, n_neighbors=5, strategy="tiled", memory_budget=70_000)
+        auto_parallel = RiemannianAnalysis.plan(40, 3, n_neighbors=5, strategy="tiled", memory_budget=70_000,
+                                                n_jobs=4)
+        self.assertEqual(auto_parallel.block_size, auto_serial.block_size)
+        self.assertEqual(auto_serial.n_jobs, 1)
+        self.assertTrue(1 < auto_parallel.n_jobs < 4)
+        self.assertLessEqual(auto_parallel.peak_memory, 70_000)
+
+if __name__ == '__main__':
+    unittest.main()
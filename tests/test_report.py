@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from riemannian_stats import riemannian_analysis, report, Report, RiemannianAnalysis
+
+
+class TestReport(unittest.TestCase):
+    """
+    Unit tests for the batch report builder.
+
+    The reports are rendered in-process (n_jobs=1) so the tests do not pay for compiling UMAP in worker processes.
+    """
+
+    def setUp(self):
+        import matplotlib.pyplot as plt
+
+        self.plt = plt
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.clusters = np.repeat(["a", "b"], 15)
+        self.data = pd.DataFrame(rng.normal(size=(30, 3)) + (self.clusters == "b")[:, None] * 5.0,
+                                 columns=["x", "y", "z"])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        self.plt.close("all")
+
+    def test_render_all_formats(self):
+        """
+        Verifies that every plot is written in every format and that no figure is left open.
+        """
+        analysis = riemannian_analysis(self.data, n_neighbors=10)
+        written = Report.render(analysis, self.tmpdir.name, name="demo", clusters=self.clusters,
+                                formats=("png", "svg", "pdf"))
+        self.assertEqual(set(written), {"principal_plane", "correlation_circle", "principal_plane_with_clusters",
+                                        "scatter_2d", "scatter_3d"})
+        for paths in written.values():
+            self.assertEqual([os.path.splitext(path)[1] for path in paths], [".png", ".svg", ".pdf"])
+            self.assertTrue(all(os.path.getsize(path) > 0 for path in paths))
+        self.assertEqual(self.plt.get_fignums(), [])
+
+    def test_render_many_without_clusters(self):
+        """
+        Verifies that datasets without cluster labels only get the principal plane and correlation circle.
+        """
+        written = Report.render_many({"first": self.data, "second": (self.data, self.clusters)},
+                                     self.tmpdir.name, n_jobs=1, n_neighbors=10)
+        self.assertEqual(set(written["first"]), {"principal_plane", "correlation_circle"})
+        self.assertEqual(len(written["second"]), 5)
+        self.assertTrue(os.path.exists(os.path.join(self.tmpdir.name, "first_principal_plane.png")))
+
+    def test_render_switches_to_agg(self):
+        """
+        Verifies that a direct render draws on Agg and restores the backend that was active.
+        """
+        backends = []
+        analysis = riemannian_analysis(self.data, n_neighbors=10)
+        previous = self.plt.get_backend()
+        self.plt.switch_backend("svg")
+        original_figure = self.plt.figure
+
+        def figure(*args, **kwargs):
+            backends.append(self.plt.get_backend())
+            return original_figure(*args, **kwargs)
+
+        try:
+            self.plt.figure = figure
+            Report.render(analysis, self.tmpdir.name)
+            self.assertEqual(self.plt.get_backend(), "svg")
+        finally:
+            self.plt.figure = original_figure
+            self.plt.switch_backend(previous)
+        self.assertTrue(backends)
+        self.assertTrue(all(backend.lower() == "agg" for backend in backends))
+
+    def test_render_rejects_sparse_data(self):
+        """
+        Verifies that an analysis of sparse data is refused with a ValueError instead of being densified.
+        """
+        from scipy import sparse
+
+        analysis = riemannian_analysis(sparse.csr_matrix(self.data.to_numpy()), n_neighbors=10,
+                                       similarity="fuzzy_knn")
+        with self.assertRaises(ValueError):
+            Report.render(analysis, self.tmpdir.name)
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            Report.render_many({"first": self.data}, self.tmpdir.name, formats=("bmp",), n_jobs=1)
+
+    def test_workers_warm_up_only_for_umap(self):
+        """
+        Verifies that worker processes compile the UMAP kernels only when the analyses use the UMAP similarity.
+        """
+        with mock.patch.object(RiemannianAnalysis, "warmup") as warmup:
+            report._init_worker({"similarity": "fuzzy_knn", "n_neighbors": 10})
+            warmup.assert_not_called()
+            report._init_worker({"n_neighbors": 10})
+            warmup.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import threading
+import unittest
+
+import numpy as np
+
+from riemannian_stats import riemannian_analysis, utilities
+
+
+class TestRiemannianPCAResult(unittest.TestCase):
+    """
+    Unit tests for the immutable result returned by RiemannianAnalysis.fit().
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = np.random.default_rng(7).normal(size=(50, 4))
+        cls.analysis = riemannian_analysis(cls.data, n_neighbors=6, block_size=16)
+
+    def test_outputs_match_step_by_step_api(self):
+        """
+        Verifies covariance, correlation, components, inertia and loadings against the individual methods.
+        """
+        result = self.analysis.fit()
+        corr = self.analysis.riemannian_correlation_matrix()
+        np.testing.assert_array_equal(result.covariance, self.analysis._riemannian_covariance_matrix())
+        np.testing.assert_array_equal(result.correlation, corr)
+        np.testing.assert_allclose(result.components, self.analysis.riemannian_components(corr))
+        self.assertAlmostEqual(result.inertia_by_components(0, 1), utilities.pca_inertia_by_components(corr, 0, 1))
+        np.testing.assert_allclose(result.cumulative_inertia[-1], 1.0)
+        expected = self.analysis.riemannian_correlation_variables_components(result.components)
+        np.testing.assert_allclose(result.loadings.iloc[:, :2].to_numpy(), expected.to_numpy(), atol=1e-12)
+        self.assertEqual(result.mean_index, self.analysis.riemannian_mean_index)
+
+    def test_float32_covariance_matches_analysis(self):
+        """
+        Verifies that float32 data gives the analysis' float64 covariance bitwise, and matching components.
+        """
+        analysis = riemannian_analysis(self.data.astype(np.float32), n_neighbors=6, block_size=16)
+        result = analysis.fit()
+        self.assertEqual(result.covariance.dtype, np.float64)
+        np.testing.assert_array_equal(result.covariance, analysis._riemannian_covariance_matrix())
+        np.testing.assert_array_equal(result.correlation, analysis.riemannian_correlation_matrix())
+        np.testing.assert_allclose(result.components, analysis.riemannian_components(result.correlation),
+                                   rtol=1e-5, atol=1e-5)
+
+    def test_immutable_and_memoized(self):
+        """
+        Verifies that attributes cannot be set, arrays are read-only and properties are computed once.
+        """
+        result = self.analysis.fit()
+        with self.assertRaises(AttributeError):
+            result.mean_index = 0
+        with self.assertRaises(ValueError):
+            result.components[0, 0] = 1.0
+        self.assertIs(result.components, result.components)
+
+    def test_owns_its_data(self):
+        """
+        Verifies that writing to the analysed array after fit() leaves the result unchanged.
+        """
+        analysis = riemannian_analysis(self.data.copy(), n_neighbors=6, block_size=16)
+        result = analysis.fit()
+        covariance = analysis._riemannian_covariance_matrix()
+        analysis.values[0, 0] = 5.0
+        self.assertFalse(np.shares_memory(result.values, analysis.values))
+        self.assertEqual(result.values[0, 0], self.data[0, 0])
+        np.testing.assert_array_equal(result.covariance, covariance)
+        with self.assertRaises(ValueError):
+            result.values[0, 0] = 5.0
+
+    def test_concurrent_reads_compute_once(self):
+        """
+        Verifies that many threads reading at once all see the same cached arrays.
+        """
+        result = self.analysis.fit()
+        barrier = threading.Barrier(8)
+        seen = []
+
+        def read():
+            barrier.wait()
+            seen.append((result.components, result.loadings.to_numpy(), result.inertia))
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(components) for components, _, _ in seen}), 1)
+        for _, loadings, inertia in seen:
+            np.testing.assert_array_equal(loadings, seen[0][1])
+            self.assertIs(inertia, seen[0][2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,19 @@
+import os
+import tempfile
 import unittest
 import numpy as np
 import pandas as pd
-from riemannian_stats import riemannian_analysis
+from riemannian_stats import riemannian_analysis, CancellationToken, FitCancelled
+
+
+def small_dataframe():
+    """
+    Returns the 10-row, 2-feature DataFrame ('a' and 'b') shared by the test cases.
+    """
+    return pd.DataFrame({
+        'a': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+        'b': [11, 12, 13, 14, 15, 16, 17, 18, 19, 20]
+    })
 
 
 class TestRiemannianUMAPAnalysis(unittest.TestCase):
@@ -21,10 +33,7 @@ class TestRiemannianUMAPAnalysis(unittest.TestCase):
         An instance of RiemannianUMAPAnalysis is created with a small number
         of neighbors (n_neighbors=2) to simplify and control the test conditions.
         """
-        self.data = pd.DataFrame({
-            'a': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
-            'b': [11, 12, 13, 14, 15, 16, 17, 18, 19, 20]
-        })
+        self.data = small_dataframe()
         self.analysis = riemannian_analysis(self.data, n_neighbors=2)
 
     def test_calculate_umap_graph_similarities(self):
@@ -469,5 +478,357 @@ class TestRiemannianUMAPAnalysis(unittest.TestCase):
         pd.testing.assert_frame_equal(result_df, expected_df, rtol=1e-5, atol=1e-5, check_like=True)
 
 
+class TestRiemannianAnalysisInputTypes(unittest.TestCase):
+    """
+    Unit tests for the input normalization of RiemannianAnalysis.
+
+    The same dataset is supplied as a DataFrame, a NumPy array and (when pyarrow is installed)
+    an Arrow table, and all three must yield identical Riemannian matrices.
+    """
+
+    def setUp(self):
+        """
+        Builds the reference dataset and the analysis computed from its DataFrame form.
+        """
+        self.data = small_dataframe()
+        self.reference = riemannian_analysis(self.data, n_neighbors=2)
+
+    def test_dataframe_metadata(self):
+        """
+        Verifies that the DataFrame is stored as a C-contiguous float array and its labels are kept.
+        """
+        values = self.reference.values
+        self.assertTrue(values.flags["C_CONTIGUOUS"])
+        self.assertEqual(values.dtype, np.float64)
+        self.assertListEqual(list(self.reference.columns), ['a', 'b'])
+        self.assertTrue(self.reference.index.equals(self.data.index))
+
+    def test_ndarray_input(self):
+        """
+        Verifies that NumPy input is accepted without copying and matches the DataFrame results.
+        """
+        values = np.ascontiguousarray(self.data.to_numpy(dtype=np.float64))
+        analysis = riemannian_analysis(values, n_neighbors=2)
+        self.assertIs(analysis.values, values)
+        np.testing.assert_allclose(analysis.umap_distance_matrix, self.reference.umap_distance_matrix)
+        np.testing.assert_allclose(analysis.riemannian_correlation_matrix(),
+                                   self.reference.riemannian_correlation_matrix())
+
+    def test_c_ordered_dataframe_is_not_copied(self):
+        """
+        Verifies that a DataFrame wrapping a C-ordered float array is used without copying it.
+        """
+        values = np.ascontiguousarray(self.data.to_numpy(dtype=np.float64))
+        analysis = riemannian_analysis(pd.DataFrame(values, columns=['a', 'b']), n_neighbors=2)
+        self.assertTrue(np.shares_memory(analysis.values, values))
+        self.assertTrue(analysis.values.flags["C_CONTIGUOUS"])
+        np.testing.assert_allclose(analysis.umap_distance_matrix, self.reference.umap_distance_matrix)
+
+    def test_float32_accumulates_in_float64(self):
+        """
+        Verifies that float32 data keeps float32 storage but gets float64 covariances close to the float64 ones.
+        """
+        rng = np.random.default_rng(5)
+        values = rng.normal(loc=1000.0, size=(60, 3)).astype(np.float32)
+        single = riemannian_analysis(values, n_neighbors=5, similarity="fuzzy_knn", block_size=7)
+        double = riemannian_analysis(values.astype(np.float64), n_neighbors=5, similarity="fuzzy_knn", block_size=7)
+        self.assertEqual(single.values.dtype, np.float32)
+        self.assertEqual(single.umap_distance_matrix.dtype, np.float32)
+        covariance = single._riemannian_covariance_matrix()
+        self.assertEqual(covariance.dtype, np.float64)
+        np.testing.assert_allclose(covariance, double._riemannian_covariance_matrix(), rtol=1e-6)
+
+    def test_arrow_input(self):
+        """
+        Verifies that a pyarrow Table is accepted and keeps its column names.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+        analysis = riemannian_analysis(pa.Table.from_pandas(self.data, preserve_index=False), n_neighbors=2)
+        self.assertListEqual(list(analysis.columns), ['a', 'b'])
+        np.testing.assert_allclose(analysis.umap_distance_matrix, self.reference.umap_distance_matrix)
+
+    def test_non_numeric_input(self):
+        """
+        Verifies that non-numeric columns are rejected with a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            riemannian_analysis(self.data.assign(label=list("abcdefghij")), n_neighbors=2)
+
+
+class TestRiemannianAnalysisProfiling(unittest.TestCase):
+    """
+    Unit tests for the per-stage instrumentation exposed through profile_ and stage callbacks.
+    """
+
+    STAGES = ["graph", "rho", "diff", "distance"]
+
+    def setUp(self):
+        """
+        Creates an analysis with memory profiling and a recording callback object.
+        """
+        self.events = []
+        recorder = self
+
+        class Recorder:
+            def on_stage_start(self, name):
+                recorder.events.append(("start", name))
+
+            def on_stage_end(self, name, stats):
+                recorder.events.append(("end", name))
+
+        self.data = small_dataframe()
+        self.analysis = riemannian_analysis(self.data, n_neighbors=2, callbacks=[Recorder()], profile_memory=True)
+
+    def test_fit_stages_profiled(self):
+        """
+        Verifies that every fit stage is recorded with non-negative times and a traced peak allocation.
+        """
+        profile = self.analysis.profile_
+        self.assertListEqual(list(profile), self.STAGES)
+        for stats in profile.values():
+            self.assertGreaterEqual(stats.wall_time, 0.0)
+            self.assertGreaterEqual(stats.cpu_time, 0.0)
+            self.assertIsNotNone(stats.peak_memory)
+        self.assertListEqual(self.events[:2], [("start", "graph"), ("end", "graph")])
+
+    def test_downstream_stages_and_callable_callback(self):
+        """
+        Verifies that downstream stages are recorded and that plain callables receive (name, stats).
+        """
+        seen = []
+        self.analysis.add_callback(lambda name, stats: seen.append(name))
+        corr = self.analysis.riemannian_correlation_matrix()
+        components = self.analysis.riemannian_components(corr)
+        self.analysis.riemannian_correlation_variables_components(components)
+        self.assertListEqual(seen, ["covariance", "correlation", "components", "variables_components"])
+        self.assertTrue(set(seen).issubset(self.analysis.profile_))
+
+
+class TestRiemannianAnalysisProgress(unittest.TestCase):
+    """
+    Unit tests for block-wise progress reporting and cooperative cancellation.
+    """
+
+    def setUp(self):
+        """
+        Creates a small dataset processed in blocks of three rows.
+        """
+        self.data = small_dataframe()
+
+    def test_progress_reported_per_block(self):
+        """
+        Verifies that the pairwise stages report one event per block and that the result matches
+        the single-block computation.
+        """
+        events = []
+
+        class Progress:
+            def on_progress(self, name, done, total):
+                events.append((name, done, total))
+
+        analysis = riemannian_analysis(self.data, n_neighbors=2, block_size=3, callbacks=[Progress()])
+        self.assertListEqual([e for e in events if e[0] == "distance"],
+                             [("distance", 3, 10), ("distance", 6, 10), ("distance", 9, 10), ("distance", 10, 10)])
+        self.assertIn(("graph", 1, 1), events)
+        reference = riemannian_analysis(self.data, n_neighbors=2)
+        np.testing.assert_allclose(analysis.umap_distance_matrix, reference.umap_distance_matrix)
+        np.testing.assert_allclose(analysis._riemannian_covariance_matrix(), reference._riemannian_covariance_matrix())
+
+    def test_progress_names_the_running_stage(self):
+        """
+        Verifies that the covariance blocks of the variables/components correlation are reported under that stage.
+        """
+        events = []
+
+        class Progress:
+            def on_progress(self, name, done, total):
+                events.append((name, done, total))
+
+        analysis = riemannian_analysis(self.data, n_neighbors=2, block_size=3)
+        analysis.add_callback(Progress())
+        analysis.riemannian_correlation_variables_components(np.ones((10, 2)) * np.arange(10)[:, np.newaxis])
+        self.assertListEqual(events, [("variables_components", 3, 10), ("variables_components", 6, 10),
+                                      ("variables_components", 9, 10), ("variables_components", 10, 10)])
+
+    def test_cancellation_between_blocks(self):
+        """
+        Verifies that cancelling the token during a stage raises FitCancelled and releases the partial matrices.
+        """
+        token = CancellationToken()
+
+        class CancelDuringDiff:
+            def on_progress(self, name, done, total):
+                if name == "diff":
+                    token.cancel()
+
+        analysis = riemannian_analysis(self.data, n_neighbors=2, block_size=3)
+        analysis.cancel_token = token
+        analysis.add_callback(CancelDuringDiff())
+        with self.assertRaises(FitCancelled):
+            analysis.n_neighbors = 3
+        self.assertIsNone(analysis.riemannian_diff)
+        self.assertIsNone(analysis.umap_similarities)
+
+    def test_cancelled_before_start(self):
+        """
+        Verifies that an already cancelled token stops the constructor before the UMAP stage.
+        """
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(FitCancelled):
+            riemannian_analysis(self.data, n_neighbors=2, cancel_token=token)
+
+
+class TestRiemannianAnalysisStrategies(unittest.TestCase):
+    """
+    Unit tests checking that every computation strategy reproduces the dense results.
+    """
+
+    def setUp(self):
+        """
+        Fits the reference (dense) analysis on a small random dataset.
+        """
+        self.data = np.random.default_rng(0).normal(size=(40, 3))
+        self.reference = riemannian_analysis(self.data, n_neighbors=5)
+
+    def test_auto_selects_dense_for_small_data(self):
+        """
+        Verifies that small problems keep the fully materialized behaviour.
+        """
+        self.assertEqual(self.reference.strategy, "dense")
+        self.assertEqual(self.reference.plan_.n_samples, 40)
+
+    def test_strategies_match_dense(self):
+        """
+        Verifies distances, Rho, differences and correlations for the tiled, sparse and memmap strategies.
+        """
+        for strategy in ("tiled", "sparse", "condensed", "memmap"):
+            with self.subTest(strategy=strategy):
+                analysis = riemannian_analysis(self.data, n_neighbors=5, strategy=strategy, block_size=7)
+                self.assertEqual(analysis.strategy, strategy)
+                np.testing.assert_allclose(analysis.umap_distance_matrix, self.reference.umap_distance_matrix)
+                np.testing.assert_allclose(analysis.rho, self.reference.rho)
+                np.testing.assert_allclose(analysis.riemannian_diff, self.reference.riemannian_diff)
+                np.testing.assert_allclose(analysis.riemannian_correlation_matrix(),
+                                           self.reference.riemannian_correlation_matrix())
+
+    def test_condensed_storage(self):
+        """
+        Verifies that the condensed strategy keeps half the distance matrix and finds the same Riemannian mean.
+        """
+        analysis = riemannian_analysis(self.data, n_neighbors=5, strategy="condensed", block_size=7)
+        condensed = analysis.condensed_distances
+        self.assertEqual(condensed.data.shape, (40 * 39 // 2,))
+        self.assertEqual(analysis.riemannian_mean_index, self.reference.riemannian_mean_index)
+        np.testing.assert_allclose(condensed.row_sums(), self.reference.umap_distance_matrix.sum(axis=1))
+        np.testing.assert_allclose(np.asarray(analysis.condensed_rho), self.reference.rho)
+
+    def test_exact_distance_method_matches_gram(self):
+        """
+        Verifies that the Gram-matrix distances with graph corrections equal the pairwise difference reduction.
+        """
+        shifted = self.data + 1000.0
+        gram = riemannian_analysis(shifted, n_neighbors=5, strategy="tiled", block_size=7)
+        exact = riemannian_analysis(shifted, n_neighbors=5, strategy="tiled", distance_method="exact")
+        np.testing.assert_allclose(gram.umap_distance_matrix, exact.umap_distance_matrix, rtol=1e-9, atol=1e-12)
+        np.testing.assert_array_equal(np.diag(gram.umap_distance_matrix), 0)
+
+    def test_parallel_blocks_are_bitwise_stable(self):
+        """
+        Verifies that threaded row blocks give bitwise identical distances and covariances for any n_jobs.
+        """
+        for strategy in ("tiled", "condensed"):
+            serial = riemannian_analysis(self.data, n_neighbors=5, strategy=strategy, block_size=6)
+            for n_jobs in (2, 3):
+                with self.subTest(strategy=strategy, n_jobs=n_jobs):
+                    parallel = riemannian_analysis(self.data, n_neighbors=5, strategy=strategy, block_size=6,
+                                                   n_jobs=n_jobs)
+                    np.testing.assert_array_equal(parallel.umap_distance_matrix, serial.umap_distance_matrix)
+                    np.testing.assert_array_equal(parallel._riemannian_covariance_matrix(),
+                                                  serial._riemannian_covariance_matrix())
+
+    def test_parallel_blocks_under_a_memory_budget(self):
+        """
+        Verifies that a tight memory budget caps the threads instead of the block size, keeping results bitwise stable.
+        """
+        serial = riemannian_analysis(self.data, n_neighbors=5, strategy="tiled", memory_budget=70_000)
+        parallel = riemannian_analysis(self.data, n_neighbors=5, strategy="tiled", memory_budget=70_000, n_jobs=4)
+        self.assertEqual(parallel.plan_.block_size, serial.plan_.block_size)
+        self.assertLess(parallel.plan_.block_size, len(self.data))
+        self.assertTrue(1 < parallel.plan_.n_jobs < 4)
+        np.testing.assert_array_equal(parallel.umap_distance_matrix, serial.umap_distance_matrix)
+        np.testing.assert_array_equal(parallel._riemannian_covariance_matrix(), serial._riemannian_covariance_matrix())
+
+    def test_parallel_cancellation(self):
+        """
+        Verifies that cancelling during a threaded stage raises FitCancelled and releases the matrices.
+        """
+        token = CancellationToken()
+
+        class CancelDuringDistance:
+            def on_progress(self, name, done, total):
+                if name == "distance":
+                    token.cancel()
+
+        analysis = riemannian_analysis(self.data, n_neighbors=5, strategy="tiled", block_size=4, n_jobs=2)
+        analysis.cancel_token = token
+        analysis.add_callback(CancelDuringDistance())
+        with self.assertRaises(FitCancelled):
+            analysis.n_neighbors = 6
+        self.assertIsNone(analysis.umap_distance_matrix)
+        with self.assertRaises(ValueError):
+            riemannian_analysis(self.data, n_jobs=0)
+
+    def test_refuses_before_fitting(self):
+        """
+        Verifies that an impossible memory budget is rejected before UMAP runs.
+        """
+        with self.assertRaises(MemoryError):
+            riemannian_analysis(self.data, n_neighbors=5, strategy="dense", memory_budget=1024)
+
+
+class TestRiemannianAnalysisWarmup(unittest.TestCase):
+    """
+    Unit tests for RiemannianAnalysis.warmup, the JIT warm-up entry point.
+    """
+
+    def setUp(self):
+        """
+        Saves the numba cache configuration so that the test can restore it, and starts without one.
+        """
+        self.previous_cache_dir = os.environ.pop("NUMBA_CACHE_DIR", None)
+
+    def tearDown(self):
+        """
+        Restores the numba cache configuration.
+        """
+        if self.previous_cache_dir is None:
+            os.environ.pop("NUMBA_CACHE_DIR", None)
+        else:
+            os.environ["NUMBA_CACHE_DIR"] = self.previous_cache_dir
+
+    def test_warmup_is_idempotent_and_enables_cache(self):
+        """
+        Verifies that warmup configures the numba cache directory and only does work once per process.
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            elapsed = riemannian_analysis.warmup(cache_dir=cache_dir, metric="manhattan")
+            self.assertGreater(elapsed, 0.0)
+            self.assertEqual(os.environ["NUMBA_CACHE_DIR"], cache_dir)
+            self.assertEqual(riemannian_analysis.warmup(cache_dir=cache_dir, metric="manhattan"), 0.0)
+
+    def test_existing_cache_dir_is_left_alone(self):
+        """
+        Verifies that a NUMBA_CACHE_DIR set by the user takes precedence over the cache_dir argument.
+        """
+        with tempfile.TemporaryDirectory() as configured, tempfile.TemporaryDirectory() as cache_dir:
+            os.environ["NUMBA_CACHE_DIR"] = configured
+            self.assertEqual(riemannian_analysis._configure_numba_cache(cache_dir), configured)
+            self.assertEqual(os.environ["NUMBA_CACHE_DIR"], configured)
+
+
 if __name__ == '__main__':
     unittest.main()
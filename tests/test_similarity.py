@@ -0,0 +1,104 @@
+import unittest
+
+import numpy as np
+
+from riemannian_stats import (FuzzyKNNSimilarity, GaussianKNNSimilarity, SimilarityBackend, UMAPSimilarity,
+                              riemannian_analysis)
+from riemannian_stats.planning import plan_computation
+
+
+class TestSimilarityBackends(unittest.TestCase):
+    """
+    Unit tests for the similarity backends behind the Rho matrix.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(11)
+        centers = rng.normal(scale=5.0, size=(3, 4))
+        cls.values = centers[rng.integers(3, size=120)] + rng.normal(size=(120, 4))
+
+    def assert_valid_graph(self, graph):
+        self.assertEqual(graph.shape, (120, 120))
+        self.assertEqual(abs(graph - graph.T).max(), 0)
+        self.assertEqual(graph.diagonal().max(), 0)
+        self.assertGreater(graph.data.min(), 0)
+        self.assertLessEqual(graph.data.max(), 1)
+
+    def test_fuzzy_knn_matches_umap_graph(self):
+        """
+        Verifies that the direct fuzzy simplicial set has UMAP's edges and, up to float32 rounding, its weights.
+        """
+        fuzzy = FuzzyKNNSimilarity(n_neighbors=10).graph(self.values)
+        umap_graph = UMAPSimilarity(n_neighbors=10).graph(self.values)
+        self.assert_valid_graph(fuzzy)
+        self.assertEqual(fuzzy.nnz, umap_graph.nnz)
+        self.assertLess(abs(fuzzy - umap_graph).max(), 1e-4)
+
+    def test_gaussian_knn_graph(self):
+        """
+        Verifies that the Gaussian kernel graph is a symmetric kNN graph with similarities in (0, 1].
+        """
+        graph = GaussianKNNSimilarity(n_neighbors=5, algorithm="ball_tree").graph(self.values)
+        self.assert_valid_graph(graph)
+        self.assertGreaterEqual(np.diff(graph.indptr).min(), 4)
+
+    def test_analysis_with_knn_backend(self):
+        """
+        Verifies that an analysis fitted with a kNN backend uses its graph for Rho and the distances.
+        """
+        analysis = riemannian_analysis(self.values, n_neighbors=10, similarity="fuzzy_knn")
+        self.assertIsInstance(analysis.similarity, FuzzyKNNSimilarity)
+        graph = analysis.umap_graph.toarray()
+        np.testing.assert_allclose(analysis.rho, 1 - graph)
+        euclidean = np.linalg.norm(self.values[:, np.newaxis] - self.values[np.newaxis], axis=2)
+        np.testing.assert_allclose(analysis.umap_distance_matrix, (1 - graph) * euclidean, atol=1e-9)
+
+        analysis.similarity = GaussianKNNSimilarity(n_neighbors=6)
+        self.assertEqual(analysis.similarity, GaussianKNNSimilarity(n_neighbors=6))
+        np.testing.assert_allclose(analysis.umap_graph.toarray(), analysis.similarity.graph(self.values).toarray())
+        with self.assertRaises(ValueError):
+            analysis.n_neighbors = 8
+        with self.assertRaises(ValueError):
+            analysis.metric = "manhattan"
+        self.assertEqual(analysis.similarity, GaussianKNNSimilarity(n_neighbors=6))
+
+    def test_invalid_backend(self):
+        """
+        Verifies that unknown backend names are rejected.
+        """
+        with self.assertRaises(ValueError):
+            riemannian_analysis(self.values, similarity="tsne")
+        with self.assertRaises(ValueError):
+            plan_computation(100, 4, similarity="tsne")
+        with self.assertRaises(ValueError):
+            FuzzyKNNSimilarity(n_neighbors=1)
+        with self.assertRaises(TypeError):
+            SimilarityBackend()
+
+    def test_plan_knn_graph_is_cheaper(self):
+        """
+        Verifies that the planner expects the kNN graph stage to need less memory and time than UMAP.
+        """
+        umap_plan = plan_computation(3000, 10, n_neighbors=15, strategy="sparse")
+        knn_plan = plan_computation(3000, 10, n_neighbors=15, strategy="sparse", similarity="fuzzy_knn")
+        self.assertLess(knn_plan.stages["graph"].memory, umap_plan.stages["graph"].memory)
+        self.assertLess(knn_plan.stages["graph"].seconds, umap_plan.stages["graph"].seconds)
+
+        instance_plan = plan_computation(3000, 10, n_neighbors=15, strategy="sparse",
+                                         similarity=GaussianKNNSimilarity(n_neighbors=15))
+        self.assertEqual(instance_plan.stages["graph"], knn_plan.stages["graph"])
+
+        class CustomSimilarity(SimilarityBackend):
+            planning_kind = "knn"
+
+            def graph(self, values):
+                return FuzzyKNNSimilarity(self.n_neighbors, self.metric).graph(values)
+
+        custom_plan = plan_computation(3000, 10, n_neighbors=15, strategy="sparse",
+                                       similarity=CustomSimilarity(n_neighbors=15))
+        self.assertEqual(custom_plan.stages["graph"], knn_plan.stages["graph"])
+
+
+if __name__ == '__main__':
+    unittest.main()
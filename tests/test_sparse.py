@@ -0,0 +1,116 @@
+import unittest
+
+import numpy as np
+from scipy import sparse
+
+from riemannian_stats import data_processing, riemannian_analysis, utilities
+
+
+class TestSparseInput(unittest.TestCase):
+    """
+    Unit tests for scipy sparse input, compared with the same data passed as a dense array.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(3)
+        n_rows, n_features, nnz = 150, 60, 1200
+        cls.sparse_values = sparse.csr_matrix(
+            (rng.gamma(2.0, size=nnz), (rng.integers(n_rows, size=nnz), rng.integers(n_features, size=nnz))),
+            shape=(n_rows, n_features))
+        cls.dense_values = cls.sparse_values.toarray()
+        cls.sparse_analysis = riemannian_analysis(cls.sparse_values, n_neighbors=8, similarity="fuzzy_knn",
+                                                  block_size=40)
+        cls.dense_analysis = riemannian_analysis(cls.dense_values, n_neighbors=8, similarity="fuzzy_knn",
+                                                 block_size=40)
+
+    def test_to_float_array(self):
+        """
+        Verifies that sparse input becomes a canonical float CSR matrix without being densified.
+        """
+        coo = sparse.coo_array(([1, 2, 3], ([0, 0, 2], [1, 1, 0])), shape=(3, 2))
+        values, columns, index = data_processing.to_float_array(coo)
+        self.assertTrue(sparse.isspmatrix_csr(values))
+        self.assertEqual(values.dtype, np.float64)
+        self.assertTrue(values.has_canonical_format)
+        np.testing.assert_array_equal(values.toarray(), [[0, 3], [0, 0], [3, 0]])
+        self.assertEqual((len(columns), len(index)), (2, 3))
+
+    def test_to_float_array_leaves_input_unchanged(self):
+        """
+        Verifies that canonicalizing a CSR input with unsorted and duplicate entries does not modify it.
+        """
+        for dtype in (np.float64, np.int64):
+            with self.subTest(dtype=dtype):
+                data = sparse.csr_matrix((np.array([1, 2, 3], dtype=dtype), np.array([1, 0, 1]), np.array([0, 3, 3])),
+                                         shape=(2, 2))
+                indptr, indices, stored = data.indptr.copy(), data.indices.copy(), data.data.copy()
+                values, _, _ = data_processing.to_float_array(data)
+                self.assertTrue(values.has_canonical_format)
+                np.testing.assert_array_equal(values.toarray(), [[2, 4], [0, 0]])
+                np.testing.assert_array_equal(data.indptr, indptr)
+                np.testing.assert_array_equal(data.indices, indices)
+                np.testing.assert_array_equal(data.data, stored)
+
+    def test_distances_match_dense(self):
+        """
+        Verifies that the sparse Gram distances equal the dense ones and the data stays sparse.
+        """
+        self.assertTrue(sparse.issparse(self.sparse_analysis.values))
+        self.assertNotEqual(self.sparse_analysis.strategy, "dense")
+        np.testing.assert_allclose(self.sparse_analysis.umap_graph.toarray(),
+                                   self.dense_analysis.umap_graph.toarray(), atol=1e-12)
+        np.testing.assert_allclose(self.sparse_analysis.umap_distance_matrix,
+                                   self.dense_analysis.umap_distance_matrix, atol=1e-10)
+        self.assertEqual(self.sparse_analysis.riemannian_mean_index, self.dense_analysis.riemannian_mean_index)
+
+    def test_covariance_and_components_match_dense(self):
+        """
+        Verifies the sparse covariance and correlation, and the truncated components up to sign.
+        """
+        covariance = self.sparse_analysis._riemannian_covariance_matrix()
+        self.assertTrue(sparse.issparse(covariance))
+        np.testing.assert_allclose(covariance.toarray(), self.dense_analysis._riemannian_covariance_matrix(),
+                                   atol=1e-12)
+
+        corr = self.sparse_analysis.riemannian_correlation_matrix()
+        dense_corr = np.nan_to_num(self.dense_analysis.riemannian_correlation_matrix())
+        self.assertTrue(sparse.issparse(corr))
+        np.testing.assert_allclose(corr.toarray(), dense_corr, atol=1e-12)
+
+        components = self.sparse_analysis.riemannian_components(corr, n_components=3)
+        eigenvalues, eigenvectors = np.linalg.eigh(dense_corr)
+        order = np.argsort(eigenvalues)[::-1][:3]
+        centered = (self.dense_values - self.dense_values[self.dense_analysis.riemannian_mean_index]) \
+            * self.dense_analysis.riemannian_weights[:, np.newaxis]
+        std = np.sqrt(np.mean(centered ** 2, axis=0))
+        expected = np.divide(centered, std, out=np.zeros_like(centered), where=std > 0) @ eigenvectors[:, order]
+        self.assertEqual(components.shape, (150, 3))
+        np.testing.assert_allclose(np.abs(components), np.abs(expected), atol=1e-8)
+
+        spectrum = utilities.pca_spectrum(corr, 3)
+        np.testing.assert_allclose(spectrum, eigenvalues[order])
+        self.assertAlmostEqual(utilities.pca_inertia_by_components(corr, 0, 1),
+                               (eigenvalues[order[0]] + eigenvalues[order[1]]) / np.trace(dense_corr))
+
+        correlations = self.sparse_analysis.riemannian_correlation_variables_components(components)
+        expected_correlations = self.dense_analysis.riemannian_correlation_variables_components(expected)
+        np.testing.assert_allclose(np.abs(correlations.to_numpy()), np.abs(expected_correlations.to_numpy()),
+                                   atol=1e-8)
+
+    def test_dense_only_features_refuse_sparse(self):
+        """
+        Verifies that features needing dense data raise instead of densifying it.
+        """
+        with self.assertRaises(ValueError):
+            self.sparse_analysis.fit()
+        with self.assertRaises(ValueError):
+            self.sparse_analysis.neighbors_index()
+        with self.assertRaises(ValueError):
+            riemannian_analysis(self.sparse_values, similarity="fuzzy_knn", strategy="dense")
+        with self.assertRaises(ValueError):
+            riemannian_analysis(self.sparse_values, similarity="fuzzy_knn", distance_method="exact")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from riemannian_stats import riemannian_analysis, StreamingRiemannianCovariance
+
+
+class TestStreamingRiemannianPCA(unittest.TestCase):
+    """
+    Unit tests for the chunk-wise Riemannian covariance, correlation and components.
+
+    The streaming results are compared with the in-memory RiemannianAnalysis on the same data.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(1)
+        cls.data = pd.DataFrame(rng.normal(size=(40, 3)) + rng.integers(3, size=(40, 1)) * 4.0,
+                                columns=["a", "b", "c"])
+        cls.analysis = riemannian_analysis(cls.data, n_neighbors=10)
+        cls.corr = cls.analysis.riemannian_correlation_matrix()
+        cls.components = cls.analysis.riemannian_components(cls.corr)
+
+    def _chunks(self, size=7):
+        return (self.data.iloc[start:start + size] for start in range(0, len(self.data), size))
+
+    def test_riemannian_mean_and_weights(self):
+        """
+        Verifies that the exposed Riemannian mean is the row with the smallest total distance.
+        """
+        index = self.analysis.riemannian_mean_index
+        self.assertEqual(index, int(np.argmin(self.analysis.umap_distance_matrix.sum(axis=1))))
+        np.testing.assert_array_equal(self.analysis.riemannian_mean, self.data.to_numpy()[index])
+        np.testing.assert_allclose(self.analysis.riemannian_weights, self.analysis.rho[:, index])
+
+    def test_streaming_matches_in_memory(self):
+        """
+        Verifies that covariance, correlation, components and variable correlations match the in-memory results.
+        """
+        streaming = self.analysis.streaming_pca().fit(self._chunks())
+        self.assertEqual(streaming.n_samples_, len(self.data))
+        np.testing.assert_allclose(streaming.covariance_, self.analysis._riemannian_covariance_matrix())
+        np.testing.assert_allclose(streaming.correlation_, self.corr)
+        components = np.vstack(list(streaming.iter_components(self._chunks())))
+        np.testing.assert_allclose(components, self.components, atol=1e-10)
+        expected = self.analysis.riemannian_correlation_variables_components(self.components)
+        result = streaming.correlation_variables_components(self._chunks())
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), atol=1e-10)
+        self.assertEqual(list(result.columns), list(expected.columns))
+
+    def test_merge_of_partial_accumulators(self):
+        """
+        Verifies that merging accumulators over disjoint chunks equals one accumulator over all rows.
+        """
+        mean, weights = self.analysis.riemannian_mean, self.analysis.riemannian_weights
+        values = self.data.to_numpy()
+        full = StreamingRiemannianCovariance(mean, weights).update(values)
+        left = StreamingRiemannianCovariance(mean).update(values[:15], weights[:15])
+        right = StreamingRiemannianCovariance(mean).update(values[15:], weights[15:])
+        np.testing.assert_allclose(left.merge(right).covariance_, full.covariance_)
+        with self.assertRaises(ValueError):
+            left.merge(StreamingRiemannianCovariance(mean + 1.0))
+
+    def test_missing_weights(self):
+        """
+        Verifies that chunks beyond the known weights are rejected.
+        """
+        accumulator = StreamingRiemannianCovariance(self.analysis.riemannian_mean, self.analysis.riemannian_weights)
+        accumulator.update(self.data)
+        with self.assertRaises(ValueError):
+            accumulator.update(self.data.iloc[:1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -71,5 +71,59 @@ class TestPCAInertiaByComponents(unittest.TestCase):
                                msg="Total inertia should sum up approximately to 1.")
 
 
+class TestPCASpectrum(unittest.TestCase):
+    """
+    Unit tests for the spectrum-based inertia API of Utilities.
+    """
+
+    def setUp(self):
+        self.corr = np.array([
+            [1.0, 0.8, 0.5],
+            [0.8, 1.0, 0.3],
+            [0.5, 0.3, 1.0]
+        ])
+
+    def test_spectrum_sorted_descending(self):
+        """
+        Verifies that the spectrum matches the eigenvalues of the matrix in decreasing order.
+        """
+        spectrum = utilities.pca_spectrum(self.corr)
+        expected = np.sort(np.linalg.eigvals(self.corr).real)[::-1]
+        np.testing.assert_allclose(spectrum, expected)
+
+    def test_spectrum_requires_square_matrix(self):
+        with self.assertRaises(ValueError):
+            utilities.pca_spectrum(np.ones((3, 2)))
+
+    def test_inertia_and_cumulative(self):
+        """
+        Verifies that per-component inertia sums to one and the cumulative inertia ends at one.
+        """
+        inertia, cumulative = utilities.pca_inertia(utilities.pca_spectrum(self.corr))
+        self.assertAlmostEqual(inertia.sum(), 1.0)
+        np.testing.assert_allclose(cumulative, np.cumsum(inertia))
+        self.assertAlmostEqual(cumulative[-1], 1.0)
+        self.assertTrue(np.all(np.diff(inertia) <= 0))
+
+    def test_pairs_match_pairwise_method(self):
+        """
+        Verifies that the vectorized pair inertia agrees with pca_inertia_by_components for every pair.
+        """
+        pairs = [(i, j) for i in range(3) for j in range(3)]
+        spectrum = utilities.pca_spectrum(self.corr)
+        vectorized = utilities.pca_inertia_by_component_pairs(spectrum, pairs)
+        expected = [utilities.pca_inertia_by_components(self.corr, i, j) for i, j in pairs]
+        np.testing.assert_allclose(vectorized, expected)
+        np.testing.assert_allclose(utilities.pca_inertia_by_component_pairs(self.corr, pairs), expected)
+
+    def test_pairs_validation(self):
+        spectrum = utilities.pca_spectrum(self.corr)
+        self.assertEqual(utilities.pca_inertia_by_component_pairs(spectrum, []).shape, (0,))
+        with self.assertRaises(ValueError):
+            utilities.pca_inertia_by_component_pairs(spectrum, [(0, 3)])
+        with self.assertRaises(ValueError):
+            utilities.pca_inertia_by_component_pairs(spectrum, [0, 1, 2])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
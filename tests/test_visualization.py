@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 import pandas as pd
 from riemannian_stats import visualization, riemannian_analysis, utilities
 
@@ -90,5 +91,182 @@ class TestVisualization(unittest.TestCase):
             self.fail(f"plot_3d_scatter_with_clusters raised an exception unexpectedly: {e}")
 
 
+class TestVisualizationLargeData(unittest.TestCase):
+    """
+    Unit tests for the large-data options of the principal-plane plots: label decimation,
+    rasterized markers and density layers.
+    """
+
+    def setUp(self):
+        import matplotlib.pyplot as plt
+
+        self.plt = plt
+        rng = np.random.default_rng(0)
+        n = 6000
+        self.components = rng.normal(size=(n, 2))
+        self.data = pd.DataFrame({"a": rng.normal(size=n)}, index=[f"row{i}" for i in range(n)])
+        self.viz = visualization(data=self.data, components=self.components, explained_inertia=50.0,
+                                 clusters=rng.integers(3, size=n))
+
+    def tearDown(self):
+        self.plt.close("all")
+
+    def test_default_decimation_and_rasterization(self):
+        """
+        Verifies that above the large-data threshold only the farthest points are labelled and markers are rasterized.
+        """
+        self.viz.plot_principal_plane()
+        ax = self.plt.gca()
+        self.assertEqual(len(ax.texts), 50)
+        self.assertTrue(all(collection.get_rasterized() for collection in ax.collections))
+        norms = np.hypot(self.components[:, 0], self.components[:, 1])
+        farthest = set(self.data.index[np.argsort(norms)[-50:]])
+        self.assertEqual({text.get_text() for text in ax.texts}, farthest)
+
+    def test_label_subset_and_max_labels(self):
+        """
+        Verifies that label_subset and max_labels control the annotated points.
+        """
+        self.viz.plot_principal_plane_with_clusters(label_subset=["row1", "row7"])
+        self.assertEqual(sorted(text.get_text() for text in self.plt.gca().texts), ["row1", "row7"])
+        self.plt.close("all")
+        self.viz.plot_principal_plane(max_labels=0)
+        self.assertEqual(len(self.plt.gca().texts), 0)
+        with self.assertRaises(ValueError):
+            self.viz.plot_principal_plane(label_subset=["missing"])
+
+    def test_density_layers(self):
+        """
+        Verifies that hexbin and hist2d density layers are drawn, and unknown kinds are rejected.
+        """
+        self.viz.plot_principal_plane(density="hexbin", max_labels=5)
+        self.assertEqual(len(self.plt.gca().collections), 1)
+        self.plt.close("all")
+        self.viz.plot_principal_plane_with_clusters(density="hist2d", max_labels=5)
+        self.assertTrue(self.plt.gca().images or self.plt.gca().collections)
+        with self.assertRaises(ValueError):
+            self.viz.plot_principal_plane(density="kde")
+
+
+class TestVisualizationGroupedScatter(unittest.TestCase):
+    """
+    Unit tests for the single-collection cluster scatter plots and their capped legends.
+    """
+
+    def setUp(self):
+        import matplotlib.pyplot as plt
+
+        self.plt = plt
+        rng = np.random.default_rng(0)
+        n = 600
+        self.data = pd.DataFrame({"x": rng.normal(size=n), "y": rng.normal(size=n), "z": rng.normal(size=n),
+                                  "cluster": np.repeat(np.arange(30), 20)})
+        self.data.loc[:99, "cluster"] = 0
+        self.viz = visualization(data=self.data, components=self.data[["x", "y"]].to_numpy(),
+                                 explained_inertia=50.0, clusters=self.data["cluster"].to_numpy())
+
+    def tearDown(self):
+        self.plt.close("all")
+
+    def test_single_collection_and_other_entry(self):
+        """
+        Verifies that all clusters are drawn as one collection and small clusters collapse into "Other".
+        """
+        self.viz.plot_2d_scatter_with_clusters("x", "y", "cluster", max_legend_clusters=5)
+        ax = self.plt.gca()
+        self.assertEqual(len(ax.collections), 1)
+        labels = [text.get_text() for text in ax.get_legend().texts]
+        self.assertEqual(len(labels), 5)
+        self.assertEqual(labels[0], "Cluster 0")
+        self.assertEqual(labels[-1], "Other (22 clusters)")
+
+    def test_uncapped_legend(self):
+        """
+        Verifies that every cluster gets its own legend entry and color when the cap is disabled.
+        """
+        self.viz.plot_principal_plane_with_clusters(max_legend_clusters=None, max_labels=0)
+        ax = self.plt.gca()
+        self.assertEqual(len(ax.collections), 1)
+        self.assertEqual(len(ax.get_legend().texts), 26)
+        colors = ax.collections[0].get_facecolors()
+        self.assertEqual(len(np.unique(colors, axis=0)), 26)
+
+    def test_3d_legend_cap(self):
+        """
+        Verifies that the 3D scatter uses the same capped proxy legend.
+        """
+        self.viz.plot_3d_scatter_with_clusters("x", "y", "z", "cluster", max_legend_clusters=3)
+        self.assertEqual(len(self.plt.gca().get_legend().texts), 3)
+
+
+class TestVisualizationOutput(unittest.TestCase):
+    """
+    Unit tests for returning, saving and not showing figures.
+    """
+
+    def test_return_and_save_figure(self):
+        """
+        Verifies that a plot returns its figure and writes it to `save_to` without being shown.
+        """
+        import os
+        import tempfile
+        import matplotlib.pyplot as plt
+
+        data = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [2.0, 1.0, 3.0], "cluster": [0, 1, 0]})
+        viz = visualization(data=data, components=data[["a", "b"]].to_numpy(), explained_inertia=10.0,
+                            clusters=data["cluster"].to_numpy())
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for extension in ("png", "svg", "pdf"):
+                path = os.path.join(tmpdir, f"plane.{extension}")
+                figure = viz.plot_principal_plane_with_clusters(save_to=path, show=False)
+                self.assertIs(figure, plt.gcf())
+                self.assertGreater(os.path.getsize(path), 0)
+                plt.close(figure)
+
+
+class TestCorrelationCircleWide(unittest.TestCase):
+    """
+    Unit tests for the vectorized correlation circle on wide datasets.
+    """
+
+    def setUp(self):
+        import matplotlib.pyplot as plt
+
+        self.plt = plt
+        rng = np.random.default_rng(0)
+        p = 2000
+        angles, radii = rng.uniform(0, 2 * np.pi, p), rng.uniform(0, 1, p)
+        self.correlations = pd.DataFrame({"Component_1": radii * np.cos(angles),
+                                          "Component_2": radii * np.sin(angles)})
+        self.norms = radii
+        self.viz = visualization(data=pd.DataFrame(columns=[f"v{i}" for i in range(p)]), explained_inertia=10.0)
+
+    def tearDown(self):
+        self.plt.close("all")
+
+    def test_single_quiver_and_thinned_labels(self):
+        """
+        Verifies that all arrows are one quiver and that at most one label is kept per grid cell.
+        """
+        figure = self.viz.plot_correlation_circle(self.correlations, show=False)
+        ax = figure.axes[0]
+        quivers = [artist for artist in ax.collections if type(artist).__name__ == "Quiver"]
+        self.assertEqual(len(quivers), 1)
+        self.assertEqual(quivers[0].N, 2000)
+        self.assertLessEqual(len(ax.texts), 16 * 16)
+        self.assertGreater(len(ax.texts), 0)
+
+    def test_top_k_and_min_norm(self):
+        """
+        Verifies that top_k keeps the largest loadings and min_norm drops short arrows.
+        """
+        figure = self.viz.plot_correlation_circle(self.correlations, top_k=10, show=False)
+        expected = {f"v{i}" for i in np.argsort(-self.norms)[:10]}
+        self.assertEqual({text.get_text() for text in figure.axes[0].texts}, expected)
+        self.plt.close(figure)
+        figure = self.viz.plot_correlation_circle(self.correlations, min_norm=0.99, label_grid=1000, show=False)
+        self.assertEqual(len(figure.axes[0].texts), int(np.sum(self.norms >= 0.99)))
+
+
 if __name__ == '__main__':
     unittest.main()